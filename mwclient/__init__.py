@@ -23,10 +23,45 @@
  OTHER DEALINGS IN THE SOFTWARE.
 """
 
-from mwclient.errors import *  # noqa: F401, F403
-from mwclient.client import Site as Site, __version__ as __version__  # noqa: F401
+import importlib
 import logging
 import warnings
+from typing import TYPE_CHECKING, Any, List
+
+import mwclient.errors as errors
+from mwclient.errors import *  # noqa: F401, F403
+
+if TYPE_CHECKING:
+    from mwclient.client import Site as Site, __version__ as __version__  # noqa: F401
+
+# mwclient.client imports requests, which takes a while, so it is only imported
+# once the Site class, the version or one of the submodules is first accessed.
+_lazy_attributes = {'Site': 'mwclient.client', '__version__': 'mwclient.client'}
+_lazy_submodules = {'client', 'columnar', 'diff', 'dump', 'eventstreams', 'history',
+                    'image', 'linkgraph', 'listing', 'mirror', 'page', 'redirects',
+                    'sleep', 'stats', 'streaming', 'tracing', 'transport', 'util'}
+
+# The names exported by `from mwclient import *`: the Site class, the exceptions
+# and the submodules that were imported along with mwclient before it was lazy
+__all__ = ['Site', 'client', 'errors', 'image', 'listing', 'page', 'sleep', 'util']
+__all__ += sorted(name for name, value in vars(errors).items()  # noqa: F405
+                  if isinstance(value, type) and issubclass(value, Exception))
+
+
+def __getattr__(name: str) -> Any:
+    if name in _lazy_attributes or name in _lazy_submodules:
+        # Importing mwclient.client first also imports the other submodules in
+        # an order that avoids circular import errors.
+        import mwclient.client  # noqa: F401
+        if name in _lazy_attributes:
+            return getattr(importlib.import_module(_lazy_attributes[name]), name)
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_lazy_attributes) | _lazy_submodules)
+
 
 # Show DeprecationWarning
 warnings.simplefilter('always', DeprecationWarning)
@@ -1,19 +1,30 @@
 import json
 import logging
+import socket
+import threading
+import time
 import warnings
 from collections import OrderedDict
+from http.cookiejar import Cookie
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 from typing import Optional, Callable, Union, Mapping, Any, MutableMapping, List, Dict, \
-    Tuple, cast, Iterable, BinaryIO, Iterator
+    Tuple, cast, Iterable, BinaryIO, Iterator, Generator, Sequence
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth, AuthBase
-from requests_oauthlib import OAuth1
+from urllib3.connection import HTTPConnection
 
 import mwclient.errors as errors
 import mwclient.listing as listing
 from mwclient._types import Cookies, Namespace, VersionTuple
+from mwclient.redirects import RedirectTable, follow_redirects
 from mwclient.sleep import Sleeper, Sleepers
-from mwclient.util import parse_timestamp, read_in_chunks, handle_limit
+from mwclient.stats import Stats
+from mwclient.streaming import ItemStream
+from mwclient.tracing import NoopTracer, Tracer
+from mwclient.transport import Response, Transport, RequestsTransport
+from mwclient.util import parse_timestamp, read_in_chunks, handle_limit, Throttle
 
 __version__ = '0.11.0'
 
@@ -21,6 +32,55 @@ log = logging.getLogger(__name__)
 
 USER_AGENT = f'mwclient/{__version__} (https://github.com/mwclient/mwclient)'
 
+SocketOption = Tuple[int, int, int]
+
+
+def keepalive_socket_options(
+    idle: int = 60, interval: int = 10, count: int = 6
+) -> List[SocketOption]:
+    """Return socket options enabling TCP keep-alive probes.
+
+    The probe timings are only set on platforms that support configuring them.
+
+    Args:
+        idle: Seconds of inactivity before the first probe is sent.
+        interval: Seconds between two probes.
+        count: Number of unanswered probes after which the connection is dropped.
+    """
+    options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    for name, value in (('TCP_KEEPIDLE', idle), ('TCP_KEEPINTVL', interval),
+                        ('TCP_KEEPCNT', count)):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+class PoolAdapter(HTTPAdapter):
+    """A :class:`~requests.adapters.HTTPAdapter` that also sets socket options on
+    the connections it opens.
+
+    Args:
+        socket_options: Options passed to `setsockopt` for each new connection, in
+            addition to urllib3's defaults (which disable Nagle's algorithm).
+        **kwargs: Arguments for :class:`~requests.adapters.HTTPAdapter`, like
+            `pool_connections`, `pool_maxsize` and `pool_block`.
+    """
+
+    def __init__(
+        self, socket_options: Optional[List[SocketOption]] = None, **kwargs: Any
+    ) -> None:
+        self.socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def init_poolmanager(
+        self, connections: int, maxsize: int, block: bool = False, **pool_kwargs: Any
+    ) -> None:
+        if self.socket_options:
+            pool_kwargs['socket_options'] = (
+                HTTPConnection.default_socket_options + self.socket_options
+            )
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+
 
 class Site:
     """A MediaWiki site identified by its hostname.
@@ -38,8 +98,8 @@ class Site:
         ext: The file extension used by the MediaWiki API scripts. Defaults to `.php`.
         pool: A preexisting :class:`~requests.Session` to be used when executing API
             requests. When this is set, the `client_certificate`, `clients_useragent`,
-            `custom_headers`, `http_auth` and all OAuth related parameters are all
-            ignored.
+            `custom_headers`, `http_auth`, connection pool and socket related
+            parameters and all OAuth related parameters are all ignored.
         retry_timeout: The number of seconds to sleep for each past retry of a failing API
             request. Defaults to `30`.
         max_retries: The maximum number of retries to perform for failing API requests.
@@ -52,8 +112,9 @@ class Site:
         max_lag: A `maxlag` parameter to be used in `index.php` calls. Consult the
             `documentation <https://www.mediawiki.org/wiki/Manual:Maxlag_parameter>`_ for
             more information. Defaults to `3`.
-        compress: Whether to request and accept gzip compressed API responses. Defaults to
-             `True`.
+        compress: Whether to request and accept compressed API responses. zstd and
+            Brotli are preferred to gzip when the `zstandard` and `brotli` packages
+            are installed. Defaults to `True`.
         force_login: Whether to require authentication when editing pages. Set to `False`
             to allow unauthenticated edits. Defaults to `True`.
         do_init: Whether to automatically initialize the :py:class:`Site` on
@@ -78,6 +139,26 @@ class Site:
             API requests.
         scheme: The URI scheme to use. This should be either `http` or `https` in
             most cases. Defaults to `https`.
+        pool_connections: The number of hosts to keep connection pools for. Defaults
+            to `10`.
+        pool_maxsize: The maximum number of connections kept open per host. This
+            should be at least the number of threads sharing the site. Defaults to
+            `10`.
+        pool_block: Whether to wait for a connection to be returned to the pool when
+            `pool_maxsize` connections are in use, instead of opening a new one that
+            is discarded afterwards. Defaults to `False`.
+        tcp_keepalive: Whether to enable TCP keep-alive probes, so that idle pooled
+            connections are not silently dropped by firewalls or load balancers.
+            Defaults to `False`.
+        socket_options: Additional options passed to `setsockopt` for each new
+            connection, as `(level, option, value)` tuples.
+        transport: The :class:`~mwclient.transport.Transport` used to send the
+            requests, for example an :class:`~mwclient.transport.HttpxTransport` to
+            use HTTP/2. Defaults to sending them with the `requests` session.
+        tracer: A :class:`~mwclient.tracing.Tracer` to record spans for requests,
+            listings, edits and uploads, for example an
+            :class:`~mwclient.tracing.OpenTelemetryTracer`. Defaults to recording
+            nothing.
 
     Raises:
         RuntimeError: The authentication passed to the `httpauth` parameter is invalid.
@@ -88,6 +169,8 @@ class Site:
             most common error code is "Failed", indicating a wrong username or password.
     """  # noqa: E501
     api_limit = 500
+    # Tokens fetched along with the user info by site_init() when logged in
+    init_token_types = ('csrf',)  # type: Tuple[str, ...]
 
     def __init__(
         self,
@@ -117,7 +200,14 @@ class Site:
         client_certificate: Optional[Union[str, Tuple[str, str]]] = None,
         custom_headers: Optional[Mapping[str, str]] = None,
         scheme: str = 'https',
-        reqs: Optional[MutableMapping[str, Any]] = None
+        reqs: Optional[MutableMapping[str, Any]] = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        tcp_keepalive: bool = False,
+        socket_options: Optional[List[SocketOption]] = None,
+        transport: Optional[Transport] = None,
+        tracer: Optional[Tracer] = None
     ) -> None:
         # Setup member variables
         self.host = host
@@ -128,6 +218,13 @@ class Site:
         self.max_lag = str(max_lag)
         self.force_login = force_login
         self.logged_in = False
+        self._oauth = consumer_token is not None
+        # Guards the user state updated from API responses
+        self._state_lock = threading.Lock()
+        # Guards self.tokens, so that only one thread fetches a missing token
+        self._token_lock = threading.RLock()
+        # Guards the removal of cookies, for cookie jars that have no lock of their own
+        self._cookie_lock = threading.Lock()
         if reqs and connection_options:
             raise ValueError(
                 "reqs is a deprecated alias of connection_options. Do not specify both."
@@ -144,6 +241,9 @@ class Site:
             self.requests['timeout'] = 30  # seconds
 
         if consumer_token is not None:
+            # Imported here since requests_oauthlib (and oauthlib) are slow to
+            # import and most users never need them.
+            from requests_oauthlib import OAuth1
             auth = OAuth1(consumer_token, consumer_secret, access_token, access_secret)
         elif isinstance(httpauth, (list, tuple)):
             # workaround weird requests default to encode as latin-1
@@ -159,7 +259,17 @@ class Site:
             # FIXME: Raise a specific exception instead of a generic RuntimeError.
             raise RuntimeError('Authentication is not a tuple or an instance of AuthBase')
 
-        self.sleepers = Sleepers(max_retries, retry_timeout, wait_callback)
+        # Callables called with an event dict after each HTTP request ('request'),
+        # after each API call ('api') and before each retry sleep ('sleep')
+        self.hooks = {
+            'request': [], 'api': [], 'sleep': []
+        }  # type: Dict[str, List[Callable[[Dict[str, Any]], Any]]]
+        self._stats = Stats()
+        self.hooks['request'].append(self._stats.record_request)
+        self.hooks['sleep'].append(self._stats.record_sleep)
+
+        self.sleepers = Sleepers(max_retries, retry_timeout, wait_callback,
+                                 self.hooks['sleep'])
 
         # Site properties
         self.blocked = False  # type: Union[Tuple[str, str], bool]  # Is user blocked?
@@ -187,8 +297,25 @@ class Site:
 
             if custom_headers:
                 self.connection.headers.update(custom_headers)
+
+            options = list(socket_options or [])
+            if tcp_keepalive:
+                options += keepalive_socket_options()
+            adapter = PoolAdapter(socket_options=options,
+                                  pool_connections=pool_connections,
+                                  pool_maxsize=pool_maxsize, pool_block=pool_block)
+            self.connection.mount('https://', adapter)
+            self.connection.mount('http://', adapter)
         else:
             self.connection = pool
+        self.transport = transport or RequestsTransport()
+        self.transport.attach(self.connection)
+        self.tracer = tracer if tracer is not None else NoopTracer()  # type: Tracer
+
+        # Whether listings parse API responses incrementally (requires ijson)
+        self.stream_listings = False
+        # How listings convert the timestamps of items, see listing.List
+        self.listing_timestamps = 'struct_time'
 
         # Page generators
         self.pages = listing.PageList(self)
@@ -220,20 +347,40 @@ class Site:
     def site_init(self) -> None:
         """Populates the object with information about the current user and site. This is
         done automatically when creating the object, unless explicitly disabled using the
-        `do_init=False` constructor argument."""
+        `do_init=False` constructor argument.
+
+        When the user is logged in, the tokens listed in `init_token_types` are
+        fetched as part of the same request."""
 
         if self.initialized:
-            info = self.get('query', meta='userinfo', uiprop='groups|rights')
-            userinfo = info['query']['userinfo']
-            self.username = userinfo['name']
-            self.groups = userinfo.get('groups', [])
-            self.rights = userinfo.get('rights', [])
-            self.tokens = {}
+            kwargs = {}  # type: Dict[str, Any]
+            if self.require(1, 24, raise_error=False):
+                kwargs['meta'] = 'userinfo|tokens'
+                kwargs['type'] = '|'.join(self.init_token_types)
+            else:
+                kwargs['meta'] = 'userinfo'
+            # The tokens of the previous user are replaced while no other thread
+            # fetches tokens, which would then be stale
+            with self._token_lock:
+                info = self.get('query', uiprop='groups|rights', **kwargs)
+                userinfo = info['query']['userinfo']
+                self.username = userinfo['name']
+                self.groups = userinfo.get('groups', [])
+                self.rights = userinfo.get('rights', [])
+                self.tokens = {}
+                self._store_init_tokens(info)
             return
 
-        meta = self.get('query', meta='siteinfo|userinfo',
-                        siprop='general|namespaces', uiprop='groups|rights',
-                        retry_on_error=False)
+        kwargs = {}
+        if self._oauth:
+            # OAuth requests are authenticated from the start, so the tokens
+            # can be fetched right away.
+            kwargs['meta'] = 'siteinfo|userinfo|tokens'
+            kwargs['type'] = '|'.join(self.init_token_types)
+        else:
+            kwargs['meta'] = 'siteinfo|userinfo'
+        meta = self.get('query', siprop='general|namespaces', uiprop='groups|rights',
+                        retry_on_error=False, **kwargs)
 
         # Extract site info
         self.site = meta['query']['general']
@@ -252,8 +399,121 @@ class Site:
         self.username = userinfo['name']
         self.groups = userinfo.get('groups', [])
         self.rights = userinfo.get('rights', [])
+        with self._token_lock:
+            self._store_init_tokens(meta)
         self.initialized = True
 
+    def _store_init_tokens(self, info: Mapping[str, Any]) -> None:
+        """Store the tokens fetched by :meth:`site_init`, if the user is logged in."""
+        userinfo = info['query']['userinfo']
+        tokens = info['query'].get('tokens', {})
+        if 'anon' in userinfo:
+            return
+        for type in self.init_token_types:
+            if f'{type}token' in tokens:
+                self.tokens[type] = tokens[f'{type}token']
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Capture the state of an initialized site, so that it can be restored
+        later without any network calls using :meth:`from_snapshot`.
+
+        The snapshot is a dictionary that can be serialized as JSON. It contains
+        the site and user info, the cached tokens and the session cookies, so
+        it grants the same access as the session itself and should be stored
+        accordingly. Credentials passed to :meth:`login` are not included.
+
+        Example:
+            >>> with open('site.json', 'w') as fd:
+            ...     json.dump(site.snapshot(), fd)
+
+        Returns:
+            The snapshot.
+        """
+        cookies = [
+            {
+                'name': cookie.name,
+                'value': cookie.value,
+                'domain': cookie.domain,
+                'path': cookie.path,
+                'secure': cookie.secure,
+                'expires': cookie.expires,
+            }
+            for cookie in self.connection.cookies
+        ]
+        return {
+            'created': time.time(),
+            'host': self.host,
+            'path': self.path,
+            'ext': self.ext,
+            'scheme': self.scheme,
+            'initialized': self.initialized,
+            'site': getattr(self, 'site', None),
+            'namespaces': {str(k): v for k, v in self.namespaces.items()},
+            'version': list(self.version) if self.version is not None else None,
+            'username': getattr(self, 'username', None),
+            'logged_in': self.logged_in,
+            'groups': list(self.groups),
+            'rights': list(self.rights),
+            'tokens': dict(self.tokens),
+            'cookies': cookies,
+        }
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        snapshot: Mapping[str, Any],
+        max_age: Optional[float] = None,
+        revalidate: bool = False,
+        **kwargs: Any
+    ) -> 'Site':
+        """Create a site from a snapshot taken by :meth:`snapshot`.
+
+        Unless the snapshot is expired or `revalidate` is set, no network calls
+        are made.
+
+        Example:
+            >>> with open('site.json') as fd:
+            ...     site = Site.from_snapshot(json.load(fd), max_age=3600)
+
+        Args:
+            snapshot: The snapshot.
+            max_age: The maximum age of the snapshot in seconds. An older snapshot
+                only provides the session cookies, and the site is initialized
+                again from the API.
+            revalidate: Refresh the user info (and thereby check that the session
+                is still valid) using a single API call.
+            **kwargs: Additional arguments for the :class:`Site` constructor, for
+                instance `clients_useragent` or `connection_options`.
+
+        Returns:
+            The restored site.
+        """
+        site = cls(snapshot['host'], path=snapshot['path'], ext=snapshot['ext'],
+                   scheme=snapshot['scheme'], do_init=False, **kwargs)
+        for cookie in snapshot['cookies']:
+            site.connection.cookies.set(**cookie)
+
+        if max_age is not None and time.time() - snapshot['created'] > max_age:
+            site.site_init()
+            return site
+
+        if snapshot['site'] is not None:
+            site.site = snapshot['site']
+        site.namespaces = {int(k): v for k, v in snapshot['namespaces'].items()}
+        if snapshot['version'] is not None:
+            site.version = tuple(snapshot['version'])
+        if snapshot['username'] is not None:
+            site.username = snapshot['username']
+        site.logged_in = snapshot['logged_in']
+        site.groups = list(snapshot['groups'])
+        site.rights = list(snapshot['rights'])
+        site.tokens = dict(snapshot['tokens'])
+        site.initialized = snapshot['initialized']
+
+        if revalidate:
+            site.site_init()
+        return site
+
     @staticmethod
     def version_tuple_from_generator(
         string: str, prefix: str = 'MediaWiki '
@@ -330,6 +590,78 @@ class Site:
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__} object '{self.host}{self.path}'>"
 
+    def connection_stats(self) -> Dict[str, Dict[str, int]]:
+        """Report how well connections are reused, per host.
+
+        Example:
+            >>> site.connection_stats()
+            {'https://en.wikipedia.org:443': {'connections': 2, 'requests': 120,
+                                              'reused': 118}}
+
+        Returns:
+            For each host with a connection pool, the number of `connections`
+            opened, the number of `requests` sent and how many of those `reused`
+            an already open connection.
+        """
+        stats = {}  # type: Dict[str, Dict[str, int]]
+        for adapter in set(self.connection.adapters.values()):
+            manager = getattr(adapter, 'poolmanager', None)
+            if manager is None:
+                continue
+            for key in manager.pools.keys():
+                pool = manager.pools.get(key)
+                if pool is None:
+                    continue
+                host = stats.setdefault(f'{pool.scheme}://{pool.host}:{pool.port}',
+                                        {'connections': 0, 'requests': 0, 'reused': 0})
+                host['connections'] += pool.num_connections
+                host['requests'] += pool.num_requests
+                host['reused'] += max(pool.num_requests - pool.num_connections, 0)
+        return stats
+
+    def clear_cookies(self, predicate: Callable[[Cookie], bool]) -> None:
+        """Remove the cookies of the session for which `predicate` returns True.
+
+        The cookie jar is shared by all the threads using the site, and responses
+        may store cookies in it while they are removed, so the jar is locked
+        while it is read and the cookies are cleared.
+
+        Args:
+            predicate: A function called with each cookie of the session.
+        """
+        cookies = self.connection.cookies
+        # The lock of http.cookiejar.CookieJar, also taken when cookies are stored
+        lock = getattr(cookies, '_cookies_lock', self._cookie_lock)
+        with lock:
+            for cookie in [cookie for cookie in cookies if predicate(cookie)]:
+                cookies.clear(cookie.domain, cookie.path, cookie.name)
+
+    def stats(self, reset: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Report the requests sent by this site, per API action.
+
+        Example:
+            >>> site.stats()['query']
+            {'requests': 120, 'retries': 1, 'errors': 1, 'sleeps': 1,
+             'sleep_time': 3, 'bytes_sent': 15360, 'bytes_received': 9830400,
+             'latency': {'total': 30.2, 'mean': 0.25, 'p50': 0.21, 'p90': 0.4,
+                         'p99': 1.3, 'max': 1.5}}
+
+        Args:
+            reset: Whether to start over after reporting.
+
+        Returns:
+            For each action, the number of HTTP `requests` sent, how many of them
+            were `retries` and how many failed (`errors`), the number of `sleeps`
+            and the `sleep_time` spent waiting before retries, the approximate size
+            of the parameters sent (`bytes_sent`), the size of the decoded
+            responses (`bytes_received`) and request `latency` statistics in
+            seconds. See :class:`~mwclient.stats.Stats`.
+        """
+        stats = self._stats.summary()
+        if reset:
+            self._stats.reset()
+        return stats
+
     def get(self, action: str, *args: Tuple[str, Any], **kwargs: Any) -> Dict[str, Any]:
         """Perform a generic API call using GET.
 
@@ -406,7 +738,76 @@ class Site:
             The raw response from the API call, as a dictionary.
         """
         kwargs.update(args)
+        self._add_query_defaults(action, kwargs)
+
+        sleeper = self.sleepers.make()
 
+        while True:
+            info = self.raw_api(action, http_method, **kwargs)
+            if not info:
+                info = {}
+            if self.handle_api_result(info, sleeper=sleeper):
+                return info
+
+    def api_stream(
+        self,
+        action: str,
+        path: Sequence[str],
+        http_method: str = 'GET',
+        *args: Tuple[str, Any],
+        **kwargs: Any
+    ) -> Generator[Any, None, Dict[str, Any]]:
+        """Perform a generic API call, parsing the response as it is downloaded.
+
+        Yields the items of the member at `path` of the response one at a time,
+        so that large responses never need to be held in memory at once. Once the
+        items are exhausted, the rest of the response is checked for errors like
+        :meth:`api` does, and returned as the value of the generator. Requires the
+        `ijson` package.
+
+        Example:
+            >>> results = site.api_stream('query', ('query', 'pages', '*', 'revisions'),
+            ...                           prop='revisions', titles='Oslo',
+            ...                           rvprop='content', rvlimit=50)
+            >>> for revision in results:
+            ...     print(len(revision['*']))
+
+        Args:
+            action: The MediaWiki API action to be performed.
+            path: The keys leading to the list or object whose items are yielded.
+                `'*'` matches any key.
+            http_method: The HTTP method to use.
+            *args: Tupled key-value pairs to be passed to the `api.php` script
+                as data.
+            **kwargs: Arguments to be passed to the API call.
+
+        Returns:
+            The rest of the response, without the streamed items.
+        """
+        kwargs.update(args)
+        self._add_query_defaults(action, kwargs)
+        kwargs['action'] = action
+        kwargs['format'] = 'json'
+        data = self._query_string(**kwargs)
+
+        sleeper = self.sleepers.make()
+
+        while True:
+            response = self.raw_request('api', data, http_method=http_method,
+                                        stream=True)
+            # Closed even if the caller stops early, so that the connection
+            # returns to the pool
+            try:
+                items = ItemStream(response.iter_content(65536), path)
+                yield from items
+            finally:
+                response.close()
+            info = items.data or {}
+            if self.handle_api_result(info, sleeper=sleeper):
+                return info
+
+    @staticmethod
+    def _add_query_defaults(action: str, kwargs: Dict[str, Any]) -> None:
         # this enables new-style continuation in mediawiki 1.21
         # through 1.25, can be dropped when we bump baseline to 1.26
         if action == 'query' and 'continue' not in kwargs:
@@ -421,15 +822,6 @@ class Site:
             else:
                 kwargs['uiprop'] = 'blockinfo|hasmsg'
 
-        sleeper = self.sleepers.make()
-
-        while True:
-            info = self.raw_api(action, http_method, **kwargs)
-            if not info:
-                info = {}
-            if self.handle_api_result(info, sleeper=sleeper):
-                return info
-
     def handle_api_result(
         self,
         info: Mapping[str, Any],
@@ -456,13 +848,14 @@ class Site:
             userinfo = info['query']['userinfo']
         except KeyError:
             userinfo = {}
-        if 'blockedby' in userinfo:
-            self.blocked = (userinfo['blockedby'], userinfo.get('blockreason', ''))
-        else:
-            self.blocked = False
-        self.hasmsg = 'messages' in userinfo
-        if userinfo:
-            self.logged_in = 'anon' not in userinfo
+        with self._state_lock:
+            if 'blockedby' in userinfo:
+                self.blocked = (userinfo['blockedby'], userinfo.get('blockreason', ''))
+            else:
+                self.blocked = False
+            self.hasmsg = 'messages' in userinfo
+            if userinfo:
+                self.logged_in = 'anon' not in userinfo
         if 'warnings' in info:
             for module, warning in info['warnings'].items():
                 if '*' in warning:
@@ -517,6 +910,8 @@ class Site:
         """
         Perform a generic request and return the raw text.
 
+        See :meth:`raw_request`, which returns the response itself.
+
         In the event of a network problem, or an HTTP response with status code 5XX,
         we'll wait and retry the configured number of times before giving up
         if `retry_on_error` is True.
@@ -535,6 +930,45 @@ class Site:
         Returns:
             The raw text response.
 
+        Raises:
+            errors.MaximumRetriesExceeded: The API request failed and the maximum number
+                of retries was exceeded.
+            requests.exceptions.HTTPError: Received an invalid HTTP response, or a status
+                code in the 4xx range.
+            requests.exceptions.ConnectionError: Encountered an unexpected error while
+                performing the API request.
+            requests.exceptions.Timeout: The API request timed out.
+        """
+        return self.raw_request(script, data, files, retry_on_error,
+                                http_method).text
+
+    def raw_request(
+        self,
+        script: str,
+        data: Mapping[str, Any],
+        files: Optional[Mapping[str, Union[BinaryIO, Tuple[str, BinaryIO]]]] = None,
+        retry_on_error: bool = True,
+        http_method: str = 'POST',
+        stream: bool = False
+    ) -> Response:
+        """
+        Perform a generic request and return the response.
+
+        Retries are handled like in :meth:`raw_call`. With `stream`, the body is not
+        downloaded until it is read, for example using `iter_content()`; errors
+        while reading it are not retried.
+
+        Args:
+            script: Script name, usually 'api'.
+            data: Post data
+            files: Files to upload
+            retry_on_error: Retry on connection error
+            http_method: The HTTP method, defaults to 'POST'
+            stream: Whether to stream the response body.
+
+        Returns:
+            The response, as returned by the transport.
+
         Raises:
             errors.MaximumRetriesExceeded: The API request failed and the maximum number
                 of retries was exceeded.
@@ -546,7 +980,7 @@ class Site:
         """
         headers = {}
         if self.compress:
-            headers['Accept-Encoding'] = 'gzip'
+            headers['Accept-Encoding'] = ', '.join(self.transport.encodings)
         sleeper = self.sleepers.make((script, data))
 
         scheme = self.scheme
@@ -571,28 +1005,30 @@ class Site:
                 args['params'] = data
             else:
                 args['data'] = data
+            if stream:
+                args['stream'] = True
 
             try:
-                stream = self.connection.request(http_method, url, **args)
-                if stream.headers.get('x-database-lag'):
+                response = self._send(http_method, url, data, sleeper, args)
+                if response.headers.get('x-database-lag'):
                     wait_time = int(
-                        stream.headers.get('retry-after')  # type: ignore[arg-type]
+                        response.headers.get('retry-after')  # type: ignore[arg-type]
                     )
                     log.warning('Database lag exceeds max lag. '
                                 'Waiting for %d seconds', wait_time)
                     # fall through to the sleep
-                elif stream.status_code == 200:
-                    return stream.text
+                elif response.status_code == 200:
+                    return response
                 elif (
-                    (stream.status_code < 500 or stream.status_code > 599)
-                    and stream.status_code != 429  # 429 Too Many Requests is retryable
+                    (response.status_code < 500 or response.status_code > 599)
+                    and response.status_code != 429  # 429 Too Many Requests is retryable
                 ):
-                    stream.raise_for_status()
+                    response.raise_for_status()
                 else:
                     if not retry_on_error:
-                        stream.raise_for_status()
+                        response.raise_for_status()
                     log.warning('Received %d response: %s. Retrying in a moment.',
-                                stream.status_code, stream.text)
+                                response.status_code, response.text)
                     toraise = "stream"
                     # fall through to the sleep
 
@@ -611,15 +1047,81 @@ class Site:
 
             # all retry paths come here
             try:
-                sleeper.sleep(wait_time)
+                with self.tracer.span('mwclient.sleep', {
+                    'mwclient.retries': sleeper.retries + 1,
+                    'mwclient.maxlag': bool(wait_time),
+                }) as span:
+                    slept = sleeper.slept
+                    sleeper.sleep(wait_time)
+                    span.set_attribute('mwclient.sleep_time', sleeper.slept - slept)
             except errors.MaximumRetriesExceeded:
                 if toraise == "stream":
-                    stream.raise_for_status()
+                    response.raise_for_status()
                 elif toraise and isinstance(toraise, BaseException):
                     raise toraise
                 else:
                     raise
 
+    def _send(
+        self,
+        http_method: str,
+        url: str,
+        data: Mapping[str, Any],
+        sleeper: Sleeper,
+        args: Dict[str, Any]
+    ) -> Response:
+        """Send a request with the transport, tracing it and reporting it to the
+        request hooks."""
+        hooks = self.hooks['request']
+        attributes = {
+            'http.request.method': http_method,
+            'url.full': url,
+            'mwclient.action': data.get('action', ''),
+            'mwclient.retries': sleeper.retries,
+        }
+        with self.tracer.span('mwclient.request', attributes) as span:
+            if not hooks:
+                response = self.transport.request(http_method, url, **args)
+                span.set_attribute('http.response.status_code', response.status_code)
+                return response
+
+            event = {
+                'url': url,
+                'action': data.get('action'),
+                'http_method': http_method,
+                'status': None,
+                'error': None,
+                # Approximate, since it is measured before URL encoding
+                'bytes_sent': sum(len(str(k)) + len(str(v)) + 2
+                                  for k, v in data.items() if v is not None),
+                'bytes_received': None,
+                'latency': 0.0,
+                'retries': sleeper.retries,
+            }  # type: Dict[str, Any]
+            start = time.monotonic()
+            try:
+                response = self.transport.request(http_method, url, **args)
+                event['status'] = response.status_code
+                if args.get('stream'):
+                    length = response.headers.get('content-length')
+                    event['bytes_received'] = int(length) if length else None
+                else:
+                    event['bytes_received'] = len(response.content)
+                return response
+            except Exception as e:
+                event['error'] = type(e).__name__
+                raise
+            finally:
+                event['latency'] = time.monotonic() - start
+                for hook in hooks:
+                    hook(event)
+                if event['status'] is not None:
+                    span.set_attribute('http.response.status_code', event['status'])
+                span.set_attribute('mwclient.bytes_sent', event['bytes_sent'])
+                if event['bytes_received'] is not None:
+                    span.set_attribute('mwclient.bytes_received',
+                                       event['bytes_received'])
+
     def raw_api(
         self,
         action: str,
@@ -657,16 +1159,31 @@ class Site:
         kwargs['action'] = action
         kwargs['format'] = 'json'
         data = self._query_string(*args, **kwargs)
+        start = time.monotonic()
         res = self.raw_call('api', data, retry_on_error=retry_on_error,
                             http_method=http_method)
+        parse_start = time.monotonic()
 
         try:
-            return cast(Dict[str, Any], json.loads(res, object_pairs_hook=OrderedDict))
+            info = cast(Dict[str, Any], json.loads(res, object_pairs_hook=OrderedDict))
         except ValueError:
             if res.startswith('MediaWiki API is not enabled for this site.'):
                 raise errors.APIDisabledError
             raise errors.InvalidResponse(res)
 
+        if self.hooks['api']:
+            end = time.monotonic()
+            event = {
+                'action': action,
+                'http_method': http_method,
+                'latency': end - start,
+                'parse_time': end - parse_start,
+                'length': len(res),
+            }
+            for hook in self.hooks['api']:
+                hook(event)
+        return info
+
     def raw_index(
         self,
         action: str,
@@ -761,6 +1278,82 @@ class Site:
             raise NotImplementedError
 
     # Actions
+    def check_pages(
+        self,
+        titles: Iterable[str],
+        actions: Iterable[str] = ('edit',)
+    ) -> Dict[str, Dict[str, Any]]:
+        """Check whether many pages exist, their protection and whether the current
+        user can carry out `actions` on them, like :meth:`Page.can()
+        <mwclient.page.Page.can>`.
+
+        The titles are queried 50 at a time with `prop=info`. From MediaWiki 1.25,
+        the permissions are tested by the API (`intestactions`), which also takes
+        blocks and other restrictions into account. On older versions, they are
+        computed from the protection of the pages and :attr:`rights`.
+
+        Example:
+            >>> for title, check in site.check_pages(titles, ('edit', 'move')).items():
+            ...     if check['exists'] and check['can']['edit']:
+            ...         fix(title)
+
+        Args:
+            titles: The titles to check.
+            actions: The actions to check the permission for.
+
+        Returns:
+            A dict per title, containing the normalized `title`, whether it is
+            `invalid`, whether the page `exists`, its `pageid`, its `protection`
+            (like :attr:`Page.protection <mwclient.page.Page.protection>`) and the
+            permission for each action (`can`).
+        """
+        actions = list(actions)
+        test_actions = self.version is not None and self.version[:2] >= (1, 25)
+        titles = list(titles)
+        result = {}  # type: Dict[str, Dict[str, Any]]
+        for i in range(0, len(titles), 50):
+            batch = titles[i:i + 50]
+            kwargs = {'prop': 'info', 'inprop': 'protection',
+                      'titles': '|'.join(batch)}
+            if test_actions:
+                kwargs['intestactions'] = '|'.join(actions)
+            query = self.get('query', **kwargs).get('query', {})
+            normalized = {n['from']: n['to'] for n in query.get('normalized', ())}
+            pages = {info['title']: info for info in query.get('pages', {}).values()}
+            for title in batch:
+                name = normalized.get(title, title)
+                info = pages.get(name, {'invalid': ''})
+                protection = {
+                    p['type']: (p['level'], p.get('expiry'))
+                    for p in info.get('protection', ())
+                    if p
+                }
+                invalid = 'invalid' in info
+                if invalid:
+                    can = {action: False for action in actions}
+                elif test_actions:
+                    # With formatversion=2, each action is true or false; the
+                    # legacy format has an empty string for allowed actions
+                    allowed = info.get('actions', {})
+                    can = {action: allowed.get(action) in (True, '')
+                           for action in actions}
+                else:
+                    can = {}
+                    for action in actions:
+                        level = protection.get(action, (action,))[0]
+                        if level == 'sysop':
+                            level = 'editprotected'
+                        can[action] = level in self.rights
+                result[title] = {
+                    'title': name,
+                    'invalid': invalid,
+                    'exists': not invalid and 'missing' not in info,
+                    'pageid': info.get('pageid'),
+                    'protection': protection,
+                    'can': can,
+                }
+        return result
+
     def email(
         self, user: str, text: str, subject: str, cc: bool = False
     ) -> Dict[str, Any]:
@@ -951,6 +1544,22 @@ class Site:
         else:
             raise errors.LoginError(self, status, response['clientlogin'].get('message'))
 
+    def _token_type(self, type: str) -> str:
+        """Return the token type to request for a `type` of action."""
+        if self.version is None or self.require(1, 24, raise_error=False):
+            # The 'csrf' (cross-site request forgery) token introduced in 1.24 replaces
+            # the majority of older tokens, like edittoken and movetoken.
+            if type not in {
+                'watch',
+                'patrol',
+                'rollback',
+                'userrights',
+                'login',
+                'createaccount',
+            }:
+                type = 'csrf'
+        return type
+
     def get_token(
         self, type: str, force: bool = False, title: Optional[str] = None
     ) -> str:
@@ -969,47 +1578,106 @@ class Site:
         Raises:
             errors.APIError: A token of the given type could not be retrieved.
         """
-        if self.version is None or self.require(1, 24, raise_error=False):
-            # The 'csrf' (cross-site request forgery) token introduced in 1.24 replaces
-            # the majority of older tokens, like edittoken and movetoken.
-            if type not in {
-                'watch',
-                'patrol',
-                'rollback',
-                'userrights',
-                'login',
-                'createaccount',
-            }:
-                type = 'csrf'
+        type = self._token_type(type)
+
+        with self._token_lock:
+            if type not in self.tokens:
+                self.tokens[type] = '0'
+
+            if self.tokens.get(type, '0') == '0' or force:
+                if self.version is None or self.require(1, 24, raise_error=False):
+                    # We use raw_api() rather than api() because api() is adding
+                    # "userinfo" to the query and this raises a readapideniederror if
+                    # the wiki is read protected, and we're trying to fetch a login
+                    # token.
+                    info = self.raw_api('query', 'GET', meta='tokens', type=type)
+
+                    self.handle_api_result(info)
+
+                    # Note that for read protected wikis, we don't know the version
+                    # when fetching the login token. If it's < 1.27, the request below
+                    # will raise a KeyError that we should catch.
+                    self.tokens[type] = info['query']['tokens'][f'{type}token']
+
+                else:
+                    if title is None:
+                        # Some dummy title was needed to get a token prior to 1.24
+                        title = 'Test'
+                    info = self.post('query', titles=title,
+                                     prop='info', intoken=type)
+                    for i in info['query']['pages'].values():
+                        if i['title'] == title:
+                            self.tokens[type] = i[f'{type}token']
+
+            return self.tokens[type]
+
+    def prefetch_tokens(
+        self,
+        types: Iterable[str] = ('csrf', 'patrol', 'rollback', 'watch'),
+        force: bool = False
+    ) -> Dict[str, str]:
+        """Request several types of MediaWiki access tokens at once.
+
+        On MediaWiki 1.24 and above, all the tokens that have not been cached
+        yet are fetched with a single API call. On older versions, they are
+        fetched one by one using :meth:`get_token`.
+
+        Example:
+            >>> site.prefetch_tokens(['edit', 'patrol', 'rollback'])
+            {'csrf': '...', 'patrol': '...', 'rollback': '...'}
 
-        if type not in self.tokens:
-            self.tokens[type] = '0'
+        Args:
+            types: The types of tokens to request.
+            force: Force the request of new tokens, even if tokens of these types
+                have already been cached.
 
-        if self.tokens.get(type, '0') == '0' or force:
-            if self.version is None or self.require(1, 24, raise_error=False):
-                # We use raw_api() rather than api() because api() is adding "userinfo"
-                # to the query and this raises a readapideniederror if the wiki is read
-                # protected, and we're trying to fetch a login token.
-                info = self.raw_api('query', 'GET', meta='tokens', type=type)
+        Returns:
+            The requested tokens, keyed by token type.
 
+        Raises:
+            errors.APIError: The tokens could not be retrieved.
+        """
+        types = list(OrderedDict.fromkeys(self._token_type(type) for type in types))
+
+        if self.version is not None and not self.require(1, 24, raise_error=False):
+            return {type: self.get_token(type, force) for type in types}
+
+        with self._token_lock:
+            missing = [
+                type for type in types if force or self.tokens.get(type, '0') == '0'
+            ]
+            if missing:
+                info = self.raw_api('query', 'GET', meta='tokens',
+                                    type='|'.join(missing))
                 self.handle_api_result(info)
+                for type in missing:
+                    self.tokens[type] = info['query']['tokens'][f'{type}token']
 
-                # Note that for read protected wikis, we don't know the version when
-                # fetching the login token. If it's < 1.27, the request below will
-                # raise a KeyError that we should catch.
-                self.tokens[type] = info['query']['tokens'][f'{type}token']
+            return {type: self.tokens[type] for type in types}
 
-            else:
-                if title is None:
-                    # Some dummy title was needed to get a token prior to 1.24
-                    title = 'Test'
-                info = self.post('query', titles=title,
-                                 prop='info', intoken=type)
-                for i in info['query']['pages'].values():
-                    if i['title'] == title:
-                        self.tokens[type] = i[f'{type}token']
+    def refresh_token(
+        self, type: str, stale: str, title: Optional[str] = None
+    ) -> str:
+        """Replace a token that was rejected by the API with a `badtoken` error.
 
-        return self.tokens[type]
+        When several threads get a `badtoken` error for the same token, only the
+        first one requests a new token. The others get the new token without
+        making another API call.
+
+        Args:
+            type: The type of token to replace.
+            stale: The token that was rejected.
+            title: The page title for which to request a token. Only used for MediaWiki
+                versions below 1.24.
+
+        Returns:
+            A fresh MediaWiki token of the requested `type`.
+        """
+        with self._token_lock:
+            current = self.tokens.get(self._token_type(type), '0')
+            if current not in ('0', stale):
+                return current
+            return self.get_token(type, force=True, title=title)
 
     def upload(
         self,
@@ -1086,6 +1754,31 @@ class Site:
                 "exactly one of 'file', 'filekey' and 'url' must be specified"
             )
 
+        attributes = {'mwclient.filename': filename}  # type: Dict[str, Any]
+        if file is not None:
+            if not hasattr(file, 'read'):
+                file = open(file, 'rb')
+            file = cast(BinaryIO, file)
+            attributes['mwclient.file_size'] = file.seek(0, 2)
+            file.seek(0)
+        with self.tracer.span('mwclient.upload', attributes) as span:
+            response = self._upload(file, filename, description, ignore, url,
+                                    filekey, comment, asynchronous, stash)
+            span.set_attribute('mwclient.result', response.get('result', ''))
+            return response
+
+    def _upload(
+        self,
+        file: Optional[BinaryIO],
+        filename: str,
+        description: str,
+        ignore: bool,
+        url: Optional[str],
+        filekey: Optional[str],
+        comment: Optional[str],
+        asynchronous: bool,
+        stash: bool
+    ) -> Dict[str, Any]:
         image = self.Images[filename]
         if not image.can('upload'):
             raise errors.InsufficientPermission(filename)
@@ -1098,19 +1791,13 @@ class Site:
             text = description
 
         if file is not None:
-            if not hasattr(file, 'read'):
-                file = open(file, 'rb')
-
-            # Narrowing the type of file from Union[str, BinaryIO, None]
-            # to BinaryIO, since we know it's not a str at this point.
-            file = cast(BinaryIO, file)
-
             content_size = file.seek(0, 2)
             file.seek(0)
 
             if (self.require(1, 20, raise_error=False)
                     and content_size > self.chunk_size):
-                return self.chunk_upload(file, filename, ignore, comment, text)
+                return self.chunk_upload(file, filename, ignore, comment, text,
+                                         stash=stash)
 
         predata = {
             'action': 'upload',
@@ -1180,7 +1867,8 @@ class Site:
         filename: str,
         ignorewarnings: bool,
         comment: str,
-        text: Optional[str]
+        text: Optional[str],
+        stash: bool = False
     ) -> Dict[str, Any]:
         """Upload a file to the site in chunks.
 
@@ -1194,6 +1882,9 @@ class Site:
             ignorewarnings: True to upload despite any warnings.
             comment: Upload comment.
             text: Initial page text for new files.
+            stash: If set, the assembled file is left in the stash and the
+                response containing its `filekey` is returned, instead of
+                publishing the file.
         """
         image = self.Images[filename]
 
@@ -1230,6 +1921,8 @@ class Site:
                 params['offset'] = response['offset']
             elif response['result'] == 'Success':
                 file.close()
+                if stash:
+                    return response
                 break
             else:
                 # Some kind or error or warning occurred. In any case, we do not
@@ -1245,6 +1938,147 @@ class Site:
         params['text'] = text
         return self.post('upload', **params)
 
+    def upload_status(self, filekey: str) -> Dict[str, Any]:
+        """Check the status of an asynchronous upload.
+
+        API doc: https://www.mediawiki.org/wiki/API:Upload
+
+        Args:
+            filekey: The filekey of the stashed file that was published with
+                `asynchronous=True`.
+
+        Returns:
+            The `upload` part of the API response. Its `result` is `Poll` while
+            the upload is still being processed.
+        """
+        info = self.post('upload', filekey=filekey, checkstatus='1',
+                         token=self.get_token('edit'))
+        return cast(Dict[str, Any], info.get('upload', {}))
+
+    def bulk_upload(
+        self,
+        files: Iterable[Tuple[Any, ...]],
+        description: str = '',
+        comment: Optional[str] = None,
+        ignore: bool = False,
+        max_workers: int = 4,
+        min_interval: float = 0.0,
+        poll_interval: float = 5.0,
+        max_polls: int = 60
+    ) -> Generator[Dict[str, Any], None, None]:
+        """Upload many files, stashing them concurrently and publishing them
+        asynchronously.
+
+        Each file goes through two stages. It is first uploaded to the stash
+        (see the `stash` argument of :meth:`upload`), and once stashed it is
+        published using its `filekey` and `asynchronous=True`. The status of the
+        asynchronous publication is then polled using :meth:`upload_status`
+        until the server has finished processing it. Both stages run on a pool of
+        `max_workers` threads, so files are stashed while others are published.
+
+        Files are read from `files` lazily, so it can be a generator over a
+        large batch. At most `2 * max_workers` files are in flight at once.
+
+        Example:
+            >>> files = [('scan1.tif', 'Scan 1.tif'), ('scan2.tif', 'Scan 2.tif')]
+            >>> for outcome in site.bulk_upload(files, description='A scan'):
+            ...     print(outcome['filename'], outcome['result'])
+
+        Args:
+            files: `(file, filename)` or `(file, filename, description)` tuples,
+                where `file` is a path or a file object, as accepted by
+                :meth:`upload`.
+            description: Wikitext for the file description pages, unless
+                given per file.
+            comment: Upload comment.
+            ignore: True to upload despite any warnings.
+            max_workers: The number of files to process concurrently.
+            min_interval: The minimum number of seconds between two API calls
+                made by the pipeline.
+            poll_interval: The number of seconds to wait between two checks of
+                the status of an asynchronous upload.
+            max_polls: The maximum number of status checks per file before
+                giving up on it.
+
+        Yields:
+            One dict per file, in order of completion, containing the
+            `filename`, the `stage` (`stash` or `publish`) the file reached,
+            its `result` (`Success`, `Warning`, `Poll` or `Error`), the API
+            `response` and, if an exception was raised, the `error`.
+        """
+        throttle = Throttle(min_interval)
+
+        def stash(
+            file: Union[str, BinaryIO], filename: str, text: str
+        ) -> Dict[str, Any]:
+            throttle.wait()
+            return self.upload(file, filename, text, ignore=ignore,
+                               comment=comment, stash=True)
+
+        def publish(filekey: str, filename: str, text: str) -> Dict[str, Any]:
+            throttle.wait()
+            response = self.upload(filename=filename, description=text,
+                                   ignore=ignore, filekey=filekey, comment=comment,
+                                   asynchronous=True)
+            polls = 0
+            while response.get('result') == 'Poll' and polls < max_polls:
+                if stopped.wait(poll_interval):
+                    break
+                throttle.wait()
+                response = self.upload_status(filekey)
+                polls += 1
+            return response
+
+        def outcome(
+            filename: str, stage: str, future: 'Future[Dict[str, Any]]'
+        ) -> Dict[str, Any]:
+            try:
+                response = future.result()
+            except Exception as e:
+                return {'filename': filename, 'stage': stage, 'result': 'Error',
+                        'response': {}, 'error': e}
+            return {'filename': filename, 'stage': stage,
+                    'result': response.get('result'), 'response': response}
+
+        pending = {}  # type: Dict[Future[Dict[str, Any]], Tuple[str, str, str]]
+        todo = iter(files)
+        exhausted = False
+        # Set when the caller stops iterating, to end the status polls
+        stopped = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            while True:
+                while not exhausted and len(pending) < 2 * max_workers:
+                    try:
+                        item = next(todo)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    file, filename = item[0], item[1]
+                    text = item[2] if len(item) > 2 else description
+                    future = executor.submit(stash, file, filename, text)
+                    pending[future] = ('stash', filename, text)
+                if not pending:
+                    return
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, filename, text = pending.pop(future)
+                    result = outcome(filename, stage, future)
+                    if stage == 'stash' and result['result'] == 'Success':
+                        filekey = result['response']['filekey']
+                        future = executor.submit(publish, filekey, filename, text)
+                        pending[future] = ('publish', filename, text)
+                    else:
+                        yield result
+        finally:
+            # If the generator is closed early, the files not started yet are
+            # dropped and the ones in progress are not waited for
+            stopped.set()
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=not pending)
+
     def parse(
         self,
         text: Optional[str] = None,
@@ -1354,11 +2188,27 @@ class Site:
         generator: bool = True,
         end: Optional[str] = None,
         max_items: Optional[int] = None,
-        api_chunk_size: Optional[int] = None
+        api_chunk_size: Optional[int] = None,
+        lightweight: bool = False,
+        extra_properties: Optional[Mapping[str, Iterable[Tuple[str, str]]]] = None
     ) -> listing.List:
         """
         Retrieve all pages on the wiki as a generator.
 
+        With `lightweight=True` (and `generator=True`), compact
+        :class:`~mwclient.listing.PageRecord` objects are yielded instead of pages,
+        which is useful to hold a large number of them in memory.
+
+        With `extra_properties` (and `generator=True`), more prop modules are
+        requested along with the pages, and their results are set as the
+        `properties` of the pages:
+
+            >>> for page in site.allpages(extra_properties={
+            ...         'categories': [('cllimit', 'max')],
+            ...         'pageprops': [],
+            ...         }):
+            ...     print(page.name, page.properties.get('categories', []))
+
         API doc: https://www.mediawiki.org/wiki/API:Allpages
         """
 
@@ -1370,6 +2220,11 @@ class Site:
             namespace=namespace, filterredir=filterredir, dir=dir,
             filterlanglinks=filterlanglinks,
         ))
+        if generator and (lightweight or extra_properties):
+            return listing.GeneratorList(self, 'allpages', 'ap', max_items=max_items,
+                                         api_chunk_size=api_chunk_size,
+                                         lightweight=lightweight,
+                                         extra_properties=extra_properties, **kwargs)
         return listing.List.get_list(generator)(self, 'allpages', 'ap',
                                                 max_items=max_items,
                                                 api_chunk_size=api_chunk_size,
@@ -1705,6 +2560,54 @@ class Site:
         return listing.List(self, 'recentchanges', 'rc', max_items=max_items,
                             api_chunk_size=api_chunk_size, **kwargs)
 
+    def resolve_redirects(
+        self,
+        titles: Iterable[str],
+        table: Optional[RedirectTable] = None
+    ) -> Dict[str, Optional[str]]:
+        """Resolve the redirects of many titles, following chains of redirects.
+
+        The titles are queried 50 at a time, and their targets are found using the
+        `normalized` and `redirects` maps of the responses.
+
+        Example:
+            >>> site.resolve_redirects(['UK', 'united_Kingdom', 'Paris'])
+            {'UK': 'United Kingdom', 'united_Kingdom': 'United Kingdom',
+             'Paris': 'Paris'}
+
+        Args:
+            titles: The titles to resolve.
+            table: A :class:`~mwclient.redirects.RedirectTable` of the site. The
+                titles found in it are resolved without requests, as are all the
+                titles once it is loaded.
+
+        Returns:
+            The final target of each title, the normalized title if it is not a
+            redirect, or None if its chain of redirects loops.
+        """
+        result = {}  # type: Dict[str, Optional[str]]
+        batch = []  # type: List[str]
+        for title in titles:
+            if table is not None and (title in table or table.complete):
+                result[title] = follow_redirects(title, table.targets)
+                continue
+            batch.append(title)
+            if len(batch) == 50:
+                self._resolve_redirects(batch, result)
+                batch = []
+        if batch:
+            self._resolve_redirects(batch, result)
+        return result
+
+    def _resolve_redirects(
+        self, titles: List[str], result: Dict[str, Optional[str]]
+    ) -> None:
+        query = self.get('query', titles='|'.join(titles), redirects='').get('query', {})
+        normalized = {n['from']: n['to'] for n in query.get('normalized', ())}
+        redirects = {r['from']: r['to'] for r in query.get('redirects', ())}
+        for title in titles:
+            result[title] = follow_redirects(normalized.get(title, title), redirects)
+
     def revisions(
         self,
         revids: List[Union[int, str]],
@@ -0,0 +1,116 @@
+"""Column-oriented batches of listing items, see :meth:`List.batches()
+<mwclient.listing.List.batches>`.
+
+The `numpy` and `arrow` formats require the `numpy` and `pyarrow` packages.
+"""
+from array import array
+from typing import Any, Dict, List, Mapping, Optional, Sequence  # noqa: F401
+
+BATCH_FORMATS = ('list', 'array', 'numpy', 'arrow')
+
+# Fields of API items holding integers, which are stored in 64-bit integer columns.
+# Timestamps are converted to seconds since the epoch by List.batches().
+INTEGER_FIELDS = frozenset({
+    'pageid', 'ns', 'revid', 'parentid', 'old_revid', 'rcid', 'logid', 'userid',
+    'size', 'oldlen', 'newlen', 'length', 'lastrevid', 'timestamp',
+})
+
+
+class ColumnBuilder:
+    """Accumulates items into one list per column and converts them to a batch.
+
+    Args:
+        columns: The fields of the items to keep. Defaults to the fields of the
+            first item appended.
+        format: The type of the batches returned by :meth:`build`:
+
+            - `'list'`: a dict of lists.
+            - `'array'`: a dict of `array.array('q')` for the integer fields and
+              lists for the others.
+            - `'numpy'`: a dict of NumPy arrays, of `int64` for the integer fields
+              and of objects for the others.
+            - `'arrow'`: a PyArrow `RecordBatch`.
+        missing: The value of integer fields missing from an item, for the
+            `'array'` and `'numpy'` formats. They are null in PyArrow batches and
+            None in lists.
+    """
+
+    def __init__(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        format: str = 'array',
+        missing: int = -1
+    ) -> None:
+        if format not in BATCH_FORMATS:
+            raise ValueError(
+                f'Unknown batch format {format!r}, '
+                f'expected one of {", ".join(BATCH_FORMATS)}'
+            )
+        if format == 'numpy':
+            try:
+                import numpy  # noqa: F401
+            except ImportError:
+                raise ImportError('NumPy batches require the numpy package: '
+                                  'pip install numpy')
+        elif format == 'arrow':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ImportError('Arrow batches require the pyarrow package: '
+                                  'pip install pyarrow')
+        self.format = format
+        self.missing = missing
+        self.columns = None  # type: Optional[List[str]]
+        self.values = {}  # type: Dict[str, List[Any]]
+        if columns is not None:
+            self._set_columns(columns)
+
+    def _set_columns(self, columns: Sequence[str]) -> None:
+        self.columns = list(columns)
+        self.values = {name: [] for name in self.columns}
+
+    def append(self, item: Mapping[str, Any]) -> None:
+        if self.columns is None:
+            self._set_columns(list(item))
+        for name, values in self.values.items():
+            values.append(item.get(name))
+
+    def __len__(self) -> int:
+        for values in self.values.values():
+            return len(values)
+        return 0
+
+    def build(self) -> Any:
+        """Returns the batch of the items appended since the last call."""
+        values = self.values
+        self.values = {name: [] for name in values}
+        if self.format == 'list':
+            return values
+        if self.format == 'arrow':
+            import pyarrow
+            return pyarrow.RecordBatch.from_pydict({
+                name: pyarrow.array(column, pyarrow.int64())
+                if name in INTEGER_FIELDS else column
+                for name, column in values.items()
+            })
+
+        columns = {}  # type: Dict[str, Any]
+        for name, column in values.items():
+            if name in INTEGER_FIELDS:
+                missing = self.missing
+                columns[name] = array('q', [
+                    missing if value is None else value for value in column
+                ])
+            else:
+                columns[name] = column
+        if self.format == 'numpy':
+            import numpy
+            for name, column in columns.items():
+                if isinstance(column, array):
+                    # Shares the memory of the array
+                    columns[name] = numpy.frombuffer(column, numpy.int64)
+                else:
+                    objects = numpy.empty(len(column), object)
+                    objects[:] = column
+                    columns[name] = objects
+        return columns
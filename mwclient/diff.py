@@ -0,0 +1,205 @@
+"""Client-side diffs of revision contents.
+
+Unlike :meth:`Page.revisions(diffto=...) <mwclient.page.Page.revisions>`, which
+has the wiki render HTML diffs, the diffs are computed locally with
+:mod:`difflib` from the texts of the revisions, and returned as lists of
+operations:
+
+    >>> diff_texts('a\\nthe cat\\nc', 'a\\nthe black dog\\nc')
+    [{'op': 'replace', 'old_start': 1, 'old': ['the cat'], 'new_start': 1,
+      'new': ['the black dog'],
+      'words': [{'op': 'replace', 'old': 'cat', 'new': 'black dog'}]}]
+
+Line numbers start at 0. Unchanged lines are left out.
+"""
+import re
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import (  # noqa: F401
+    Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple,
+    TYPE_CHECKING
+)
+
+if TYPE_CHECKING:
+    import mwclient.client
+
+# Words, runs of spaces, and runs of other characters
+WORD_PATTERN = re.compile(r'\w+|\s+|[^\w\s]+')
+
+
+def diff_lines(old: str, new: str) -> List[Dict[str, Any]]:
+    """Returns the lines inserted, deleted or replaced between two texts.
+
+    Each operation is a dict with the keys `op` (`'insert'`, `'delete'` or
+    `'replace'`), `old_start`, `old` (the old lines), `new_start` and `new`.
+    """
+    if old == new:
+        return []
+    old_lines = old.splitlines()
+    new_lines = new.splitlines()
+    matcher = SequenceMatcher(None, old_lines, new_lines)
+    return [
+        {'op': op, 'old_start': i1, 'old': old_lines[i1:i2],
+         'new_start': j1, 'new': new_lines[j1:j2]}
+        for op, i1, i2, j1, j2 in matcher.get_opcodes() if op != 'equal'
+    ]
+
+
+def diff_words(old: str, new: str) -> List[Dict[str, Any]]:
+    """Returns the words inserted, deleted or replaced between two texts, as
+    dicts with the keys `op`, `old` and `new`, the old and new strings."""
+    if old == new:
+        return []
+    old_words = WORD_PATTERN.findall(old)
+    new_words = WORD_PATTERN.findall(new)
+    matcher = SequenceMatcher(None, old_words, new_words, autojunk=False)
+    return [
+        {'op': op, 'old': ''.join(old_words[i1:i2]), 'new': ''.join(new_words[j1:j2])}
+        for op, i1, i2, j1, j2 in matcher.get_opcodes() if op != 'equal'
+    ]
+
+
+def diff_texts(old: str, new: str, words: bool = True) -> List[Dict[str, Any]]:
+    """Returns the line diff of two texts, as :func:`diff_lines`.
+
+    Args:
+        old: The old text.
+        new: The new text.
+        words: Whether to add the word diff of the lines of each `'replace'`
+            operation, under the key `words`.
+    """
+    ops = diff_lines(old, new)
+    if words:
+        for op in ops:
+            if op['op'] == 'replace':
+                op['words'] = diff_words('\n'.join(op['old']), '\n'.join(op['new']))
+    return ops
+
+
+def revision_text(revision: Mapping[str, Any]) -> Optional[str]:
+    """Returns the text of a revision as returned by the API, with or without
+    slots, or None if it is hidden or was not requested."""
+    content = revision['slots'].get('main', {}) if 'slots' in revision else revision
+    return content.get('*')
+
+
+def diff_revisions(
+    old: Mapping[str, Any], new: Mapping[str, Any], words: bool = True
+) -> List[Dict[str, Any]]:
+    """Returns the diff of the texts of two revisions, as :func:`diff_texts`.
+
+    If both revisions have a `sha1` and they are equal, the texts are not
+    compared. A hidden text is taken as empty.
+    """
+    if old.get('sha1') is not None and old.get('sha1') == new.get('sha1'):
+        return []
+    return diff_texts(revision_text(old) or '', revision_text(new) or '', words)
+
+
+def diff_history(
+    revisions: Iterable[Mapping[str, Any]], words: bool = True
+) -> Iterator[Tuple[Mapping[str, Any], Mapping[str, Any], List[Dict[str, Any]]]]:
+    """Yields an `(old, new, diff)` tuple for each pair of consecutive revisions.
+
+    Only the previous revision is kept in memory, so this can go through the
+    whole history of a page as it is listed:
+
+        >>> revisions = page.revisions(prop='ids|timestamp|user|sha1|content',
+        ...                            dir='newer', slots='main')
+        >>> for old, new, diff in diff_history(revisions):
+        ...     print(new['user'], sum(len(op['new']) for op in diff))
+
+    Args:
+        revisions: The revisions, from the oldest, with their content.
+        words: Whether to add word diffs, see :func:`diff_texts`.
+    """
+    previous = None  # type: Optional[Mapping[str, Any]]
+    for revision in revisions:
+        if previous is not None:
+            yield previous, revision, diff_revisions(previous, revision, words)
+        previous = revision
+
+
+class RevisionDiffer:
+    """Compares revisions given by ID, fetching their texts in bulk.
+
+    The texts are kept in a least-recently-used cache, so comparing a revision
+    with several others only fetches it once.
+
+    Example:
+        >>> differ = RevisionDiffer(site)
+        >>> diff = differ.compare(1000, 1005)
+        >>> diffs = differ.compare_many([(1000, 1001), (1001, 1002)])
+
+    Args:
+        site: The site the revisions belong to.
+        cache_size: The number of texts cached.
+    """
+
+    def __init__(self, site: 'mwclient.client.Site', cache_size: int = 500) -> None:
+        self.site = site
+        self.cache_size = cache_size
+        # (sha1, text) of each revision, by revid
+        self._cache = OrderedDict()  # type: OrderedDict[int, Tuple[Optional[str], str]]
+
+    def fetch(self, revids: Iterable[int]) -> None:
+        """Fetches the texts of the revisions that are not cached, 50 per request."""
+        missing = [revid for revid in dict.fromkeys(revids) if revid not in self._cache]
+        for i in range(0, len(missing), 50):
+            args = {
+                'prop': 'revisions', 'revids': '|'.join(map(str, missing[i:i + 50])),
+                'rvprop': 'ids|sha1|content',
+            }  # type: Dict[str, Any]
+            if self.site.version is not None and self.site.version[:2] > (1, 31):
+                args['rvslots'] = 'main'
+            continue_ = {}  # type: Dict[str, Any]
+            while True:
+                data = self.site.get('query', **args, **continue_)
+                for page in data.get('query', {}).get('pages', {}).values():
+                    for revision in page.get('revisions', ()):
+                        self._add(revision['revid'], revision.get('sha1'),
+                                  revision_text(revision) or '')
+                continue_ = data.get('continue') or {}
+                if not continue_:
+                    break
+
+    def _add(self, revid: int, sha1: Optional[str], text: str) -> None:
+        self._cache[revid] = (sha1, text)
+        self._cache.move_to_end(revid)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _get(self, revid: int) -> Tuple[Optional[str], str]:
+        if revid not in self._cache:
+            self.fetch([revid])
+        # Deleted or nonexistent revisions have no text
+        entry = self._cache.get(revid, (None, ''))
+        if revid in self._cache:
+            self._cache.move_to_end(revid)
+        return entry
+
+    def text(self, revid: int) -> str:
+        """Returns the text of a revision, fetching it if it is not cached."""
+        return self._get(revid)[1]
+
+    def compare(self, old: int, new: int, words: bool = True) -> List[Dict[str, Any]]:
+        """Returns the diff between two revisions, see :func:`diff_texts`."""
+        self.fetch([old, new])
+        old_sha1, old_text = self._get(old)
+        new_sha1, new_text = self._get(new)
+        if old_sha1 is not None and old_sha1 == new_sha1:
+            return []
+        return diff_texts(old_text, new_text, words)
+
+    def compare_many(
+        self, pairs: Sequence[Tuple[int, int]], words: bool = True
+    ) -> List[List[Dict[str, Any]]]:
+        """Returns the diffs between pairs of revisions, fetching the texts that
+        are not cached together, as many as fit in the cache at a time."""
+        diffs = []  # type: List[List[Dict[str, Any]]]
+        size = max(self.cache_size // 2, 1)
+        for i in range(0, len(pairs), size):
+            batch = pairs[i:i + size]
+            self.fetch(revid for pair in batch for revid in pair)
+            diffs.extend(self.compare(old, new, words) for old, new in batch)
+        return diffs
@@ -0,0 +1,335 @@
+"""Reading of MediaWiki XML dumps, without the API.
+
+Dumps compressed with bzip2 or gzip are supported, as are dumps compressed with
+zstd if the `zstandard <https://pypi.org/project/zstandard/>`_ package is
+installed. The XML is parsed incrementally, so that memory use does not depend on
+the size of the dump.
+"""
+import bz2
+import gzip
+import io
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor  # noqa: F401
+from typing import (  # noqa: F401
+    Any, BinaryIO, Callable, Deque, Dict, Iterator, List, Optional, Tuple, Union
+)
+from xml.etree import ElementTree
+
+from mwclient.util import timestamp_parser
+
+
+def open_dump(path: str) -> BinaryIO:
+    """Opens a file for reading, decompressing it according to its extension
+    (`.bz2`, `.gz` or `.zst`)."""
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rb')  # type: ignore[return-value]
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')  # type: ignore[return-value]
+    if path.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError('Reading zstd dumps requires the zstandard package: '
+                              'pip install zstandard')
+        return zstandard.ZstdDecompressor().stream_reader(
+            open(path, 'rb'), closefd=True
+        )
+    return open(path, 'rb')
+
+
+class DumpPage:
+    """A page read from a dump, with the attributes of :class:`~mwclient.page.Page`
+    that can be known from it.
+
+    Only the latest revision read is kept. :meth:`text` returns its text, and
+    :meth:`revisions` returns it in the same form as
+    :meth:`Page.revisions() <mwclient.page.Page.revisions>`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        namespace: int,
+        pageid: Optional[int],
+        redirect_target: Optional[str] = None
+    ) -> None:
+        self.name = name
+        self.namespace = namespace
+        self.pageid = pageid
+        self.redirect = redirect_target is not None
+        self.redirect_target = redirect_target
+        self.exists = True
+        self.latest = None  # type: Optional[Dict[str, Any]]
+
+    @property
+    def revision(self) -> int:
+        return self.latest['revid'] if self.latest else 0
+
+    @property
+    def length(self) -> Optional[int]:
+        return self.latest.get('size') if self.latest else None
+
+    @property
+    def contentmodel(self) -> Optional[str]:
+        return self.latest.get('contentmodel') if self.latest else None
+
+    def text(self) -> str:
+        """Returns the text of the latest revision."""
+        return self.latest.get('*', '') if self.latest else ''
+
+    def revisions(self) -> List[Dict[str, Any]]:
+        """Returns the latest revision, in a list."""
+        return [self.latest] if self.latest else []
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} '{self.name}'>"
+
+
+class DumpReader:
+    """Reads the pages and revisions of an XML dump, such as `pages-articles` or
+    `pages-meta-history`.
+
+    Example:
+        >>> dump = DumpReader('enwiki-latest-pages-articles.xml.bz2')
+        >>> for page in dump:
+        ...     if page.namespace == 0 and not page.redirect:
+        ...         process(page.name, page.text())
+
+    Args:
+        source: The path of the dump, or a binary file object to read it from.
+        timestamps: How the timestamps of revisions are converted, as for
+            :class:`~mwclient.listing.List`. Defaults to `'struct_time'`, like
+            :meth:`Page.revisions() <mwclient.page.Page.revisions>`.
+    """
+
+    def __init__(
+        self, source: Union[str, BinaryIO], timestamps: str = 'struct_time'
+    ) -> None:
+        self.source = source
+        self._parse_timestamp = timestamp_parser(timestamps)
+        # The contents of the siteinfo element, once read
+        self.siteinfo = {}  # type: Dict[str, Any]
+
+    def __iter__(self) -> Iterator[DumpPage]:
+        return self.pages()
+
+    def pages(self) -> Iterator[DumpPage]:
+        """Yields each page, with its latest revision."""
+        for kind, page, revision in self._read():
+            if kind == 'revision':
+                page.latest = revision
+            else:
+                yield page
+
+    def revisions(self) -> Iterator[Tuple[DumpPage, Dict[str, Any]]]:
+        """Yields a `(page, revision)` tuple for each revision, in the order of the
+        dump. In `pages-meta-history` dumps, this is the full history of each page,
+        from the oldest revision. `page.latest` is the previous revision."""
+        for kind, page, revision in self._read():
+            if kind == 'revision':
+                yield page, revision
+                page.latest = revision
+
+    def _read(self) -> Iterator[Tuple[str, DumpPage, Dict[str, Any]]]:
+        if isinstance(self.source, str):
+            with open_dump(self.source) as f:
+                yield from self._parse(f)
+        else:
+            yield from self._parse(self.source)
+
+    def _parse(self, f: BinaryIO) -> Iterator[Tuple[str, DumpPage, Dict[str, Any]]]:
+        # Elements are removed from their parent once read, so that the tree
+        # built by iterparse() never holds more than one revision
+        stack = []  # type: List[ElementTree.Element]
+        meta = {}  # type: Dict[str, Any]
+        page = None  # type: Optional[DumpPage]
+        revision = {}  # type: Dict[str, Any]
+        for event, elem in ElementTree.iterparse(f, events=('start', 'end')):
+            tag = elem.tag.rpartition('}')[2]
+            if event == 'start':
+                stack.append(elem)
+                if tag == 'page':
+                    meta = {}
+                    page = None
+                elif tag == 'revision':
+                    revision = {}
+                    if page is None:
+                        page = self._make_page(meta)
+                continue
+
+            stack.pop()
+            parent = stack[-1].tag.rpartition('}')[2] if stack else None
+            if parent == 'page':
+                if tag == 'redirect':
+                    meta['redirect'] = elem.get('title')
+                else:
+                    meta[tag] = elem.text
+            elif parent == 'revision':
+                self._read_revision_field(revision, tag, elem)
+            elif parent == 'contributor':
+                if elem.text is not None:
+                    if tag == 'username':
+                        revision['user'] = elem.text
+                    elif tag == 'id':
+                        revision['userid'] = int(elem.text)
+                    elif tag == 'ip':
+                        revision['user'] = elem.text
+                        revision['anon'] = ''
+            elif parent == 'namespaces' and tag == 'namespace':
+                self.siteinfo.setdefault('namespaces', {})[int(elem.get('key', 0))] = \
+                    elem.text or ''
+            elif parent == 'siteinfo' and tag != 'namespaces':
+                self.siteinfo[tag] = elem.text
+
+            if tag == 'revision':
+                yield 'revision', page, revision  # type: ignore[misc]
+            elif tag == 'page':
+                if page is None:
+                    page = self._make_page(meta)
+                yield 'page', page, {}
+            if tag in ('revision', 'page', 'siteinfo') and stack:
+                stack[-1].remove(elem)
+
+    @staticmethod
+    def _make_page(meta: Dict[str, Any]) -> DumpPage:
+        return DumpPage(meta.get('title', ''), int(meta.get('ns') or 0),
+                        int(meta['id']) if meta.get('id') else None,
+                        meta.get('redirect'))
+
+    def _read_revision_field(
+        self, revision: Dict[str, Any], tag: str, elem: ElementTree.Element
+    ) -> None:
+        text = elem.text
+        if tag == 'id':
+            revision['revid'] = int(text or 0)
+        elif tag == 'parentid':
+            revision['parentid'] = int(text or 0)
+        elif tag == 'timestamp':
+            if self._parse_timestamp is not None:
+                revision['timestamp'] = self._parse_timestamp(text)
+            else:
+                revision['timestamp'] = text
+        elif tag == 'minor':
+            revision['minor'] = ''
+        elif tag == 'comment':
+            if elem.get('deleted'):
+                revision['commenthidden'] = ''
+            else:
+                revision['comment'] = text or ''
+        elif tag == 'contributor':
+            if elem.get('deleted'):
+                revision['userhidden'] = ''
+        elif tag == 'model':
+            revision['contentmodel'] = text
+        elif tag == 'format':
+            revision['contentformat'] = text
+        elif tag == 'sha1':
+            revision['sha1'] = text
+        elif tag == 'text':
+            if elem.get('bytes') is not None:
+                revision['size'] = int(elem.get('bytes', 0))
+            if elem.get('deleted'):
+                revision['texthidden'] = ''
+            else:
+                revision['*'] = text or ''
+
+
+def _read_stream(
+    path: str,
+    offset: int,
+    timestamps: str,
+    function: Optional[Callable[[DumpPage], Any]]
+) -> List[Any]:
+    # Decompresses the bz2 stream at offset, which holds <page> elements only
+    decompressor = bz2.BZ2Decompressor()
+    data = [b'<mediawiki>']
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        while not decompressor.eof:
+            chunk = f.read(65536)
+            if not chunk:
+                break
+            data.append(decompressor.decompress(chunk))
+    data.append(b'</mediawiki>')
+    reader = DumpReader(io.BytesIO(b''.join(data)), timestamps)
+    if function is None:
+        return list(reader.pages())
+    return [function(page) for page in reader.pages()]
+
+
+class MultistreamDump:
+    """Reads a multistream dump on several processes.
+
+    Multistream dumps, like `pages-articles-multistream.xml.bz2`, are made of
+    independent bzip2 streams of 100 pages, whose offsets are listed in the index
+    file distributed along with them. Each process decompresses and parses a
+    stream at a time.
+
+    Example:
+        >>> dump = MultistreamDump(
+        ...     'enwiki-latest-pages-articles-multistream.xml.bz2',
+        ...     'enwiki-latest-pages-articles-multistream-index.txt.bz2')
+        >>> for length in dump.pages(processes=8, function=count_links):
+        ...     ...
+
+    Args:
+        path: The path of the dump.
+        index_path: The path of the index, optionally compressed.
+        timestamps: How the timestamps of revisions are converted, see
+            :class:`DumpReader`.
+    """
+
+    def __init__(self, path: str, index_path: str, timestamps: str = 'struct_time'):
+        self.path = path
+        self.index_path = index_path
+        self.timestamps = timestamps
+
+    def offsets(self) -> List[int]:
+        """Returns the offsets of the streams of pages, from the index."""
+        offsets = set()
+        with open_dump(self.index_path) as f:
+            for line in io.TextIOWrapper(f, encoding='utf-8'):
+                # offset:pageid:title
+                offset, _, _ = line.partition(':')
+                if offset:
+                    offsets.add(int(offset))
+        return sorted(offsets)
+
+    def pages(
+        self,
+        processes: Optional[int] = None,
+        function: Optional[Callable[[DumpPage], Any]] = None
+    ) -> Iterator[Any]:
+        """Yields the pages of the dump, in order.
+
+        Args:
+            processes: The number of processes. Defaults to the number of CPUs.
+            function: A function applied to each page in the worker processes,
+                whose results are yielded instead of the pages, to avoid sending
+                them between processes. It must be picklable, i.e. defined at the
+                top level of a module.
+        """
+        offsets = iter(self.offsets())
+        processes = processes or os.cpu_count() or 1
+        # Only a few streams are read ahead, so that the results waiting to be
+        # yielded do not fill the memory
+        futures = deque()  # type: Deque[Future[List[Any]]]
+        with ProcessPoolExecutor(processes) as executor:
+            try:
+                for offset in offsets:
+                    futures.append(executor.submit(_read_stream, self.path, offset,
+                                                   self.timestamps, function))
+                    if len(futures) >= processes * 2:
+                        break
+                while futures:
+                    results = futures.popleft().result()
+                    next_offset = next(offsets, None)
+                    if next_offset is not None:
+                        futures.append(executor.submit(_read_stream, self.path,
+                                                       next_offset, self.timestamps,
+                                                       function))
+                    yield from results
+            finally:
+                for future in futures:
+                    future.cancel()
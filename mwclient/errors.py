@@ -183,3 +183,16 @@ class InvalidResponse(MwClientError):
 class InvalidPageTitle(MwClientError):
     """Raised when an invalid page title is used."""
     pass
+
+
+class ReplayError(MwClientError):
+    """Raised by :class:`~mwclient.transport.ReplayTransport` when a request was not
+    recorded, or all its recorded responses have already been replayed.
+
+    Attributes:
+        request (str): The request, as used to look it up in the cassette.
+    """
+
+    def __init__(self, request: str) -> None:
+        super().__init__(f'No recorded response left for {request}')
+        self.request = request
@@ -0,0 +1,261 @@
+"""A consumer of the `recentchange` stream of `EventStreams
+<https://wikitech.wikimedia.org/wiki/Event_Platform/EventStreams>`_, with a
+fallback to polling the recent changes of the API."""
+import json
+import logging
+import time
+from typing import (  # noqa: F401
+    Any, Dict, Iterable, Iterator, Optional, TYPE_CHECKING
+)
+
+import requests
+
+from mwclient.util import parse_epoch
+
+if TYPE_CHECKING:
+    import mwclient.client
+
+log = logging.getLogger(__name__)
+
+STREAM_URL = 'https://stream.wikimedia.org/v2/stream/recentchange'
+
+# The properties of the recent changes requested when polling
+RCPROP = 'title|ids|sizes|flags|user|comment|timestamp|loginfo'
+
+
+def parse_events(chunks: Iterable[bytes]) -> Iterator[Dict[str, str]]:
+    """Parses a `text/event-stream` body into events.
+
+    Each event is a dict of the `id`, `event`, `data` and `retry` fields it
+    has. The lines of a multi-line `data` field are joined with newlines.
+
+    Args:
+        chunks: The body, in chunks of any size.
+    """
+    buffer = b''
+    event = {}  # type: Dict[str, str]
+    for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            line = line.rstrip(b'\r')
+            if not line:
+                if event:
+                    yield event
+                event = {}
+                continue
+            if line.startswith(b':'):
+                # A comment, sent to keep the connection alive
+                continue
+            name, _, value = line.decode('utf-8').partition(':')
+            if value.startswith(' '):
+                value = value[1:]
+            if name == 'data' and 'data' in event:
+                event['data'] += '\n' + value
+            elif name in ('id', 'event', 'data', 'retry'):
+                event[name] = value
+
+
+class RecentChangesStream:
+    """Yields the recent changes of a site as they happen.
+
+    The changes are read from the EventStreams `recentchange` stream of the
+    Wikimedia wikis. If the connection is lost, it is reopened with the ID of
+    the last event received, so that no change is missed. Since the stream
+    has the changes of all the wikis, only those of the site are yielded.
+
+    If the stream cannot be read `retries` times in a row, the changes are
+    polled from the API instead, every `poll_interval` seconds, from the last
+    change received. The next poll continues from the last change returned, in
+    the format of the `rccontinue` parameter. After `retry_stream` seconds of
+    polling, the stream is tried again.
+
+    The stream is read with a session of its own, with the User-Agent of the
+    site, so that the authentication, cookies and connection options of the
+    site are not sent to the host of the stream.
+
+    The changes have the format of the stream. The changes polled are converted
+    to it, with the keys `id`, `type`, `namespace`, `title`, `comment`,
+    `timestamp` (in seconds since the epoch), `user`, `bot`, `minor`,
+    `server_name`, `revision`, `length`, `log_type` and `log_action`.
+
+    Example:
+        >>> for change in RecentChangesStream(site):
+        ...     print(change['title'], change['user'])
+
+    Args:
+        site: The site whose changes are yielded.
+        url: The URL of the stream.
+        wiki: The database name of the wiki whose changes are yielded, like
+            `'enwiki'`. Defaults to the changes whose server name is the host
+            of the site.
+        since: The timestamp, in the format of the API, of the first change.
+            Defaults to the changes made from now on.
+        retries: The number of failed connections to the stream after which
+            the changes are polled.
+        poll_interval: The number of seconds between polls.
+        retry_stream: The number of seconds of polling after which the stream is
+            tried again. If None, the stream is not tried again.
+        timeout: The number of seconds without data after which the connection
+            to the stream is reopened. The stream sends a comment every few
+            seconds to keep it alive.
+    """
+
+    def __init__(
+        self,
+        site: 'mwclient.client.Site',
+        url: str = STREAM_URL,
+        wiki: Optional[str] = None,
+        since: Optional[str] = None,
+        retries: int = 3,
+        poll_interval: float = 5.0,
+        retry_stream: Optional[float] = 300.0,
+        timeout: float = 60.0
+    ) -> None:
+        self.site = site
+        self.url = url
+        self.wiki = wiki
+        self.retries = retries
+        self.poll_interval = poll_interval
+        self.retry_stream = retry_stream
+        self.timeout = timeout
+        # Whether the changes are polled rather than streamed
+        self.polling = False
+        # The ID of the last event of the stream, sent as Last-Event-ID
+        self.last_event_id = None  # type: Optional[str]
+        # The time and ID of the last change of the site
+        self.timestamp = parse_epoch(since)
+        self.rcid = None  # type: Optional[int]
+        # The position of the next poll, as an rccontinue value
+        self.rccontinue = None  # type: Optional[str]
+        # Seconds to wait before reconnecting, as set by the stream
+        self.reconnect_delay = 1.0
+        self.session = requests.Session()
+        user_agent = site.connection.headers.get('User-Agent')
+        if user_agent:
+            self.session.headers['User-Agent'] = user_agent
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        while True:
+            if self.polling:
+                yield from self._poll()
+            else:
+                yield from self._stream()
+
+    def _matches(self, change: Dict[str, Any]) -> bool:
+        if change.get('meta', {}).get('domain') == 'canary':
+            # Events sent to monitor the stream
+            return False
+        if self.wiki is not None:
+            return change.get('wiki') == self.wiki
+        return change.get('server_name') == self.site.host
+
+    def _seen(self, change: Dict[str, Any]) -> None:
+        self.timestamp = change.get('timestamp', self.timestamp)
+        self.rcid = change.get('id', self.rcid)
+
+    def _connect(self) -> Any:
+        headers = {'Accept': 'text/event-stream'}
+        params = {}
+        if self.last_event_id is not None:
+            headers['Last-Event-ID'] = self.last_event_id
+        elif self.timestamp is not None:
+            # since also takes milliseconds since the epoch
+            params['since'] = str(self.timestamp * 1000)
+        response = self.session.get(self.url, params=params, headers=headers,
+                                    auth=None, stream=True, timeout=self.timeout)
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError:
+            response.close()
+            raise
+        return response
+
+    def _stream(self) -> Iterator[Dict[str, Any]]:
+        failures = 0
+        while True:
+            try:
+                response = self._connect()
+                try:
+                    for event in parse_events(response.iter_content(chunk_size=None)):
+                        if 'retry' in event and event['retry'].isdigit():
+                            self.reconnect_delay = int(event['retry']) / 1000
+                        if 'id' in event:
+                            self.last_event_id = event['id']
+                        if event.get('event', 'message') != 'message' or \
+                                not event.get('data'):
+                            continue
+                        change = json.loads(event['data'])
+                        failures = 0
+                        if self._matches(change):
+                            self._seen(change)
+                            yield change
+                finally:
+                    response.close()
+                log.warning('The stream %s was closed. Reconnecting.', self.url)
+            except (requests.exceptions.RequestException, ValueError) as err:
+                log.warning('Could not read the stream %s: %s', self.url, err)
+            failures += 1
+            if failures > self.retries:
+                log.warning('Polling the recent changes instead of reading the stream.')
+                self.polling = True
+                self.last_event_id = None
+                self.rccontinue = None
+                return
+            time.sleep(self.reconnect_delay)
+
+    def _poll(self) -> Iterator[Dict[str, Any]]:
+        started = time.monotonic()
+        if self.timestamp is None:
+            self.timestamp = int(time.time())
+        while True:
+            args = {'list': 'recentchanges', 'rcdir': 'newer', 'rcprop': RCPROP,
+                    'rclimit': 'max'}  # type: Dict[str, Any]
+            if self.rccontinue is not None:
+                args['rccontinue'] = self.rccontinue
+            else:
+                args['rcstart'] = time.strftime('%Y-%m-%dT%H:%M:%SZ',
+                                                time.gmtime(self.timestamp))
+            data = self.site.get('query', **args)
+            for rc in data.get('query', {}).get('recentchanges', ()):
+                timestamp = parse_epoch(rc['timestamp'])
+                # Changes made in the same second as the last one may have
+                # been received already
+                if self.rccontinue is None and timestamp == self.timestamp and \
+                        self.rcid is not None and rc['rcid'] <= self.rcid:
+                    continue
+                change = self._from_api(rc, timestamp)
+                self._seen(change)
+                mw_timestamp = time.strftime('%Y%m%d%H%M%S', time.gmtime(timestamp))
+                self.rccontinue = f"{mw_timestamp}|{rc['rcid'] + 1}"
+                yield change
+            if data.get('continue', {}).get('rccontinue'):
+                self.rccontinue = data['continue']['rccontinue']
+                continue
+            if self.retry_stream is not None and \
+                    time.monotonic() - started >= self.retry_stream:
+                self.polling = False
+                return
+            time.sleep(self.poll_interval)
+
+    def _from_api(self, rc: Dict[str, Any], timestamp: Optional[int]) -> Dict[str, Any]:
+        change = {
+            'id': rc.get('rcid'),
+            'type': rc.get('type'),
+            'namespace': rc.get('ns'),
+            'title': rc.get('title'),
+            'comment': rc.get('comment', ''),
+            'timestamp': timestamp,
+            'user': rc.get('user'),
+            'bot': 'bot' in rc,
+            'minor': 'minor' in rc,
+            'server_name': self.site.host,
+            'revision': {'old': rc.get('old_revid'), 'new': rc.get('revid')},
+            'length': {'old': rc.get('oldlen'), 'new': rc.get('newlen')},
+        }  # type: Dict[str, Any]
+        if 'logtype' in rc:
+            change['log_type'] = rc['logtype']
+            change['log_action'] = rc.get('logaction')
+        if self.wiki is not None:
+            change['wiki'] = self.wiki
+        return change
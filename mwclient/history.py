@@ -0,0 +1,212 @@
+"""Export of the full history of pages to a SQLite database."""
+import sqlite3
+import zlib
+from typing import (  # noqa: F401
+    Any, Dict, Iterable, Iterator, List, Optional, Set, TYPE_CHECKING
+)
+
+if TYPE_CHECKING:
+    import mwclient.client
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS pages (
+    pageid INTEGER PRIMARY KEY,
+    title TEXT NOT NULL UNIQUE,
+    last_revid INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS revisions (
+    revid INTEGER PRIMARY KEY,
+    pageid INTEGER NOT NULL,
+    parentid INTEGER,
+    timestamp TEXT NOT NULL,
+    user TEXT,
+    comment TEXT,
+    minor INTEGER NOT NULL,
+    size INTEGER,
+    sha1 TEXT
+);
+CREATE INDEX IF NOT EXISTS revisions_pageid ON revisions (pageid, revid);
+CREATE TABLE IF NOT EXISTS contents (
+    sha1 TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+'''
+
+COLUMNS = ('revid', 'pageid', 'parentid', 'timestamp', 'user', 'comment', 'minor',
+           'size', 'sha1')
+
+
+class HistoryExporter:
+    """Exports all the revisions of pages to a SQLite database.
+
+    The metadata of the revisions is listed first, up to 500 revisions per
+    request. The content is then only downloaded for the revisions whose SHA-1
+    is not stored yet, 50 revisions per request, so that reverts and other
+    revisions restoring a previous content cost nothing. Each distinct content
+    is stored once, compressed with zlib.
+
+    The last revision exported of each page is recorded with the revisions, so
+    an interrupted export is resumed by calling :meth:`export` again, which also
+    exports the revisions made since.
+
+    Example:
+        >>> with HistoryExporter(site, 'history.sqlite') as exporter:
+        ...     exporter.export(['Main Page', 'Help:Contents'])
+        ...     for revision in exporter.revisions('Main Page'):
+        ...         text = exporter.text(revision['revid'])
+
+    Args:
+        site: The site to export the pages from.
+        path: The path of the database, created if needed.
+        level: The zlib compression level of the content.
+    """
+
+    def __init__(self, site: 'mwclient.client.Site', path: str, level: int = 6) -> None:
+        self.site = site
+        self.level = level
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> 'HistoryExporter':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # Local lookups
+
+    def last_revid(self, title: str) -> Optional[int]:
+        """Returns the ID of the last revision of `title` exported, if any."""
+        row = self.db.execute('SELECT last_revid FROM pages WHERE title = ?',
+                              (title,)).fetchone()
+        return row[0] if row else None
+
+    def revisions(self, title: str) -> Iterator[Dict[str, Any]]:
+        """Yields the exported revisions of `title`, from the oldest, as dicts with
+        the keys `revid`, `pageid`, `parentid`, `timestamp`, `user`, `comment`,
+        `minor`, `size` and `sha1`."""
+        rows = self.db.execute(
+            f'SELECT {", ".join("r." + column for column in COLUMNS)} '
+            'FROM revisions r JOIN pages p ON r.pageid = p.pageid '
+            'WHERE p.title = ? ORDER BY r.revid', (title,)
+        )
+        for row in rows:
+            revision = dict(zip(COLUMNS, row))
+            revision['minor'] = bool(revision['minor'])
+            yield revision
+
+    def text(self, revid: int) -> Optional[str]:
+        """Returns the text of a revision, or None if it was not exported or is
+        hidden."""
+        row = self.db.execute(
+            'SELECT c.data FROM revisions r JOIN contents c ON r.sha1 = c.sha1 '
+            'WHERE r.revid = ?', (revid,)
+        ).fetchone()
+        return zlib.decompress(row[0]).decode('utf-8') if row else None
+
+    # Export
+
+    def export(self, titles: Iterable[str]) -> int:
+        """Exports the revisions of `titles` made since the last export.
+
+        Missing pages are skipped.
+
+        Returns:
+            The number of revisions exported.
+        """
+        count = 0
+        for title in titles:
+            count += self._export_page(title)
+        return count
+
+    def _export_page(self, title: str) -> int:
+        last_revid = self.last_revid(title)
+        args = {
+            'prop': 'revisions', 'titles': title, 'rvdir': 'newer', 'rvlimit': 'max',
+            'rvprop': 'ids|timestamp|flags|user|comment|size|sha1',
+        }  # type: Dict[str, Any]
+        if last_revid is not None:
+            # The revision itself is listed again
+            args['rvstartid'] = last_revid
+        count = 0
+        continue_ = {}  # type: Dict[str, Any]
+        while True:
+            data = self.site.get('query', **args, **continue_)
+            for page in data.get('query', {}).get('pages', {}).values():
+                if 'missing' in page or 'invalid' in page:
+                    continue
+                revisions = [revision for revision in page.get('revisions', ())
+                             if revision['revid'] != last_revid]
+                if revisions:
+                    # The last revision is only recorded with the content, so
+                    # that an interrupted export is resumed from the first
+                    # revision not stored
+                    with self.db:
+                        self._store(page['pageid'], page['title'], revisions)
+                    count += len(revisions)
+            continue_ = data.get('continue') or {}
+            if not continue_:
+                return count
+
+    def _store(self, pageid: int, title: str, revisions: List[Dict[str, Any]]) -> None:
+        # Called in a transaction
+        self.db.executemany(
+            f'INSERT OR REPLACE INTO revisions ({", ".join(COLUMNS)}) '
+            f'VALUES ({", ".join("?" * len(COLUMNS))})',
+            [(revision['revid'], pageid, revision.get('parentid'),
+              revision['timestamp'], revision.get('user'), revision.get('comment'),
+              'minor' in revision, revision.get('size'), revision.get('sha1'))
+             for revision in revisions]
+        )
+
+        # The content of revisions with a hidden text has no SHA-1
+        missing = {}  # type: Dict[int, str]
+        seen = set()  # type: Set[str]
+        for revision in revisions:
+            sha1 = revision.get('sha1')
+            if sha1 is None or sha1 in seen:
+                continue
+            seen.add(sha1)
+            if self.db.execute('SELECT 1 FROM contents WHERE sha1 = ?',
+                               (sha1,)).fetchone() is None:
+                missing[revision['revid']] = sha1
+        revids = list(missing)
+        for i in range(0, len(revids), 50):
+            for revid, text in self._fetch_contents(revids[i:i + 50]):
+                self.db.execute(
+                    'INSERT OR IGNORE INTO contents (sha1, data) VALUES (?, ?)',
+                    (missing[revid], zlib.compress(text.encode('utf-8'), self.level))
+                )
+
+        self.db.execute(
+            'DELETE FROM pages WHERE title = ? AND pageid != ?', (title, pageid)
+        )
+        self.db.execute(
+            'INSERT OR REPLACE INTO pages (pageid, title, last_revid) VALUES (?, ?, ?)',
+            (pageid, title, revisions[-1]['revid'])
+        )
+
+    def _fetch_contents(self, revids: List[int]) -> Iterator[Any]:
+        args = {
+            'prop': 'revisions', 'revids': '|'.join(map(str, revids)),
+            'rvprop': 'ids|content',
+        }  # type: Dict[str, Any]
+        if self.site.version is not None and self.site.version[:2] > (1, 31):
+            args['rvslots'] = 'main'
+        # The API returns the content of fewer revisions when it is too large,
+        # with a continuation for the others
+        continue_ = {}  # type: Dict[str, Any]
+        while True:
+            data = self.site.get('query', **args, **continue_)
+            for page in data.get('query', {}).get('pages', {}).values():
+                for revision in page.get('revisions', ()):
+                    content = revision['slots']['main'] if 'slots' in revision \
+                        else revision
+                    if '*' in content:
+                        yield revision['revid'], content['*']
+            continue_ = data.get('continue') or {}
+            if not continue_:
+                return
@@ -0,0 +1,170 @@
+"""Link graphs of many pages, fetched in batches of titles."""
+from array import array
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor  # noqa: F401
+from itertools import islice
+from typing import (  # noqa: F401
+    Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple,
+    TYPE_CHECKING
+)
+
+from mwclient._types import Namespace
+
+if TYPE_CHECKING:
+    import mwclient.client
+
+# The prefix of the parameters of each supported prop module
+PROP_PREFIXES = {
+    'links': 'pl',
+    'linkshere': 'lh',
+    'templates': 'tl',
+    'transcludedin': 'ti',
+}
+
+
+class LinkGraph:
+    """A graph of the links between pages, stored as arrays of integer node IDs.
+
+    Each title is given a node ID, in order of appearance, and the neighbours of
+    each fetched page are kept in an `array('i')` of node IDs. :meth:`update`
+    fetches the neighbours of many pages per request, using a multi-title query of
+    the `prop` module, and replaces the neighbours previously fetched for them, so
+    the graph can be refreshed incrementally.
+
+    Example:
+        >>> graph = LinkGraph(site, 'links', namespace=0)
+        >>> graph.update(['Python (programming language)', 'Guido van Rossum'])
+        >>> offsets, neighbours = graph.to_csr()
+
+    Args:
+        site: The site to query.
+        prop: `'links'` for the pages linked from each page, `'linkshere'` for the
+            pages linking to it, `'templates'` for the pages it transcludes, or
+            `'transcludedin'` for the pages transcluding it.
+        namespace: Only keep the neighbours in these namespaces, e.g. `0` or
+            `'0|14'`.
+        batch_size: The number of titles per query, at most 50 (500 for bots).
+    """
+
+    def __init__(
+        self,
+        site: 'mwclient.client.Site',
+        prop: str = 'links',
+        namespace: Optional[Namespace] = None,
+        batch_size: int = 50
+    ) -> None:
+        if prop not in PROP_PREFIXES:
+            raise ValueError(
+                f'Unsupported prop module {prop!r}, '
+                f'expected one of {", ".join(PROP_PREFIXES)}'
+            )
+        self.site = site
+        self.prop = prop
+        self.namespace = namespace
+        self.batch_size = batch_size
+        self.titles = []  # type: List[str]
+        self.ids = {}  # type: Dict[str, int]
+        # Neighbours of each node, or None if they were not fetched
+        self.adjacency = []  # type: List[Optional[array[int]]]
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def __contains__(self, title: object) -> bool:
+        return title in self.ids
+
+    def node_id(self, title: str) -> int:
+        """Returns the node ID of `title`, adding a node if needed."""
+        node = self.ids.get(title)
+        if node is None:
+            node = self.ids[title] = len(self.titles)
+            self.titles.append(title)
+            self.adjacency.append(None)
+        return node
+
+    def neighbours(self, title: str) -> List[str]:
+        """Returns the titles of the neighbours of `title`.
+
+        Raises:
+            KeyError: If the neighbours of `title` were not fetched.
+        """
+        node = self.adjacency[self.ids[title]]
+        if node is None:
+            raise KeyError(title)
+        return [self.titles[i] for i in node]
+
+    def edges(self) -> Iterator[Tuple[int, int]]:
+        """Yields the `(node, neighbour)` pairs of node IDs."""
+        for node, neighbours in enumerate(self.adjacency):
+            if neighbours is not None:
+                for neighbour in neighbours:
+                    yield node, neighbour
+
+    def to_csr(self) -> Tuple['array[int]', 'array[int]']:
+        """Returns the graph in compressed sparse row form.
+
+        Returns:
+            `(offsets, neighbours)`, where the neighbours of node `i` are
+            `neighbours[offsets[i]:offsets[i + 1]]`.
+        """
+        offsets = array('q', [0])
+        neighbours = array('i')
+        for node in self.adjacency:
+            if node is not None:
+                neighbours.extend(node)
+            offsets.append(len(neighbours))
+        return offsets, neighbours
+
+    def update(self, titles: Iterable[str], max_workers: int = 1) -> None:
+        """Fetches the neighbours of `titles`, replacing any fetched before.
+
+        The titles are queried in batches of `batch_size`, by `max_workers`
+        threads. The titles are normalized by the API, and nodes are added for
+        the normalized titles.
+        """
+        titles = iter(titles)
+        # The batches are built as they are submitted, and only a few are
+        # submitted ahead, so that a long iterable of titles is not held in memory
+        batches = iter(lambda: list(islice(titles, self.batch_size)), [])
+        futures = deque()  # type: Deque[Future[Dict[str, List[str]]]]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                for batch in islice(batches, max_workers * 2):
+                    futures.append(executor.submit(self._fetch, batch))
+                # Results are merged in the calling thread, in the order of the batches
+                while futures:
+                    result = futures.popleft().result()
+                    batch = next(batches, [])
+                    if batch:
+                        futures.append(executor.submit(self._fetch, batch))
+                    for title, neighbours in result.items():
+                        node = self.node_id(title)
+                        self.adjacency[node] = array(
+                            'i', [self.node_id(neighbour) for neighbour in neighbours]
+                        )
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def _fetch(self, titles: Sequence[str]) -> Dict[str, List[str]]:
+        prefix = PROP_PREFIXES[self.prop]
+        args = {
+            'prop': self.prop,
+            'titles': '|'.join(titles),
+            prefix + 'limit': 'max',
+        }  # type: Dict[str, Any]
+        if self.namespace is not None:
+            args[prefix + 'namespace'] = self.namespace
+
+        # The neighbours of a page can be split over several responses, each one
+        # continuing from the previous one
+        result = {}  # type: Dict[str, List[str]]
+        continue_ = {}  # type: Dict[str, Any]
+        while True:
+            data = self.site.get('query', **args, **continue_)
+            for info in data.get('query', {}).get('pages', {}).values():
+                neighbours = result.setdefault(info['title'], [])
+                neighbours.extend(link['title'] for link in info.get(self.prop, ()))
+            continue_ = data.get('continue') or {}
+            if not continue_:
+                return result
@@ -1,11 +1,18 @@
+import queue
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import (  # noqa: F401
-    Optional, Tuple, Any, Union, Iterator, Mapping, Iterable, Type, Dict
+    Optional, Tuple, Any, Union, Iterator, Mapping, Iterable, Type, Dict, Sequence,
+    Set, Deque
 )
 
 import mwclient.image
 import mwclient.page
 from mwclient._types import Namespace
-from mwclient.util import parse_timestamp, handle_limit
+from mwclient.columnar import ColumnBuilder
+from mwclient.tracing import NOOP_SPAN, Span, current_span  # noqa: F401
+from mwclient.util import handle_limit, parse_epoch, timestamp_parser
 
 
 class List:
@@ -21,6 +28,12 @@ class List:
     always yields one item at a time). limit does the same as
     api_chunk_size for backward compatibility, but is deprecated due
     to its misleading name.
+
+    The `timestamp` of each item is converted as given by `timestamps`: to a
+    `time.struct_time` (`'struct_time'`), an aware UTC `datetime` (`'datetime'`),
+    an int of seconds since the epoch (`'epoch'`), or not at all (`'raw'`), which
+    is the fastest if the timestamps are not used. Defaults to the site's
+    `listing_timestamps` attribute.
     """
 
     def __init__(
@@ -33,6 +46,8 @@ class List:
         max_items: Optional[int] = None,
         api_chunk_size: Optional[int] = None,
         *args: Tuple[str, Any],
+        stream: Optional[bool] = None,
+        timestamps: Optional[str] = None,
         **kwargs: Any
     ) -> None:
         # NOTE: Fix limit
@@ -61,40 +76,142 @@ class List:
         self.last = False
         self.result_member = list_name
         self.return_values = return_values
+        self.stream = stream if stream is not None else site.stream_listings is True
+        if timestamps is None:
+            timestamps = getattr(site, 'listing_timestamps', None)
+            if not isinstance(timestamps, str):
+                timestamps = 'struct_time'
+        self._parse_timestamp = timestamp_parser(timestamps)
+        # Traces the whole iteration, from the first item to StopIteration
+        self._span = None  # type: Optional[Span]
+        self._chunks = 0
 
     def __iter__(self) -> 'List':
         return self
 
     def __next__(self) -> Any:
+        item = self._next_item()
+        if isinstance(self, GeneratorList):
+            return item
+        if type(self.return_values) is tuple:
+            return tuple(item[i] for i in self.return_values)
+        if self.return_values is not None:
+            return item[self.return_values]
+        return item
+
+    def _next_item(self) -> Any:
+        """Returns the next item of the API response, with its timestamp converted."""
+        if self._span is None:
+            self._span = self.site.tracer.start_span(
+                'mwclient.list', current_span(), {'mwclient.list': self.list_name}
+            )
         if self.max_items is not None:
             if self.count >= self.max_items:
+                self._end_span()
                 raise StopIteration
 
         # For filered lists, we might have to do several requests
         # to get the next element due to miser mode.
         # See: https://github.com/mwclient/mwclient/issues/194
-        while True:
-            try:
-                item = next(self._iter)
-                if item is not None:
-                    break
-            except StopIteration:
-                if self.last:
-                    raise
-                self.load_chunk()
+        try:
+            while True:
+                try:
+                    item = next(self._iter)
+                    if item is not None:
+                        break
+                except StopIteration:
+                    if self.last:
+                        raise
+                    self._chunks += 1
+                    if self.stream:
+                        self.load_chunk()
+                        continue
+                    with self.site.tracer.span('mwclient.list.chunk', {
+                        'mwclient.list': self.list_name,
+                        'mwclient.chunk': self._chunks,
+                    }, parent=self._span) as span:
+                        self.load_chunk()
+                        span.set_attribute('mwclient.continues', not self.last)
+        except StopIteration:
+            self._end_span()
+            raise
+        except Exception as e:
+            self._end_span(e)
+            raise
 
         self.count += 1
-        if 'timestamp' in item:
-            item['timestamp'] = parse_timestamp(item['timestamp'])
-
-        if isinstance(self, GeneratorList):
-            return item
-        if type(self.return_values) is tuple:
-            return tuple(item[i] for i in self.return_values)
-        if self.return_values is not None:
-            return item[self.return_values]
+        if self._parse_timestamp is not None and 'timestamp' in item:
+            item['timestamp'] = self._parse_timestamp(item['timestamp'])
         return item
 
+    def batches(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        format: str = 'array',
+        missing: int = -1
+    ) -> Iterator[Any]:
+        """Yield the remaining items in column-oriented batches, one per API response.
+
+        This avoids building a Python object per item for bulk analysis, e.g.
+
+            >>> for batch in site.recentchanges(prop='ids|sizes|timestamp').batches(
+            ...         ['rcid', 'ns', 'newlen', 'timestamp'], format='numpy'):
+            ...     frames.append(pandas.DataFrame(batch))
+
+        The raw API items are used, ignoring `return_values` and the page objects
+        of generator lists, and their timestamps are converted to seconds since the
+        epoch. `max_items` is honoured.
+
+        Args:
+            columns: The fields of the items to keep. Defaults to the fields of the
+                first item.
+            format: `'list'`, `'array'`, `'numpy'` or `'arrow'`, see
+                :class:`~mwclient.columnar.ColumnBuilder`.
+            missing: The value of missing integer fields in `'array'` and
+                `'numpy'` batches.
+        """
+        builder = ColumnBuilder(columns, format, missing)
+        self._parse_timestamp = parse_epoch
+        chunk = self._chunks
+        while True:
+            try:
+                item = self._next_item()
+            except StopIteration:
+                break
+            if self._chunks != chunk and len(builder):
+                yield builder.build()
+            chunk = self._chunks
+            builder.append(item)
+        if len(builder):
+            yield builder.build()
+
+    def close(self) -> None:
+        """Stop the iteration, ending its span and the response being streamed,
+        if any. Called when the listing is garbage collected, e.g. when a loop
+        over it is exited with `break`."""
+        if hasattr(self._iter, 'close'):
+            self._iter.close()
+        self._iter = iter(range(0))
+        self.last = True
+        self._end_span()
+
+    def __del__(self) -> None:
+        # The attributes are missing if __init__ failed, and the modules used may
+        # be gone already during interpreter shutdown
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def _end_span(self, exception: Optional[BaseException] = None) -> None:
+        if self._span is not None and self._span is not NOOP_SPAN:
+            if exception is not None:
+                self._span.record_exception(exception)
+            self._span.set_attribute('mwclient.items', self.count)
+            self._span.set_attribute('mwclient.chunks', self._chunks)
+            self._span.end()
+        self._span = NOOP_SPAN
+
     def load_chunk(self) -> None:
         """Query a new chunk of data
 
@@ -108,6 +225,9 @@ class List:
 
         Else, set `self.last` to True.
         """
+        if self.stream:
+            self._iter = self._stream_chunk()
+            return
         data = self.site.get(
             'query', (self.generator, self.list_name),
             *[(str(k), v) for k, v in self.args.items()]
@@ -128,6 +248,31 @@ class List:
         else:
             self.last = True
 
+    def _stream_chunk(self) -> Iterator[Any]:
+        # The span is not made current, since the items are yielded from it
+        span = self.site.tracer.start_span('mwclient.list.chunk', self._span, {
+            'mwclient.list': self.list_name,
+            'mwclient.chunk': self._chunks,
+        })
+        try:
+            data = yield from self.site.api_stream(
+                'query', self.stream_path(), 'GET', (self.generator, self.list_name),
+                *[(str(k), v) for k, v in self.args.items()]
+            )
+        except Exception as e:
+            span.record_exception(e)
+            raise
+        finally:
+            span.end()
+        if data.get('continue'):
+            self.args.update(data['continue'])
+        else:
+            self.last = True
+
+    def stream_path(self) -> Tuple[str, ...]:
+        """The path of the items in the API response, for `Site.api_stream`."""
+        return ('query', self.result_member)
+
     def set_iter(self, data: Mapping[str, Any]) -> None:
         """Set `self._iter` to the API response `data`."""
         if self.result_member not in data['query']:
@@ -166,6 +311,43 @@ class NestedList(List):
     def set_iter(self, data: Mapping[str, Any]) -> None:
         self._iter = iter(data['query'][self.result_member][self.nested_param])
 
+    def stream_path(self) -> Tuple[str, ...]:
+        return ('query', self.result_member, self.nested_param)
+
+
+class PageRecord:
+    """Compact record of a page, yielded by lightweight generator lists.
+
+    Only the page ID, namespace, title, latest revision ID and length are kept,
+    under the same names as the attributes of :class:`~mwclient.page.Page`, so
+    that millions of records can be held in memory. Use :meth:`page` to get the
+    full page object.
+    """
+    __slots__ = ('site', 'pageid', 'namespace', 'name', 'revision', 'length')
+
+    def __init__(self, site: 'mwclient.client.Site', info: Mapping[str, Any]) -> None:
+        self.site = site
+        self.pageid = info.get('pageid')  # type: Optional[int]
+        self.namespace = info.get('ns', 0)  # type: int
+        self.name = info.get('title', '')  # type: str
+        self.revision = info.get('lastrevid', 0)  # type: int
+        self.length = info.get('length')  # type: Optional[int]
+
+    @property
+    def exists(self) -> bool:
+        return self.pageid is not None
+
+    def page(self) -> Union['mwclient.page.Page', 'mwclient.image.Image', 'Category']:
+        """Fetch the page info and return the Page, Image or Category object."""
+        if self.namespace == 14:
+            return Category(self.site, self.name)
+        if self.namespace == 6:
+            return mwclient.image.Image(self.site, self.name)
+        return mwclient.page.Page(self.site, self.name)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} '{self.name}' for {self.site}>"
+
 
 class GeneratorList(List):
     """Lazy-loaded list of Page, Image or Category objects
@@ -173,6 +355,16 @@ class GeneratorList(List):
     While the standard List class yields raw response data
     (optionally filtered based on the value of List.return_values),
     this subclass turns the data into Page, Image or Category objects.
+
+    With lightweight=True, it yields a PageRecord for each page
+    instead, and only requests the basic page info.
+
+    extra_properties requests more prop modules in the same queries, in
+    the same form as for Page, e.g. {'categories': [('cllimit', 'max')]}.
+    Their results are merged across prop continuations and available in
+    the `properties` attribute of the pages, keyed by module name. The
+    responses are then not streamed, since the pages of a batch must be
+    merged before they are yielded.
     """
 
     def __init__(
@@ -181,6 +373,8 @@ class GeneratorList(List):
         list_name: str,
         prefix: str,
         *args: Tuple[str, Any],
+        lightweight: bool = False,
+        extra_properties: Optional[Mapping[str, Iterable[Tuple[str, str]]]] = None,
         **kwargs: Any
     ) -> None:
         super().__init__(
@@ -191,26 +385,98 @@ class GeneratorList(List):
         del self.args[self.prefix + 'limit']
         self.generator = 'generator'
 
-        self.args['prop'] = 'info|imageinfo'
-        self.args['inprop'] = 'protection'
+        self.lightweight = lightweight
+        if lightweight:
+            self.args['prop'] = 'info'
+        else:
+            self.args['prop'] = 'info|imageinfo'
+            self.args['inprop'] = 'protection'
+
+        self.extra_properties = dict(extra_properties or {})
+        if self.extra_properties:
+            self.args['prop'] += '|' + '|'.join(self.extra_properties)
+            for params in self.extra_properties.values():
+                self.args.update(params)
+            self.stream = False
+        # The continuation parameters of the last response, see load_chunk()
+        self._continue = {}  # type: Dict[str, Any]
 
         self.result_member = 'pages'
 
         self.page_class = mwclient.page.Page
 
-    def __next__(self) -> Union['mwclient.page.Page', 'mwclient.image.Image', 'Category']:
+    def __next__(
+        self
+    ) -> Union['mwclient.page.Page', 'mwclient.image.Image', 'Category', PageRecord]:
         info = super().__next__()
+        if self.lightweight:
+            return PageRecord(self.site, info)
         if info['ns'] == 14:
-            return Category(self.site, '', info)
-        if info['ns'] == 6:
-            return mwclient.image.Image(self.site, '', info)
-        return mwclient.page.Page(self.site, '', info)
+            page = Category(self.site, '', info)  # type: mwclient.page.Page
+        elif info['ns'] == 6:
+            page = mwclient.image.Image(self.site, '', info)
+        else:
+            page = mwclient.page.Page(self.site, '', info)
+        if self.extra_properties:
+            page.properties = {
+                name: info[name] for name in self.extra_properties if name in info
+            }
+        return page
 
     def load_chunk(self) -> None:
         # Put this here so that the constructor does not fail
         # on uninitialized sites
-        self.args['iiprop'] = 'timestamp|user|comment|url|size|sha1|metadata|archivename'
-        return super().load_chunk()
+        if not self.lightweight:
+            self.args['iiprop'] = \
+                'timestamp|user|comment|url|size|sha1|metadata|archivename'
+        if not self.extra_properties:
+            return super().load_chunk()
+
+        # The prop modules can need several requests for the pages of one batch of
+        # the generator: the API keeps the generator continuation fixed and returns
+        # the same pages with the next part of the prop results until the response
+        # has 'batchcomplete'. The continuation parameters of each response replace
+        # those of the previous one, so that no stale prop continuation is sent.
+        pages = OrderedDict()  # type: Dict[str, Dict[str, Any]]
+        while True:
+            data = self.site.get(
+                'query', (self.generator, self.list_name),
+                *[(str(k), v) for k, v in self.args.items()]
+            )
+            if not data:
+                raise StopIteration
+
+            for key, info in data.get('query', {}).get('pages', {}).items():
+                if key in pages:
+                    _merge_page_info(pages[key], info)
+                else:
+                    pages[key] = dict(info)
+
+            for key in self._continue:
+                self.args.pop(key, None)
+            self._continue = data.get('continue') or {}
+            self.args.update(self._continue)
+            if not self._continue:
+                self.last = True
+            if self.last or 'batchcomplete' in data:
+                break
+
+        self._iter = iter(pages.values())
+
+
+def _merge_page_info(info: Dict[str, Any], more: Mapping[str, Any]) -> None:
+    """Merges the page info of a prop continuation into `info`.
+
+    The lists of a prop module, like `categories`, are extended and its dicts,
+    like `pageprops`, are updated.
+    """
+    for key, value in more.items():
+        if isinstance(value, list) and isinstance(info.get(key), list):
+            info[key].extend(value)
+        elif isinstance(value, Mapping) and isinstance(info.get(key), dict):
+            info[key].update(value)
+        else:
+            info[key] = value
 
 
 class Category(mwclient.page.Page, GeneratorList):
@@ -254,14 +520,111 @@ class Category(mwclient.page.Page, GeneratorList):
         dir: str = 'asc',
         start: Optional[str] = None,
         end: Optional[str] = None,
-        generator: bool = True
+        generator: bool = True,
+        extra_properties: Optional[Mapping[str, Iterable[Tuple[str, str]]]] = None
     ) -> 'List':
         prefix = self.get_prefix('cm', generator)
         kwargs = dict(self.generate_kwargs(prefix, prop=prop, namespace=namespace,
                                            sort=sort, dir=dir, start=start, end=end,
                                            title=self.name))
+        if generator and extra_properties:
+            return GeneratorList(self.site, 'categorymembers', 'cm',
+                                 extra_properties=extra_properties, **kwargs)
         return self.get_list(generator)(self.site, 'categorymembers', 'cm', **kwargs)
 
+    def walk(
+        self,
+        depth: Optional[int] = None,
+        namespaces: Optional[Namespace] = None,
+        max_workers: int = 4
+    ) -> Iterator[Union['mwclient.page.Page', 'mwclient.image.Image', 'Category']]:
+        """Yield the members of this category and of its subcategories, recursively.
+
+        The subcategories are expanded in breadth-first order by a pool of
+        `max_workers` threads, and the pages are yielded as soon as they are
+        listed, in no particular order. Each page is yielded once, even if it is
+        in several categories, and cycles in the category tree are not followed.
+
+        The size of each subcategory is requested along with the members (using
+        `prop=categoryinfo`), so that subcategories without any members of
+        interest are not listed.
+
+        Example:
+            >>> for page in site.categories['Physics'].walk(depth=2, namespaces=0):
+            ...     print(page.name)
+
+        Args:
+            depth: The number of levels of subcategories to expand. 0 only lists
+                the members of this category. Defaults to the whole tree.
+            namespaces: Only yield the pages in these namespaces, e.g. `0` or
+                `'0|6'`. Subcategories are still expanded.
+            max_workers: The number of categories listed concurrently.
+        """
+        wanted = None  # type: Optional[Set[int]]
+        if namespaces is not None:
+            wanted = {int(ns) for ns in str(namespaces).split('|')}
+
+        def wants(namespace: int) -> bool:
+            return wanted is None or namespace in wanted
+
+        def expandable(category: Category, level: int) -> bool:
+            if depth is not None and level > depth:
+                return False
+            info = category.properties.get('categoryinfo')
+            if not info:
+                return True
+            return bool(
+                info.get('subcats', 0) and (depth is None or level < depth or wants(14))
+                or info.get('files', 0) and wants(6)
+                or info.get('pages', 0) and (wanted is None or wanted - {6, 14})
+            )
+
+        # The workers put (level, page) on the queue for each member, then
+        # (level, None) when the category is done, or (level, exception)
+        results = queue.Queue()  # type: queue.Queue[Tuple[int, Any]]
+        stop = threading.Event()
+
+        def expand(category: Category, level: int) -> None:
+            namespace = None
+            if wanted is not None:
+                namespace = '|'.join(map(str, sorted(
+                    wanted | {14} if depth is None or level < depth else wanted
+                )))
+            try:
+                for page in category.members(
+                    namespace=namespace, extra_properties={'categoryinfo': []}
+                ):
+                    if stop.is_set():
+                        break
+                    results.put((level, page))
+            except Exception as e:
+                results.put((level, e))
+            else:
+                results.put((level, None))
+
+        visited = {self.pageid if self.pageid is not None else self.name}
+        frontier = deque([(self, 0)])  # type: Deque[Tuple[Category, int]]
+        running = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                while frontier or running:
+                    while frontier and running < max_workers:
+                        executor.submit(expand, *frontier.popleft())
+                        running += 1
+                    level, item = results.get()
+                    if item is None:
+                        running -= 1
+                    elif isinstance(item, Exception):
+                        raise item
+                    elif item.pageid not in visited:
+                        visited.add(item.pageid)
+                        if isinstance(item, Category) and expandable(item, level + 1):
+                            frontier.append((item, level + 1))
+                        if wants(item.namespace):
+                            yield item
+            finally:
+                stop.set()
+
 
 class PageList(GeneratorList):
 
@@ -276,7 +639,7 @@ class PageList(GeneratorList):
     ):
         self.namespace = namespace
 
-        kwargs = {}
+        kwargs = {}  # type: Dict[str, Any]
         if prefix:
             kwargs['gapprefix'] = prefix
         if start:
@@ -380,6 +743,10 @@ class PageProperty(List):
                 return
         raise StopIteration
 
+    def stream_path(self) -> Tuple[str, ...]:
+        # Only one page is queried, so its title need not be checked
+        return ('query', 'pages', '*', self.list_name)
+
 
 class PagePropertyGenerator(GeneratorList):
 
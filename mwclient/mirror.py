@@ -0,0 +1,265 @@
+"""A local copy of the latest revisions of a wiki, kept in a SQLite database."""
+import json
+import sqlite3
+import time
+from typing import (  # noqa: F401
+    Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set,
+    TYPE_CHECKING
+)
+
+import mwclient.listing as listing
+
+if TYPE_CHECKING:
+    import mwclient.client
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS pages (
+    pageid INTEGER PRIMARY KEY,
+    namespace INTEGER NOT NULL,
+    title TEXT NOT NULL UNIQUE,
+    revid INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    length INTEGER,
+    contentmodel TEXT,
+    redirect INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+'''
+
+# The log types of the events that change which pages exist, or their content
+LOG_TYPES = frozenset({'delete', 'import', 'merge', 'move', 'upload'})
+
+COLUMNS = ('pageid', 'namespace', 'title', 'revid', 'timestamp', 'length',
+           'contentmodel', 'redirect', 'text')
+
+
+class Mirror:
+    """Keeps the latest revision of the pages of a site in a SQLite database.
+
+    :meth:`bootstrap` copies all the pages of the mirrored namespaces using
+    generator queries of 50 pages with their content. :meth:`sync` then fetches
+    again the pages changed since the last bootstrap or sync, according to the
+    recent changes and the move, delete, upload, import and merge logs. The time
+    of the last change seen, the watermark, is kept in the database, so a mirror
+    can be synced again after a restart.
+
+    Example:
+        >>> mirror = Mirror(site, 'wiki.sqlite')
+        >>> if mirror.watermark is None:
+        ...     mirror.bootstrap(namespaces=[0, 10])
+        >>> mirror.sync()
+        >>> mirror.text('Main Page')
+
+    Args:
+        site: The site to mirror.
+        path: The path of the database, created if needed.
+    """
+
+    def __init__(self, site: 'mwclient.client.Site', path: str) -> None:
+        self.site = site
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> 'Mirror':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self.db.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                        (key, value))
+
+    @property
+    def watermark(self) -> Optional[str]:
+        """The timestamp of the last change synced, or None before bootstrap."""
+        return self._get_meta('watermark')
+
+    @property
+    def namespaces(self) -> Optional[List[int]]:
+        """The mirrored namespaces, or None before bootstrap."""
+        value = self._get_meta('namespaces')
+        return json.loads(value) if value is not None else None
+
+    # Local lookups
+
+    def __len__(self) -> int:
+        count = self.db.execute('SELECT COUNT(*) FROM pages').fetchone()[0]  # type: int
+        return count
+
+    def __contains__(self, title: object) -> bool:
+        return self.db.execute('SELECT 1 FROM pages WHERE title = ?',
+                               (title,)).fetchone() is not None
+
+    def get(self, title: str) -> Optional[Dict[str, Any]]:
+        """Returns the stored page `title` as a dict, or None if it does not exist.
+
+        The dict has the keys `pageid`, `namespace`, `title`, `revid`, `timestamp`,
+        `length`, `contentmodel`, `redirect` and `text`.
+        """
+        row = self.db.execute(f'SELECT {", ".join(COLUMNS)} FROM pages WHERE title = ?',
+                              (title,)).fetchone()
+        if row is None:
+            return None
+        page = dict(zip(COLUMNS, row))
+        page['redirect'] = bool(page['redirect'])
+        return page
+
+    def text(self, title: str) -> str:
+        """Returns the stored text of the page, or an empty string if it does not
+        exist, like :meth:`Page.text() <mwclient.page.Page.text>`."""
+        row = self.db.execute('SELECT text FROM pages WHERE title = ?',
+                              (title,)).fetchone()
+        return row[0] if row else ''
+
+    def titles(self, namespace: Optional[int] = None) -> Iterator[str]:
+        """Yields the titles of the stored pages, optionally in one namespace."""
+        if namespace is None:
+            rows = self.db.execute('SELECT title FROM pages ORDER BY title')
+        else:
+            rows = self.db.execute('SELECT title FROM pages WHERE namespace = ? '
+                                   'ORDER BY title', (namespace,))
+        for row in rows:
+            yield row[0]
+
+    # Synchronization
+
+    def bootstrap(self, namespaces: Optional[Iterable[int]] = None) -> int:
+        """Copies all the pages of `namespaces`, replacing the stored ones.
+
+        Args:
+            namespaces: The namespaces to mirror. Defaults to all of them.
+
+        Returns:
+            The number of pages stored.
+        """
+        if namespaces is None:
+            namespaces = [ns for ns in self.site.namespaces if ns >= 0]
+        namespaces = sorted(namespaces)
+
+        # Changes made during the bootstrap are fetched again by the next sync
+        watermark = self._latest_change()
+        with self.db:
+            self.db.execute('DELETE FROM pages')
+            self._set_meta('namespaces', json.dumps(namespaces))
+        count = 0
+        for namespace in namespaces:
+            for pages in self._query(generator='allpages', gapnamespace=namespace,
+                                     gaplimit=50):
+                with self.db:
+                    count += sum(self._store(info, namespaces) for info in pages)
+        with self.db:
+            self._set_meta('watermark', watermark)
+        return count
+
+    def sync(self) -> int:
+        """Fetches again the pages changed since the watermark.
+
+        Returns:
+            The number of titles fetched.
+        """
+        watermark = self.watermark
+        namespaces = self.namespaces
+        if watermark is None or namespaces is None:
+            raise ValueError('The mirror must be bootstrapped before it is synced')
+
+        titles = set()  # type: Set[str]
+        latest = watermark
+        changes = listing.List(
+            self.site, 'recentchanges', 'rc', rcstart=watermark, rcdir='newer',
+            rcprop='title|timestamp', rctype='edit|new',
+            rcnamespace='|'.join(map(str, namespaces)), timestamps='raw'
+        )
+        for change in changes:
+            titles.add(change['title'])
+            latest = max(latest, change['timestamp'])
+        events = listing.List(
+            self.site, 'logevents', 'le', lestart=watermark, ledir='newer',
+            leprop='title|type|details|timestamp', timestamps='raw'
+        )
+        for event in events:
+            latest = max(latest, event['timestamp'])
+            if event.get('type') not in LOG_TYPES or 'title' not in event:
+                continue
+            titles.add(event['title'])
+            # The target of a move, 'target_title' since MediaWiki 1.25
+            target = event.get('params', {}).get('target_title') or \
+                event.get('move', {}).get('new_title')
+            if target:
+                titles.add(target)
+
+        self.refresh(titles)
+        with self.db:
+            self._set_meta('watermark', latest)
+        return len(titles)
+
+    def refresh(self, titles: Iterable[str]) -> None:
+        """Fetches `titles` again, storing or removing them."""
+        namespaces = self.namespaces
+        if namespaces is None:
+            raise ValueError('The mirror must be bootstrapped before it is refreshed')
+        titles = sorted(titles)
+        for i in range(0, len(titles), 50):
+            batch = titles[i:i + 50]
+            for pages in self._query(titles='|'.join(batch)):
+                with self.db:
+                    for info in pages:
+                        self._store(info, namespaces)
+
+    def _latest_change(self) -> str:
+        for change in listing.List(self.site, 'recentchanges', 'rc', max_items=1,
+                                   rcprop='timestamp', timestamps='raw'):
+            return change['timestamp']  # type: ignore[no-any-return]
+        return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+    def _query(self, **args: Any) -> Iterator[List[Dict[str, Any]]]:
+        args.update(prop='info|revisions', rvprop='ids|timestamp|content')
+        if self.site.version is not None and self.site.version[:2] > (1, 31):
+            args['rvslots'] = 'main'
+        # Only 50 pages get their content per request, so the API can return the
+        # same batch of pages several times, each time with the revisions of the
+        # next ones. The continuation parameters of each response replace the
+        # previous ones.
+        continue_ = {}  # type: Dict[str, Any]
+        while True:
+            data = self.site.get('query', **args, **continue_)
+            yield list(data.get('query', {}).get('pages', {}).values())
+            continue_ = data.get('continue') or {}
+            if not continue_:
+                return
+
+    def _store(self, info: Mapping[str, Any], namespaces: Sequence[int]) -> int:
+        # Called in a transaction
+        title = info['title']
+        if 'missing' in info or 'invalid' in info or info['ns'] not in namespaces:
+            self.db.execute('DELETE FROM pages WHERE title = ?', (title,))
+            return 0
+        if not info.get('revisions'):
+            # Returned with a later continuation
+            return 0
+        revision = info['revisions'][0]
+        content = revision['slots']['main'] if 'slots' in revision else revision
+        # The text of a revision can be hidden
+        text = content.get('*', '')
+        # A page moved over this title, or deleted and recreated
+        self.db.execute('DELETE FROM pages WHERE title = ? AND pageid != ?',
+                        (title, info['pageid']))
+        self.db.execute(
+            f'INSERT OR REPLACE INTO pages ({", ".join(COLUMNS)}) '
+            f'VALUES ({", ".join("?" * len(COLUMNS))})',
+            (info['pageid'], info['ns'], title, revision['revid'],
+             revision['timestamp'], info.get('length'), info.get('contentmodel'),
+             'redirect' in info, text)
+        )
+        return 1
@@ -1,13 +1,19 @@
 import time
 from typing import (  # noqa: F401
-    Optional, Mapping, Any, cast, Dict, Union, Tuple, Iterable, List, NoReturn
+    Optional, Mapping, Any, cast, Dict, Union, Tuple, Iterable, List, NoReturn,
+    TYPE_CHECKING
 )
 
 import mwclient.errors
-import mwclient.listing
 from mwclient._types import Namespace
 from mwclient.util import parse_timestamp, handle_limit
 
+if TYPE_CHECKING:
+    # mwclient.listing subclasses Page, so it cannot be imported before this module
+    # is fully loaded. At runtime, it is loaded on first use through the lazy
+    # attributes of the mwclient package.
+    import mwclient.listing
+
 
 class Page:
     """
@@ -22,7 +28,8 @@ class Page:
             iterating over a list of pages. If not provided, the page info
             will be fetched from the API.
         extra_properties (Optional[dict]): Extra properties to fetch when
-            initializing the page.
+            initializing the page. Their results are stored in the `properties`
+            attribute, keyed by prop module name.
 
     Examples:
         >>> site = mwclient.Site('en.wikipedia.org')
@@ -88,6 +95,10 @@ class Page:
         self.contentmodel = info.get('contentmodel', None)
         self.pagelanguage = info.get('pagelanguage', None)
         self.restrictiontypes = info.get('restrictiontypes', None)
+        # Results of the extra prop modules, keyed by module name
+        self.properties = {
+            name: info[name] for name in extra_properties or () if name in info
+        }  # type: Dict[str, Any]
 
         self.last_rev_time = None  # type: Optional[time.struct_time]
         self.edit_time = None  # type: Optional[time.struct_time]
@@ -266,6 +277,20 @@ class Page:
 
     def _edit(
         self, summary: str, minor: bool, bot: bool, section: Optional[str], **kwargs: Any
+    ) -> Any:
+        text_length = sum(len(kwargs[key])
+                          for key in ('text', 'appendtext', 'prependtext')
+                          if isinstance(kwargs.get(key), str))
+        with self.site.tracer.span('mwclient.edit', {
+            'mwclient.title': self.name,
+            'mwclient.text_length': text_length,
+        }) as span:
+            result = self._save_edit(summary, minor, bot, section, **kwargs)
+            span.set_attribute('mwclient.nochange', 'nochange' in result)
+            return result
+
+    def _save_edit(
+        self, summary: str, minor: bool, bot: bool, section: Optional[str], **kwargs: Any
     ) -> Any:
         if not self.site.logged_in and self.site.force_login:
             raise mwclient.errors.AssertUserFailedError()
@@ -293,22 +318,23 @@ class Page:
         if self.site.force_login:
             data['assert'] = 'user'
 
-        def do_edit() -> Dict[str, Any]:
+        def do_edit(token: str) -> Dict[str, Any]:
             result = self.site.post('edit', title=self.name, summary=summary,
-                                    token=self.get_token('edit'),
-                                    **data)
+                                    token=token, **data)
             if result['edit'].get('result').lower() == 'failure':
                 raise mwclient.errors.EditError(self, result['edit'])
             return result
 
+        token = self.get_token('edit')
         try:
-            result = do_edit()
+            result = do_edit(token)
         except mwclient.errors.APIError as e:
             if e.code == 'badtoken':
-                # Retry, but only once to avoid an infinite loop
-                self.get_token('edit', force=True)
+                # Retry, but only once to avoid an infinite loop. If another thread
+                # has already replaced the token, its new token is used.
+                token = self.site.refresh_token('edit', token, title=self.name)
                 try:
-                    result = do_edit()
+                    result = do_edit(token)
                 except mwclient.errors.APIError as e2:
                     self.handle_edit_error(e2, summary)
             else:
@@ -326,10 +352,7 @@ class Page:
             self.touched = new_timestamp
 
         # Workaround for https://phabricator.wikimedia.org/T211233
-        for cookie in self.site.connection.cookies:
-            if 'PostEditRevision' in cookie.name:
-                self.site.connection.cookies.clear(cookie.domain, cookie.path,
-                                                   cookie.name)
+        self.site.clear_cookies(lambda cookie: 'PostEditRevision' in cookie.name)
 
         # clear the page text cache
         self._textcache = {}
@@ -619,7 +642,8 @@ class Page:
         slots: Optional[str] = None,
         uselang: Optional[str] = None,
         max_items: Optional[int] = None,
-        api_chunk_size: Optional[int] = 50
+        api_chunk_size: Optional[int] = 50,
+        stream: Optional[bool] = None
     ) -> 'mwclient.listing.List':
         """List revisions of the current page.
 
@@ -646,6 +670,9 @@ class Page:
                 messages.
             max_items: The maximum number of revisions to yield.
             api_chunk_size: The API request chunk size (as a number of revisions).
+            stream: Whether to parse each response incrementally, yielding the
+                revisions as they are downloaded. Useful with `prop='content'`.
+                Defaults to the site's `stream_listings` attribute.
 
         Returns:
             mwclient.listings.List: Revision iterator
@@ -671,7 +698,7 @@ class Page:
         return mwclient.listing.RevisionsIterator(self, 'revisions', 'rv',
                                                   max_items=max_items,
                                                   api_chunk_size=api_chunk_size,
-                                                  **kwargs)
+                                                  stream=stream, **kwargs)
 
     def templates(
         self, namespace: Optional[Namespace] = None, generator: bool = True
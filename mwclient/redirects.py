@@ -0,0 +1,117 @@
+"""Local copies of the redirects of a wiki, see
+:meth:`Site.resolve_redirects() <mwclient.client.Site.resolve_redirects>`."""
+import time
+from typing import (  # noqa: F401
+    Any, Dict, Iterable, Mapping, Optional, Set, TYPE_CHECKING
+)
+
+if TYPE_CHECKING:
+    import mwclient.client
+
+
+def follow_redirects(title: str, redirects: Mapping[str, str]) -> Optional[str]:
+    """Follows the chain of `redirects` starting at `title`.
+
+    Args:
+        title: The title to resolve.
+        redirects: The target of each redirect, keyed by redirect title.
+
+    Returns:
+        The final target, `title` itself if it is not a redirect, or None if
+        the chain loops.
+    """
+    seen = set()  # type: Set[str]
+    while title in redirects:
+        if title in seen:
+            return None
+        seen.add(title)
+        title = redirects[title]
+    return title
+
+
+class RedirectTable:
+    """A copy of the redirects of a site, to resolve titles without requests.
+
+    :meth:`load` lists every redirect of the site, and :meth:`refresh` updates the
+    table with the pages changed since, using the recent changes.
+
+    When the table is passed to :meth:`Site.resolve_redirects()
+    <mwclient.client.Site.resolve_redirects>` after :meth:`load`, titles that
+    are not in it are taken as not being redirects, so they must be normalized
+    (spaces rather than underscores, first letter capitalized if the wiki does so).
+
+    Args:
+        site: The site whose redirects are copied.
+    """
+
+    def __init__(self, site: 'mwclient.client.Site') -> None:
+        self.site = site
+        # The target of each redirect, keyed by redirect title
+        self.targets = {}  # type: Dict[str, str]
+        # Whether load() completed, i.e. the table has all the redirects
+        self.complete = False
+        # When the table was last loaded or refreshed, in the API format
+        self.updated = None  # type: Optional[str]
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+    def __contains__(self, title: object) -> bool:
+        return title in self.targets
+
+    def load(self) -> None:
+        """Lists all the redirects of the site, in all namespaces."""
+        updated = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        targets = {}  # type: Dict[str, str]
+        for namespace in self.site.namespaces:
+            if namespace < 0:
+                continue
+            # With redirects, the API resolves the redirects listed by the
+            # generator and returns them as from/to pairs
+            self._query(targets, generator='allpages', gapnamespace=namespace,
+                        gapfilterredir='redirects', gaplimit='max', redirects='')
+        self.targets = targets
+        self.complete = True
+        self.updated = updated
+
+    def refresh(self) -> None:
+        """Updates the redirects of the pages changed since the last update.
+
+        The pages edited, created, moved or deleted since then, according to the
+        recent changes, are queried again, along with the new titles of the pages
+        moved.
+        """
+        if self.updated is None:
+            raise ValueError('The table must be loaded before it is refreshed')
+        updated = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        titles = set()
+        for change in self.site.recentchanges(
+            start=self.updated, dir='newer', prop='title|loginfo', type='edit|new|log'
+        ):
+            titles.add(change['title'])
+            # The target of a move, 'target_title' since MediaWiki 1.25
+            target = change.get('logparams', {}).get('target_title') or \
+                change.get('move', {}).get('new_title')
+            if target:
+                titles.add(target)
+        self.update(titles)
+        self.updated = updated
+
+    def update(self, titles: Iterable[str]) -> None:
+        """Queries `titles` again, adding or removing them from the table."""
+        titles = list(titles)
+        for i in range(0, len(titles), 50):
+            batch = titles[i:i + 50]
+            for title in batch:
+                self.targets.pop(title, None)
+            self._query(self.targets, titles='|'.join(batch), redirects='')
+
+    def _query(self, targets: Dict[str, str], **args: Any) -> None:
+        continue_ = {}  # type: Dict[str, Any]
+        while True:
+            data = self.site.get('query', **args, **continue_)
+            for redirect in data.get('query', {}).get('redirects', ()):
+                targets[redirect['from']] = redirect['to']
+            continue_ = data.get('continue') or {}
+            if not continue_:
+                return
@@ -1,6 +1,6 @@
 import logging
 import time
-from typing import Callable, Optional, Any
+from typing import Callable, Optional, Any, Dict, List
 
 from mwclient.errors import MaximumRetriesExceeded
 
@@ -22,21 +22,25 @@ class Sleepers:
         max_retries: The maximum number of retries to perform.
         retry_timeout: The time to sleep for each past retry.
         callback: A callable to be called on each retry.
+        hooks: Callables to be called with a `sleep` event before each sleep.
     Attributes:
         max_retries: The maximum number of retries to perform.
         retry_timeout: The time to sleep for each past retry.
         callback: A callable to be called on each retry.
+        hooks: Callables to be called with a `sleep` event before each sleep.
     """
 
     def __init__(
         self,
         max_retries: int,
         retry_timeout: int,
-        callback: Callable[['Sleeper', int, Optional[Any]], Any] = lambda *x: None
+        callback: Callable[['Sleeper', int, Optional[Any]], Any] = lambda *x: None,
+        hooks: Optional[List[Callable[[Dict[str, Any]], Any]]] = None
     ) -> None:
         self.max_retries = max_retries
         self.retry_timeout = retry_timeout
         self.callback = callback
+        self.hooks = hooks if hooks is not None else []
 
     def make(self, args: Optional[Any] = None) -> 'Sleeper':
         """
@@ -46,7 +50,8 @@ class Sleepers:
         Returns:
             Sleeper: A `Sleeper` object.
         """
-        return Sleeper(args, self.max_retries, self.retry_timeout, self.callback)
+        return Sleeper(args, self.max_retries, self.retry_timeout, self.callback,
+                       self.hooks)
 
 
 class Sleeper:
@@ -60,12 +65,17 @@ class Sleeper:
         max_retries: The maximum number of retries to perform.
         retry_timeout: The time to sleep for each past retry.
         callback: A callable to be called on each retry.
+        hooks: Callables to be called with a `sleep` event before each sleep. The
+            event is a dict with the `args`, the number of `retries` and the
+            `sleep_time` in seconds.
     Attributes:
         args: Arguments to be passed to the `callback` callable.
         retries: The number of retries that have been performed.
+        slept: The total number of seconds slept.
         max_retries: The maximum number of retries to perform.
         retry_timeout: The time to sleep for each past retry.
         callback: A callable to be called on each retry.
+        hooks: Callables to be called with a `sleep` event before each sleep.
     """
 
     def __init__(
@@ -73,13 +83,16 @@ class Sleeper:
         args: Any,
         max_retries: int,
         retry_timeout: int,
-        callback: Callable[['Sleeper', int, Optional[Any]], Any]
+        callback: Callable[['Sleeper', int, Optional[Any]], Any],
+        hooks: Optional[List[Callable[[Dict[str, Any]], Any]]] = None
     ) -> None:
         self.args = args
         self.retries = 0
+        self.slept = 0.0
         self.max_retries = max_retries
         self.retry_timeout = retry_timeout
         self.callback = callback
+        self.hooks = hooks if hooks is not None else []
 
     def sleep(self, min_time: int = 0) -> None:
         """
@@ -99,5 +112,8 @@ class Sleeper:
         timeout = self.retry_timeout * (self.retries - 1)
         if timeout < min_time:
             timeout = min_time
+        for hook in self.hooks:
+            hook({'args': self.args, 'retries': self.retries, 'sleep_time': timeout})
         log.debug('Sleeping for %d seconds', timeout)
+        self.slept += timeout
         time.sleep(timeout)
@@ -0,0 +1,111 @@
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Mapping, Optional, Sequence  # noqa: F401
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """Returns the `p` percentile of the sorted `values` (nearest-rank method)."""
+    if not values:
+        return 0.0
+    rank = max(int(len(values) * p / 100.0 + 0.5), 1)
+    return values[min(rank, len(values)) - 1]
+
+
+class _ActionStats:
+
+    def __init__(self, max_samples: int) -> None:
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.sleeps = 0
+        self.sleep_time = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency = 0.0
+        self.samples = deque(maxlen=max_samples)  # type: Deque[float]
+
+
+class Stats:
+    """Aggregates the request and sleep events of a site in memory, per API action.
+
+    An instance is registered on the `request` and `sleep` hooks of every
+    :class:`~mwclient.client.Site`, and its summary is returned by
+    :meth:`Site.stats() <mwclient.client.Site.stats>`.
+
+    Args:
+        max_samples: The number of most recent latencies kept per action to
+            compute percentiles.
+    """
+
+    def __init__(self, max_samples: int = 10000) -> None:
+        self.max_samples = max_samples
+        self.lock = threading.Lock()
+        self.actions = {}  # type: Dict[str, _ActionStats]
+
+    def _get(self, action: Optional[str]) -> _ActionStats:
+        action = action or ''
+        if action not in self.actions:
+            self.actions[action] = _ActionStats(self.max_samples)
+        return self.actions[action]
+
+    def record_request(self, event: Mapping[str, Any]) -> None:
+        """Hook for `request` events."""
+        with self.lock:
+            stats = self._get(event['action'])
+            stats.requests += 1
+            if event['retries']:
+                stats.retries += 1
+            if event['error'] is not None or event['status'] != 200:
+                stats.errors += 1
+            stats.bytes_sent += event['bytes_sent']
+            stats.bytes_received += event['bytes_received'] or 0
+            stats.latency += event['latency']
+            stats.samples.append(event['latency'])
+
+    def record_sleep(self, event: Mapping[str, Any]) -> None:
+        """Hook for `sleep` events."""
+        # Sleepers made by Site.raw_request() get the (script, data) of the request
+        args = event['args']
+        action = None
+        if isinstance(args, tuple) and len(args) == 2 and isinstance(args[1], Mapping):
+            action = args[1].get('action')
+        with self.lock:
+            stats = self._get(action)
+            stats.sleeps += 1
+            stats.sleep_time += event['sleep_time']
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the statistics collected so far, keyed by API action.
+
+        Requests to `index.php` are counted under their `action` parameter, and
+        sleeps that cannot be attributed to a request under the empty string.
+        Latencies are in seconds and only cover the HTTP requests, not the
+        sleeps between retries.
+        """
+        with self.lock:
+            result = {}
+            for action, stats in self.actions.items():
+                samples = sorted(stats.samples)
+                result[action] = {
+                    'requests': stats.requests,
+                    'retries': stats.retries,
+                    'errors': stats.errors,
+                    'sleeps': stats.sleeps,
+                    'sleep_time': stats.sleep_time,
+                    'bytes_sent': stats.bytes_sent,
+                    'bytes_received': stats.bytes_received,
+                    'latency': {
+                        'total': stats.latency,
+                        'mean': stats.latency / stats.requests if stats.requests else 0.0,
+                        'p50': percentile(samples, 50),
+                        'p90': percentile(samples, 90),
+                        'p99': percentile(samples, 99),
+                        'max': samples[-1] if samples else 0.0,
+                    },
+                }
+            return result
+
+    def reset(self) -> None:
+        """Discards the statistics collected so far."""
+        with self.lock:
+            self.actions.clear()
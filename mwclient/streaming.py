@@ -0,0 +1,91 @@
+"""Incremental parsing of large API responses.
+
+Requires the `ijson <https://pypi.org/project/ijson/>`_ package.
+"""
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence  # noqa: F401
+
+import mwclient.errors as errors
+
+_VALUE_EVENTS = {'start_map', 'start_array', 'null', 'boolean', 'integer',
+                 'double', 'number', 'string'}
+
+
+class _ChunkReader:
+    """File-like object reading from an iterable of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self.chunks = iter(chunks)
+        self.first = b''
+
+    def read(self, size: int = -1) -> bytes:
+        if size == 0:
+            # ijson reads nothing first to check the type of the data
+            return b''
+        for chunk in self.chunks:
+            if chunk:
+                if not self.first:
+                    self.first = chunk
+                return chunk
+        return b''
+
+
+class ItemStream:
+    """Parses a JSON response incrementally, yielding the items of one member.
+
+    The items of the list or object at `path` are yielded one at a time as soon as
+    they are parsed, so only one of them is held in memory. Everything else in the
+    response, such as continuation parameters, errors and warnings, is available as
+    `data` once the iteration is complete; the member itself is left empty there.
+
+    Args:
+        chunks: The response body, for example from `response.iter_content()`.
+        path: The keys leading to the member, like `('query', 'allpages')`. `'*'`
+            matches any key, for example `('query', 'pages', '*', 'revisions')`.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], path: Sequence[str]) -> None:
+        self.chunks = chunks
+        self.path = tuple(path)
+        self.data = None  # type: Optional[Dict[str, Any]]
+        self._item_prefix = re.compile(r'\.'.join(
+            r'[^.]+' if key == '*' else re.escape(key) for key in self.path
+        ) + r'\.[^.]+$')
+
+    def __iter__(self) -> Iterator[Any]:
+        try:
+            import ijson
+        except ImportError:
+            raise ImportError(
+                'Streaming responses requires the ijson package: pip install ijson'
+            )
+
+        reader = _ChunkReader(self.chunks)
+        rest = ijson.ObjectBuilder(map_type=OrderedDict)
+        item = None
+        depth = 0
+        try:
+            for prefix, event, value in ijson.parse(reader, use_float=True):
+                if item is not None:
+                    item.event(event, value)
+                    if event == 'start_map' or event == 'start_array':
+                        depth += 1
+                    elif event == 'end_map' or event == 'end_array':
+                        depth -= 1
+                    if depth == 0:
+                        yield item.value
+                        item = None
+                elif event in _VALUE_EVENTS and self._item_prefix.match(prefix):
+                    item = ijson.ObjectBuilder(map_type=OrderedDict)
+                    item.event(event, value)
+                    if event == 'start_map' or event == 'start_array':
+                        depth = 1
+                    else:
+                        yield item.value
+                        item = None
+                else:
+                    rest.event(event, value)
+        except ijson.JSONError:
+            raise errors.InvalidResponse(reader.first.decode('utf-8', 'replace'))
+        self.data = getattr(rest, 'value', None) or {}
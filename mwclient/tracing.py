@@ -0,0 +1,218 @@
+"""Optional tracing of API calls, listings, edits and uploads.
+
+Pass a :class:`Tracer` to the `tracer` argument of :class:`~mwclient.client.Site` to
+get a span for each HTTP request and retry sleep, each :class:`~mwclient.listing.List`
+iteration and each chunk it loads, and each :meth:`Page.edit()
+<mwclient.page.Page.edit>` and :meth:`Site.upload() <mwclient.client.Site.upload>`.
+:class:`OpenTelemetryTracer` sends them to OpenTelemetry. By default, a
+:class:`NoopTracer` is used, which records nothing.
+"""
+from contextvars import ContextVar
+from types import TracebackType
+from typing import Any, Mapping, Optional, Type
+
+
+class Span:
+    """A span, as returned by :meth:`Tracer.start_span`. This base class does
+    nothing."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_exception(self, exception: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = Span()
+
+# The span of the innermost Tracer.span() block, used as the default parent
+_current_span = ContextVar(
+    'mwclient_current_span', default=None
+)  # type: ContextVar[Optional[Span]]
+
+
+def current_span() -> Optional[Span]:
+    """Returns the span of the innermost `Tracer.span()` block, if any."""
+    return _current_span.get()
+
+
+class _Scope:
+    """Context manager returned by :meth:`Tracer.span`."""
+
+    def __init__(
+        self,
+        tracer: 'Tracer',
+        name: str,
+        attributes: Optional[Mapping[str, Any]],
+        parent: Optional[Span]
+    ) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+
+    def __enter__(self) -> Span:
+        parent = self.parent if self.parent is not None else current_span()
+        self.span = self.tracer.start_span(self.name, parent, self.attributes)
+        self.token = _current_span.set(self.span)
+        self.activation = self.tracer.activate(self.span)
+        return self.span
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType]
+    ) -> None:
+        self.tracer.deactivate(self.activation)
+        _current_span.reset(self.token)
+        if exc is not None:
+            self.span.record_exception(exc)
+        self.span.end()
+
+
+class _NoopScope:
+
+    def __enter__(self) -> Span:
+        return NOOP_SPAN
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+
+_NOOP_SCOPE = _NoopScope()
+
+
+class Tracer:
+    """Base class for tracers.
+
+    Subclasses implement :meth:`start_span`, and can implement :meth:`activate`
+    and :meth:`deactivate` to propagate the current span to other libraries.
+    """
+
+    def start_span(
+        self,
+        name: str,
+        parent: Optional[Span] = None,
+        attributes: Optional[Mapping[str, Any]] = None
+    ) -> Span:
+        """Start a span, which is ended by calling its `end()` method.
+
+        Args:
+            name: The name of the span.
+            parent: The parent span, if any.
+            attributes: The initial attributes of the span.
+        """
+        raise NotImplementedError
+
+    def span(
+        self,
+        name: str,
+        attributes: Optional[Mapping[str, Any]] = None,
+        parent: Optional[Span] = None
+    ) -> Any:
+        """Return a context manager that starts a span, makes it the parent of
+        the spans started inside the block and ends it on exit.
+
+        Args:
+            name: The name of the span.
+            attributes: The initial attributes of the span.
+            parent: The parent span. Defaults to the span of the enclosing
+                `span()` block, if any.
+        """
+        return _Scope(self, name, attributes, parent)
+
+    def activate(self, span: Span) -> Any:
+        """Called when entering a `span()` block."""
+        return None
+
+    def deactivate(self, activation: Any) -> None:
+        """Called with the return value of :meth:`activate` when leaving the block."""
+        pass
+
+
+class NoopTracer(Tracer):
+    """Tracer that records nothing, at almost no cost."""
+
+    def start_span(
+        self,
+        name: str,
+        parent: Optional[Span] = None,
+        attributes: Optional[Mapping[str, Any]] = None
+    ) -> Span:
+        return NOOP_SPAN
+
+    def span(
+        self,
+        name: str,
+        attributes: Optional[Mapping[str, Any]] = None,
+        parent: Optional[Span] = None
+    ) -> Any:
+        return _NOOP_SCOPE
+
+
+class OpenTelemetrySpan(Span):
+    """Wraps an OpenTelemetry span."""
+
+    def __init__(self, span: Any) -> None:
+        self.span = span
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.span.set_attribute(key, value)
+
+    def record_exception(self, exception: BaseException) -> None:
+        from opentelemetry.trace import Status, StatusCode
+        self.span.record_exception(exception)
+        self.span.set_status(Status(StatusCode.ERROR, str(exception)))
+
+    def end(self) -> None:
+        self.span.end()
+
+
+class OpenTelemetryTracer(Tracer):
+    """Sends spans to OpenTelemetry.
+
+    Spans without a parent are children of the current OpenTelemetry span, and
+    spans made by other instrumented libraries, e.g. for HTTP requests, are
+    children of the current mwclient span.
+
+    Example:
+        >>> from opentelemetry import trace
+        >>> from mwclient.tracing import OpenTelemetryTracer
+        >>> tracer = OpenTelemetryTracer(trace.get_tracer('my-bot'))
+        >>> site = Site('en.wikipedia.org', tracer=tracer)
+
+    Args:
+        tracer: An OpenTelemetry tracer. Defaults to one named `mwclient`.
+    """
+
+    def __init__(self, tracer: Any = None) -> None:
+        from opentelemetry import context, trace
+        self.context = context
+        self.trace = trace
+        self.tracer = tracer if tracer is not None else trace.get_tracer('mwclient')
+
+    def start_span(
+        self,
+        name: str,
+        parent: Optional[Span] = None,
+        attributes: Optional[Mapping[str, Any]] = None
+    ) -> Span:
+        context = None
+        if isinstance(parent, OpenTelemetrySpan):
+            context = self.trace.set_span_in_context(parent.span)
+        return OpenTelemetrySpan(self.tracer.start_span(
+            name, context=context, attributes=attributes
+        ))
+
+    def activate(self, span: Span) -> Any:
+        if isinstance(span, OpenTelemetrySpan):
+            return self.context.attach(self.trace.set_span_in_context(span.span))
+        return None
+
+    def deactivate(self, activation: Any) -> None:
+        if activation is not None:
+            self.context.detach(activation)
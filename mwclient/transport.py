@@ -0,0 +1,405 @@
+"""Transports perform the HTTP requests made by a :class:`~mwclient.client.Site`.
+
+By default, requests are sent using the :mod:`requests` library. Another HTTP
+client can be used by passing a :class:`Transport` to the `transport` argument of
+:class:`~mwclient.client.Site`.
+"""
+import base64
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from typing import (  # noqa: F401
+    Any, Deque, Dict, IO, Iterable, Iterator, Mapping, Optional, Tuple, Union
+)
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.auth import HTTPBasicAuth
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.request import ACCEPT_ENCODING
+
+from mwclient.errors import ReplayError
+
+# Content codings requested from the server when compression is enabled, best
+# first. zstd and br are only requested if the transport can decode them.
+PREFERRED_ENCODINGS = ('zstd', 'br', 'gzip')
+
+
+def preferred_encodings(supported: Iterable[str]) -> Tuple[str, ...]:
+    """Returns the supported codings of :data:`PREFERRED_ENCODINGS`, best first.
+    gzip is always included since every transport can decode it."""
+    supported = set(supported) | {'gzip'}
+    return tuple(coding for coding in PREFERRED_ENCODINGS if coding in supported)
+
+
+class Transport:
+    """Base class for transports.
+
+    A transport sends the requests built by :meth:`Site.raw_call
+    <mwclient.client.Site.raw_call>`. Its responses must provide the
+    `status_code`, `headers`, `text` and `content` attributes and the
+    `raise_for_status` and `iter_content` methods of a :class:`requests.Response`,
+    and it must raise :mod:`requests` exceptions on network errors, so that
+    :class:`~mwclient.client.Site` can handle them.
+
+    The `encodings` attribute lists the content codings the transport can decode,
+    best first; they are requested in the `Accept-Encoding` header when the site
+    uses compression.
+    """
+    encodings = ('gzip',)  # type: Tuple[str, ...]
+
+    def attach(self, session: requests.Session) -> None:
+        """Called by :class:`~mwclient.client.Site` with its session, so that the
+        transport can share its cookies, headers and authentication."""
+        pass
+
+    def request(self, method: str, url: str, **kwargs: Any) -> 'Response':
+        """Send a request.
+
+        Args:
+            method: The HTTP method.
+            url: The URL.
+            **kwargs: The arguments of :meth:`requests.Session.request`, in
+                particular `params`, `data`, `files`, `headers`, `timeout` and
+                `stream`, plus any connection options given to the site.
+
+        Returns:
+            The response.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release the resources held by the transport."""
+        pass
+
+
+class RequestsTransport(Transport):
+    """Sends requests using the :class:`requests.Session` of the site."""
+
+    def __init__(self) -> None:
+        self.session = None  # type: Optional[requests.Session]
+        # urllib3 lists the codings it can decode with the installed packages
+        self.encodings = preferred_encodings(ACCEPT_ENCODING.split(','))
+
+    def attach(self, session: requests.Session) -> None:
+        self.session = session
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        assert self.session is not None, 'transport is not attached to a site'
+        return self.session.request(method, url, **kwargs)
+
+    def close(self) -> None:
+        if self.session is not None:
+            self.session.close()
+
+
+class HttpxResponse:
+    """Wraps an :class:`httpx.Response` in the interface of a
+    :class:`requests.Response`."""
+
+    def __init__(self, response: Any) -> None:
+        self.response = response
+        self.status_code = response.status_code  # type: int
+        self.headers = response.headers  # type: Mapping[str, str]
+        self.url = str(response.url)
+
+    @property
+    def content(self) -> bytes:
+        return self.response.read()  # type: ignore[no-any-return]
+
+    @property
+    def text(self) -> str:
+        self.response.read()
+        return self.response.text  # type: ignore[no-any-return]
+
+    def iter_content(self, chunk_size: int = 1) -> Iterator[bytes]:
+        try:
+            yield from self.response.iter_bytes(chunk_size)
+        finally:
+            self.response.close()
+
+    def raise_for_status(self) -> None:
+        if 400 <= self.status_code < 600:
+            raise requests.exceptions.HTTPError(
+                f'{self.status_code} Error for url: {self.url}', response=self  # type: ignore[arg-type]  # noqa: E501
+            )
+
+    def close(self) -> None:
+        self.response.close()
+
+
+Response = Union[requests.Response, HttpxResponse]
+
+
+class HttpxTransport(Transport):
+    """Sends requests using `httpx <https://www.python-httpx.org/>`_, which can
+    multiplex many concurrent requests over a single HTTP/2 connection.
+
+    Requires the `httpx` package, and the `h2` package for HTTP/2 support
+    (``pip install httpx[http2]``). The cookies, headers, certificate settings and
+    basic authentication of the site's session are shared with the httpx client;
+    other authentication methods, like OAuth, are not supported.
+
+    Example:
+        >>> from mwclient.transport import HttpxTransport
+        >>> site = Site('en.wikipedia.org', transport=HttpxTransport())
+
+    Args:
+        http2: Whether to use HTTP/2 when the server supports it. Defaults to `True`.
+        **client_options: Additional arguments for :class:`httpx.Client`, like
+            `limits` or `proxy`.
+    """
+
+    def __init__(self, http2: bool = True, **client_options: Any) -> None:
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError(
+                'HttpxTransport requires the httpx package: pip install httpx[http2]'
+            )
+        self.httpx = httpx
+        self.http2 = http2
+        try:
+            from httpx._decoders import SUPPORTED_DECODERS
+            self.encodings = preferred_encodings(SUPPORTED_DECODERS)
+        except ImportError:
+            pass
+        self.client_options = client_options
+        self.client = None  # type: Any
+
+    def attach(self, session: requests.Session) -> None:
+        if isinstance(session.auth, HTTPBasicAuth):
+            auth = (session.auth.username, session.auth.password)  # type: Any
+        elif session.auth is None:
+            auth = None
+        else:
+            raise ValueError(
+                f'HttpxTransport does not support {type(session.auth).__name__} '
+                'authentication'
+            )
+        options = {
+            'http2': self.http2,
+            'auth': auth,
+            'cookies': session.cookies,
+            'headers': dict(session.headers),
+            'verify': session.verify,
+            'cert': session.cert,
+        }  # type: Dict[str, Any]
+        options.update(self.client_options)
+        self.client = self.httpx.Client(**options)
+
+    @staticmethod
+    def _form(
+        data: Optional[Mapping[str, Any]]
+    ) -> Optional[Dict[str, Union[str, bytes]]]:
+        # Encode the form the way requests does: skip None values and use str()
+        if data is None:
+            return None
+        return {k: v if isinstance(v, (str, bytes)) else str(v)
+                for k, v in data.items() if v is not None}
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Mapping[str, Any]] = None,
+        data: Optional[Mapping[str, Any]] = None,
+        files: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Union[float, Tuple[float, float], None] = None,
+        stream: bool = False,
+        **kwargs: Any
+    ) -> HttpxResponse:
+        assert self.client is not None, 'transport is not attached to a site'
+        if kwargs:
+            raise ValueError(
+                'HttpxTransport does not support the connection options '
+                + ', '.join(sorted(kwargs))
+            )
+        timeouts = timeout  # type: Any
+        if isinstance(timeout, tuple):
+            # requests accepts a (connect, read) tuple
+            timeouts = self.httpx.Timeout(timeout[1], connect=timeout[0])
+        request = self.client.build_request(
+            method, url, params=self._form(params), data=self._form(data),
+            files=files, headers=headers, timeout=timeouts
+        )
+        try:
+            response = self.client.send(request, stream=stream)
+        except self.httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e))
+        except self.httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e))
+        return HttpxResponse(response)
+
+    def close(self) -> None:
+        if self.client is not None:
+            self.client.close()
+
+
+# Parameters left out of the request keys of cassettes, because they change
+# between runs or are secret
+VOLATILE_PARAMS = frozenset({
+    'token', 'lgtoken', 'lgpassword', 'logintoken', 'password', 'retype',
+    'basetimestamp', 'starttimestamp', 'curtimestamp', 'maxlag',
+})
+
+# Response headers kept in cassettes
+RECORDED_HEADERS = ('content-type', 'retry-after', 'x-database-lag',
+                    'mediawiki-api-error')
+
+
+def request_key(
+    method: str,
+    url: str,
+    params: Optional[Mapping[str, Any]] = None,
+    data: Optional[Mapping[str, Any]] = None,
+    ignore: Iterable[str] = VOLATILE_PARAMS
+) -> str:
+    """Returns the key identifying a request in a cassette: the method, the path of
+    the URL and the sorted parameters, without the `ignore` ones.
+    """
+    ignore = set(ignore)
+    items = sorted(
+        (str(k), str(v)) for source in (params, data) if source
+        for k, v in source.items() if v is not None and k not in ignore
+    )
+    return f'{method} {urlsplit(url).path}?{urlencode(items)}'
+
+
+def _open_cassette(path: str, write: bool = False) -> IO[str]:
+    if path.endswith('.gz'):
+        if write:
+            return gzip.open(path, 'wt', encoding='utf-8')
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'w' if write else 'r', encoding='utf-8')
+
+
+class RecordingTransport(Transport):
+    """Records the requests sent through another transport into a cassette file,
+    to be served back by :class:`ReplayTransport`.
+
+    The cassette has one JSON object per line, with the request key (see
+    :func:`request_key`), the response status, some headers, the decoded body and
+    the latency. It is gzip-compressed if `path` ends with `.gz`. Tokens and
+    passwords are not part of the keys, so they are not recorded, but the
+    responses are recorded as they are: do not share cassettes of logged-in
+    sessions.
+
+    Example:
+        >>> transport = RecordingTransport('crawl.jsonl.gz')
+        >>> site = Site('en.wikipedia.org', transport=transport)
+        >>> pages = list(site.categories['Physics'])
+        >>> transport.close()
+
+    Args:
+        path: The cassette file, which is overwritten.
+        transport: The transport sending the requests. Defaults to a
+            :class:`RequestsTransport`.
+    """
+
+    def __init__(self, path: str, transport: Optional[Transport] = None) -> None:
+        self.transport = transport or RequestsTransport()
+        self.encodings = self.transport.encodings
+        self.file = _open_cassette(path, write=True)
+        self.lock = threading.Lock()
+
+    def attach(self, session: requests.Session) -> None:
+        self.transport.attach(session)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> 'Response':
+        start = time.monotonic()
+        response = self.transport.request(method, url, **kwargs)
+        content = response.content
+        latency = time.monotonic() - start
+
+        record = {
+            'request': request_key(method, url, kwargs.get('params'),
+                                   kwargs.get('data')),
+            'status': response.status_code,
+            'headers': {name: response.headers[name] for name in RECORDED_HEADERS
+                        if name in response.headers},
+            'latency': round(latency, 4),
+        }  # type: Dict[str, Any]
+        try:
+            record['body'] = content.decode('utf-8')
+        except UnicodeDecodeError:
+            record['body_base64'] = base64.b64encode(content).decode('ascii')
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        with self.lock:
+            self.file.write(line + '\n')
+            self.file.flush()
+        return response
+
+    def close(self) -> None:
+        with self.lock:
+            self.file.close()
+        self.transport.close()
+
+
+class ReplayTransport(Transport):
+    """Serves the responses recorded by :class:`RecordingTransport`, without network
+    access.
+
+    Each request is answered with the next unused response recorded for the same
+    request key, so repeated requests get their responses in the recorded order.
+
+    Example:
+        >>> site = Site('en.wikipedia.org', transport=ReplayTransport('crawl.jsonl.gz'))
+        >>> pages = list(site.categories['Physics'])
+
+    Args:
+        path: The cassette file.
+        latency: Whether to wait for the recorded latency before returning each
+            response. Defaults to `False`, to replay at full speed.
+        ignore: The parameters left out of the request keys. Must be the same as
+            when recording, which always uses :data:`VOLATILE_PARAMS`.
+
+    Raises:
+        errors.ReplayError: From :meth:`request`, if no response is left for the
+            request.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        latency: bool = False,
+        ignore: Iterable[str] = VOLATILE_PARAMS
+    ) -> None:
+        self.latency = latency
+        self.ignore = frozenset(ignore)
+        self.encodings = PREFERRED_ENCODINGS
+        self.lock = threading.Lock()
+        self.responses = defaultdict(deque)  # type: Dict[str, Deque[Dict[str, Any]]]
+        with _open_cassette(path) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self.responses[record['request']].append(record)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        key = request_key(method, url, kwargs.get('params'), kwargs.get('data'),
+                          self.ignore)
+        with self.lock:
+            records = self.responses.get(key)
+            if not records:
+                raise ReplayError(key)
+            record = records.popleft()
+        if self.latency:
+            time.sleep(record['latency'])
+
+        response = requests.Response()
+        response.status_code = record['status']
+        response.headers = CaseInsensitiveDict(record['headers'])
+        response.url = url
+        response.encoding = 'utf-8'
+        if 'body_base64' in record:
+            response._content = base64.b64decode(record['body_base64'])
+        else:
+            response._content = record['body'].encode('utf-8')
+        # So that iter_content() yields the body instead of reading from raw,
+        # for streamed requests
+        response._content_consumed = True  # type: ignore[attr-defined]
+        return response
@@ -1,8 +1,23 @@
 import time
 import io
-from typing import Optional, Iterable, Tuple, BinaryIO
+import threading
+from datetime import datetime, timezone
+from typing import Optional, Iterable, Tuple, BinaryIO, Callable, Any
 import warnings
 
+TIMESTAMP_FORMATS = ('struct_time', 'datetime', 'epoch', 'raw')
+
+
+def _parse_fields(t: str) -> Optional[datetime]:
+    # Fast path for the fixed YYYY-MM-DDTHH:MM:SSZ format of MediaWiki:
+    # datetime.fromisoformat() is implemented in C and much faster than strptime()
+    if len(t) == 20 and t[10] == 'T' and t[19] == 'Z':
+        try:
+            return datetime.fromisoformat(t[:19])
+        except ValueError:
+            pass
+    return None
+
 
 def parse_timestamp(t: Optional[str]) -> time.struct_time:
     """Parses a string containing a timestamp.
@@ -15,7 +30,65 @@ def parse_timestamp(t: Optional[str]) -> time.struct_time:
     """
     if t is None or t == '0000-00-00T00:00:00Z':
         return time.struct_time((0, 0, 0, 0, 0, 0, 0, 0, 0))
-    return time.strptime(t, '%Y-%m-%dT%H:%M:%SZ')
+    dt = _parse_fields(t)
+    if dt is None:
+        # Let strptime() raise the usual error for malformed timestamps
+        return time.strptime(t, '%Y-%m-%dT%H:%M:%SZ')
+    return dt.timetuple()
+
+
+def parse_datetime(t: Optional[str]) -> Optional[datetime]:
+    """Parses a string containing a timestamp into an aware UTC datetime.
+
+    Args:
+        t: A string containing a timestamp.
+
+    Returns:
+        The timestamp, or None for a missing or empty timestamp.
+    """
+    if t is None or t == '0000-00-00T00:00:00Z':
+        return None
+    dt = _parse_fields(t)
+    if dt is None:
+        dt = datetime.strptime(t, '%Y-%m-%dT%H:%M:%SZ')
+    return dt.replace(tzinfo=timezone.utc)
+
+
+def parse_epoch(t: Optional[str]) -> Optional[int]:
+    """Parses a string containing a timestamp into seconds since the epoch.
+
+    Args:
+        t: A string containing a timestamp.
+
+    Returns:
+        The timestamp, or None for a missing or empty timestamp.
+    """
+    dt = parse_datetime(t)
+    return None if dt is None else int(dt.timestamp())
+
+
+def timestamp_parser(format: str) -> Optional[Callable[[Optional[str]], Any]]:
+    """Returns the function converting timestamps to `format`.
+
+    Args:
+        format: One of `'struct_time'`, `'datetime'` (aware, in UTC), `'epoch'`
+            (int) or `'raw'`.
+
+    Returns:
+        The parsing function, or None for `'raw'`, where timestamps are left as
+        strings.
+    """
+    if format not in TIMESTAMP_FORMATS:
+        raise ValueError(
+            f'Unknown timestamp format {format!r}, '
+            f'expected one of {", ".join(TIMESTAMP_FORMATS)}'
+        )
+    return {
+        'struct_time': parse_timestamp,
+        'datetime': parse_datetime,
+        'epoch': parse_epoch,
+        'raw': None,
+    }[format]
 
 
 def read_in_chunks(stream: BinaryIO, chunk_size: int) -> Iterable[io.BytesIO]:
@@ -53,3 +126,30 @@ def handle_limit(
             )
             api_chunk_size = limit
     return (max_items, api_chunk_size)
+
+
+class Throttle:
+    """Spaces out calls made from any number of threads.
+
+    Each call to :meth:`wait` blocks until at least `min_interval` seconds have
+    passed since the previous call returned, so that the calls are never made
+    more often than once every `min_interval` seconds.
+
+    Args:
+        min_interval: The minimum number of seconds between two calls.
+    """
+
+    def __init__(self, min_interval: float = 0.0) -> None:
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        if self.min_interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next:
+                time.sleep(self._next - now)
+                now = self._next
+            self._next = now + self.min_interval
@@ -0,0 +1,34 @@
+"""Compares the cost of converting listing timestamps with each format.
+
+Run with `python -m test.benchmark_timestamps`. `strptime` is the parser used
+before the fast path for the fixed MediaWiki format was added.
+"""
+import argparse
+import time
+import timeit
+from functools import partial
+
+from mwclient.util import TIMESTAMP_FORMATS, timestamp_parser
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=200000)
+    args = parser.parse_args()
+
+    value = '2015-01-02T20:18:36Z'
+    functions = {
+        'strptime': lambda: time.strptime(value, '%Y-%m-%dT%H:%M:%SZ'),
+    }
+    for format in TIMESTAMP_FORMATS:
+        parse = timestamp_parser(format)
+        if parse is not None:
+            functions[format] = partial(parse, value)
+
+    for name, function in functions.items():
+        elapsed = timeit.timeit(function, number=args.number)
+        print(f'{name:12} {elapsed / args.number * 1e9:8.0f} ns per timestamp')
+
+
+if __name__ == '__main__':
+    main()
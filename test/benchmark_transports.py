@@ -0,0 +1,66 @@
+"""Compares the throughput of the transports on many concurrent API calls.
+
+Run with `python -m test.benchmark_transports`. The requests backend talks
+HTTP/1.1 to a local server, one connection per in-flight request; the httpx
+backend multiplexes all of them over one cleartext HTTP/2 connection. Each
+request is answered after `--delay` seconds to simulate network latency.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import mwclient
+from mwclient.transport import HttpxTransport
+from test.fake_wiki import FakeH2Wiki, FakeWiki, siteinfo
+
+
+def handler(params):
+    if params.get('meta', '').startswith('siteinfo'):
+        return siteinfo()
+    return {'query': {'pages': {'1': {'title': params.get('titles')}}}}
+
+
+class DelayedWiki(FakeWiki):
+    """FakeWiki that waits before answering, like FakeH2Wiki with `delay`."""
+
+    def __init__(self, handler, delay):
+        self.delay = delay
+        super().__init__(handler)
+
+    def api(self, params):
+        time.sleep(self.delay)
+        return super().api(params)
+
+
+def run(site, requests, threads):
+    start = time.monotonic()
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(lambda i: site.get('query', titles=f'Page {i}'),
+                          range(requests)))
+    return time.monotonic() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=50)
+    parser.add_argument('--delay', type=float, default=0.05)
+    args = parser.parse_args()
+
+    with DelayedWiki(handler, args.delay) as wiki:
+        site = mwclient.Site(wiki.host, scheme='http', pool_maxsize=args.threads)
+        elapsed = run(site, args.requests, args.threads)
+        connections = site.connection_stats()[f'http://{wiki.host}']['connections']
+    print(f'requests (HTTP/1.1): {args.requests / elapsed:8.1f} req/s, '
+          f'{connections} connections')
+
+    with FakeH2Wiki(handler, args.delay, max_workers=args.threads) as wiki:
+        site = mwclient.Site(wiki.host, scheme='http',
+                             transport=HttpxTransport(http1=False))
+        elapsed = run(site, args.requests, args.threads)
+    print(f'httpx (HTTP/2):      {args.requests / elapsed:8.1f} req/s, '
+          '1 connection')
+
+
+if __name__ == '__main__':
+    main()
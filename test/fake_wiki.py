@@ -0,0 +1,183 @@
+"""A minimal MediaWiki API stand-in served over HTTP on localhost.
+
+Unlike the `responses` mocks used elsewhere in the test suite, this exercises the
+real network stack, which makes it suitable for tests involving threads and
+connection handling.
+"""
+import json
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List  # noqa: F401
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+
+class FakeWiki:
+    """Serves `/w/api.php` on a random local port.
+
+    Each API request is answered by calling `handler` with the request parameters
+    (as a dict) and serializing the dict it returns as JSON. Requests to other paths
+    are answered by the `routes` callables, which get the handler instance and are
+    responsible for writing the response themselves.
+    """
+
+    def __init__(self, handler, routes=None):
+        self.handler = handler
+        self.routes = routes or {}
+        self.calls = []  # type: List[Dict[str, str]]
+        self.lock = threading.Lock()
+        self.server = self.make_server()
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       kwargs={'poll_interval': 0.05}, daemon=True)
+
+    def api(self, params):
+        with self.lock:
+            self.calls.append(params)
+        return json.dumps(self.handler(params)).encode('utf-8')
+
+    def make_server(self):
+        wiki = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                if url.path in wiki.routes:
+                    wiki.routes[url.path](self)
+                    return
+                self.respond(dict(parse_qsl(url.query)))
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length).decode('utf-8')
+                self.respond(dict(parse_qsl(body)))
+
+            def respond(self, params):
+                body = wiki.api(params)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return ThreadingHTTPServer(('127.0.0.1', 0), RequestHandler)
+
+    @property
+    def host(self):
+        return f'127.0.0.1:{self.server.server_address[1]}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeH2Wiki(FakeWiki):
+    """Serves the API over cleartext HTTP/2 (prior knowledge, no upgrade).
+
+    Requires the `h2` package. The streams of a connection are answered
+    concurrently, so `delay` seconds of simulated latency per request show the
+    effect of multiplexing. Routes are not supported, and responses must fit in
+    the initial flow control window (64 KiB).
+    """
+
+    def __init__(self, handler, delay=0.0, max_workers=64):
+        self.delay = delay
+        self.max_workers = max_workers
+        super().__init__(handler)
+
+    def make_server(self):
+        import h2.config
+        import h2.connection
+        import h2.events
+        wiki = self
+
+        class RequestHandler(socketserver.BaseRequestHandler):
+
+            def handle(self):
+                config = h2.config.H2Configuration(client_side=False)
+                self.conn = h2.connection.H2Connection(config=config)
+                self.lock = threading.Lock()
+                self.conn.initiate_connection()
+                self.flush()
+                streams = {}
+                with ThreadPoolExecutor(wiki.max_workers) as executor:
+                    while True:
+                        data = self.request.recv(65536)
+                        if not data:
+                            return
+                        with self.lock:
+                            events = self.conn.receive_data(data)
+                        for event in events:
+                            if isinstance(event, h2.events.RequestReceived):
+                                streams[event.stream_id] = (dict(event.headers), b'')
+                            elif isinstance(event, h2.events.DataReceived):
+                                headers, body = streams[event.stream_id]
+                                streams[event.stream_id] = (headers, body + event.data)
+                                with self.lock:
+                                    self.conn.acknowledge_received_data(
+                                        event.flow_controlled_length, event.stream_id)
+                            elif isinstance(event, h2.events.StreamEnded):
+                                executor.submit(self.respond, event.stream_id,
+                                                *streams.pop(event.stream_id))
+                            elif isinstance(event, h2.events.ConnectionTerminated):
+                                return
+                        self.flush()
+
+            def respond(self, stream_id, headers, body):
+                if wiki.delay:
+                    time.sleep(wiki.delay)
+                if headers[b':method'] == b'GET':
+                    query = urlsplit(headers[b':path'].decode('utf-8')).query
+                else:
+                    query = body.decode('utf-8')
+                body = wiki.api(dict(parse_qsl(query)))
+                with self.lock:
+                    self.conn.send_headers(stream_id, [
+                        (':status', '200'),
+                        ('content-type', 'application/json'),
+                        ('content-length', str(len(body))),
+                    ])
+                    size = self.conn.max_outbound_frame_size
+                    for i in range(0, len(body), size):
+                        self.conn.send_data(stream_id, body[i:i + size],
+                                            end_stream=i + size >= len(body))
+                self.flush()
+
+            def flush(self):
+                with self.lock:
+                    data = self.conn.data_to_send()
+                    if data:
+                        self.request.sendall(data)
+
+        return socketserver.ThreadingTCPServer(('127.0.0.1', 0), RequestHandler)
+
+
+def siteinfo(version='1.35', logged_in=True):
+    userinfo = {'id': 1, 'name': 'Bot', 'groups': ['*', 'user'],
+                'rights': ['read', 'edit', 'upload']}
+    if not logged_in:
+        userinfo = {'id': 0, 'name': '127.0.0.1', 'anon': '', 'groups': ['*'],
+                    'rights': ['read']}
+    return {
+        'query': {
+            'general': {'generator': f'MediaWiki {version}'},
+            'namespaces': {
+                '0': {'id': 0, '*': ''},
+                '6': {'id': 6, '*': 'File'},
+                '14': {'id': 14, '*': 'Category'},
+            },
+            'userinfo': userinfo,
+        }
+    }
@@ -739,6 +739,56 @@ class TestClientApiMethods(TestCase):
         assert revisions[0]['timestamp'] == time.strptime('2015-11-08T21:52:46Z', '%Y-%m-%dT%H:%M:%SZ')
         assert revisions[1]['revid'] == 689816909
 
+    def test_check_pages(self):
+        # Allowed actions are empty strings, and denied actions are left out
+        self.site.version = (1, 35)
+        self.api.return_value = {'query': {
+            'normalized': [{'from': 'main Page', 'to': 'Main Page'}],
+            'pages': {
+                '1': {'pageid': 1, 'ns': 0, 'title': 'Main Page',
+                      'protection': [{'type': 'edit', 'level': 'sysop',
+                                      'expiry': 'infinity'}],
+                      'actions': {'move': ''}},
+                '-1': {'ns': 0, 'title': 'Missing', 'missing': '', 'protection': [],
+                       'actions': {'edit': ''}},
+                '-2': {'title': 'Bad[', 'invalid': '', 'invalidreason': 'Bad'},
+            },
+        }}
+
+        result = self.site.check_pages(['main Page', 'Missing', 'Bad['],
+                                       actions=('edit', 'move'))
+
+        args, kwargs = self.api.call_args
+        assert kwargs['titles'] == 'main Page|Missing|Bad['
+        assert kwargs['inprop'] == 'protection'
+        assert kwargs['intestactions'] == 'edit|move'
+        assert result['main Page'] == {
+            'title': 'Main Page', 'invalid': False, 'exists': True, 'pageid': 1,
+            'protection': {'edit': ('sysop', 'infinity')},
+            'can': {'edit': False, 'move': True},
+        }
+        assert result['Missing']['exists'] is False
+        assert result['Missing']['can'] == {'edit': True, 'move': False}
+        assert result['Bad[']['invalid'] is True
+        assert result['Bad[']['can'] == {'edit': False, 'move': False}
+
+    def test_check_pages_without_testactions(self):
+        # Before MediaWiki 1.25, permissions are computed from the user's rights
+        self.api.return_value = {'query': {'pages': {
+            '1': {'pageid': 1, 'ns': 0, 'title': 'A', 'protection': []},
+            '2': {'pageid': 2, 'ns': 0, 'title': 'B',
+                  'protection': [{'type': 'edit', 'level': 'sysop'}]},
+        }}}
+
+        result = self.site.check_pages([f'Page {i}' for i in range(60)] + ['A', 'B'])
+
+        assert self.api.call_count == 3
+        args, kwargs = self.api.call_args
+        assert 'intestactions' not in kwargs
+        assert result['A']['can'] == {'edit': True}
+        assert result['B']['can'] == {'edit': False}
+        assert result['Page 0']['invalid'] is True
+
 
 class TestVersionTupleFromGenerator:
 
@@ -907,6 +957,141 @@ class TestClientUploadArgs(TestCase):
             self.site.upload(file=BytesIO(b'test'), filename='Test.jpg', ignore=False)
 
 
+class TestClientSnapshot(TestCase):
+
+    def setUp(self):
+        self.raw_call = mock.patch('mwclient.client.Site.raw_call').start()
+        self.raw_call.return_value = self.metaResponseAsJson(version='1.35')
+        self.site = mwclient.Site('test.wikipedia.org')
+        self.site.tokens['csrf'] = 'abc+\\'
+        self.site.connection.cookies.set('session', 'xyz', domain='test.wikipedia.org')
+        self.raw_call.reset_mock()
+
+    def tearDown(self):
+        mock.patch.stopall()
+
+    def test_snapshot_roundtrip_without_requests(self):
+        snapshot = json.loads(json.dumps(self.site.snapshot()))
+
+        site = mwclient.Site.from_snapshot(snapshot)
+
+        assert self.raw_call.call_count == 0
+        assert site.initialized is True
+        assert site.version == (1, 35)
+        assert site.namespaces == self.site.namespaces
+        assert site.rights == self.site.rights
+        assert site.username == self.site.username
+        assert site.tokens == {'csrf': 'abc+\\'}
+        assert site.connection.cookies.get('session') == 'xyz'
+
+    def test_expired_snapshot_initializes_site(self):
+        snapshot = self.site.snapshot()
+        snapshot['created'] -= 7200
+
+        site = mwclient.Site.from_snapshot(snapshot, max_age=3600)
+
+        assert self.raw_call.call_count == 1
+        assert site.initialized is True
+        assert site.tokens == {}
+        assert site.connection.cookies.get('session') == 'xyz'
+
+    def test_revalidate_snapshot(self):
+        site = mwclient.Site.from_snapshot(self.site.snapshot(), revalidate=True)
+
+        assert self.raw_call.call_count == 1
+        assert 'siteinfo' not in self.raw_call.call_args[0][1]['meta']
+        assert site.initialized is True
+
+
+class TestClientBulkUpload(TestCase):
+
+    def setUp(self):
+        self.raw_call = mock.patch('mwclient.client.Site.raw_call').start()
+        self.sleep = mock.patch('time.sleep').start()
+        self.raw_call.return_value = self.metaResponseAsJson()
+        self.site = mwclient.Site('test.wikipedia.org')
+
+    def tearDown(self):
+        mock.patch.stopall()
+
+    def test_bulk_upload_stashes_then_publishes(self):
+        def upload(file=None, filename=None, description='', ignore=False,
+                   filekey=None, comment=None, asynchronous=False, stash=False):
+            if stash:
+                return {'result': 'Success', 'filekey': 'key-' + filename}
+            assert asynchronous
+            assert filekey == 'key-' + filename
+            return {'result': 'Poll', 'stage': 'queued'}
+
+        statuses = {'key-A.jpg': [{'result': 'Success', 'filename': 'A.jpg'}],
+                    'key-B.jpg': [{'result': 'Poll', 'stage': 'publish'},
+                                  {'result': 'Success', 'filename': 'B.jpg'}]}
+
+        with mock.patch.object(self.site, 'upload', side_effect=upload), \
+                mock.patch.object(self.site, 'upload_status',
+                                  side_effect=lambda key: statuses[key].pop(0)):
+            outcomes = list(self.site.bulk_upload(
+                [(BytesIO(b'a'), 'A.jpg'), (BytesIO(b'b'), 'B.jpg', 'Other')],
+                max_workers=2, poll_interval=0
+            ))
+
+        assert sorted(o['filename'] for o in outcomes) == ['A.jpg', 'B.jpg']
+        assert all(o['stage'] == 'publish' for o in outcomes)
+        assert all(o['result'] == 'Success' for o in outcomes)
+
+    def test_bulk_upload_reports_errors_per_file(self):
+        def upload(file=None, filename=None, description='', stash=False, **kwargs):
+            if filename == 'Bad.jpg':
+                raise mwclient.errors.FileExists(filename)
+            if stash:
+                return {'result': 'Warning', 'warnings': {'duplicate': ['X.jpg']},
+                        'filekey': 'abc'}
+
+        with mock.patch.object(self.site, 'upload', side_effect=upload):
+            outcomes = {o['filename']: o for o in self.site.bulk_upload(
+                [(BytesIO(b'a'), 'Bad.jpg'), (BytesIO(b'b'), 'Dup.jpg')]
+            )}
+
+        assert outcomes['Bad.jpg']['result'] == 'Error'
+        assert isinstance(outcomes['Bad.jpg']['error'], mwclient.errors.FileExists)
+        assert outcomes['Dup.jpg']['stage'] == 'stash'
+        assert outcomes['Dup.jpg']['result'] == 'Warning'
+
+    def test_bulk_upload_close(self):
+        def upload(file=None, filename=None, stash=False, **kwargs):
+            if stash:
+                return {'result': 'Success', 'filekey': 'key-' + filename}
+            return {'result': 'Success' if filename == 'A.jpg' else 'Poll'}
+
+        with mock.patch.object(self.site, 'upload', side_effect=upload), \
+                mock.patch.object(self.site, 'upload_status',
+                                  return_value={'result': 'Poll'}) as upload_status:
+            outcomes = self.site.bulk_upload(
+                [(BytesIO(b'a'), 'A.jpg'), (BytesIO(b'b'), 'B.jpg')],
+                max_workers=2, poll_interval=60
+            )
+            assert next(outcomes)['filename'] == 'A.jpg'
+            start = time.monotonic()
+            outcomes.close()
+
+        # The status of B.jpg is not polled for a minute
+        assert time.monotonic() - start < 10
+        assert upload_status.call_count == 0
+
+    def test_upload_status(self):
+        self.raw_call.side_effect = [
+            json.dumps({'query': {'tokens': {'csrftoken': 'abc+\\'}}}),
+            json.dumps({'upload': {'result': 'Poll', 'stage': 'queued'}}),
+        ]
+
+        status = self.site.upload_status('somekey')
+
+        assert status == {'result': 'Poll', 'stage': 'queued'}
+        data = self.raw_call.call_args[0][1]
+        assert data.get('checkstatus') == '1'
+        assert data.get('filekey') == 'somekey'
+
+
 class TestClientGetTokens(TestCase):
 
     def setUp(self):
@@ -938,6 +1123,63 @@ class TestClientGetTokens(TestCase):
         assert self.site.tokens['csrf'] == 'sometoken'
         assert 'edit' not in self.site.tokens
 
+    def test_prefetch_tokens_single_request(self):
+        self.configure(version='1.24')
+
+        self.raw_call.return_value = json.dumps({
+            'query': {'tokens': {'csrftoken': 'a', 'patroltoken': 'b',
+                                 'rollbacktoken': 'c', 'watchtoken': 'd'}}
+        })
+        self.raw_call.reset_mock()
+        tokens = self.site.prefetch_tokens(
+            ['edit', 'move', 'patrol', 'rollback', 'watch']
+        )
+
+        assert self.raw_call.call_count == 1
+        data = self.raw_call.call_args[0][1]
+        assert data.get('type') == 'csrf|patrol|rollback|watch'
+        assert tokens == {'csrf': 'a', 'patrol': 'b', 'rollback': 'c', 'watch': 'd'}
+        assert self.site.get_token('edit') == 'a'
+        assert self.raw_call.call_count == 1
+
+    def test_prefetch_tokens_skips_cached(self):
+        self.configure(version='1.24')
+        self.site.tokens['csrf'] = 'a'
+
+        self.raw_call.return_value = json.dumps({
+            'query': {'tokens': {'patroltoken': 'b'}}
+        })
+        tokens = self.site.prefetch_tokens(['csrf', 'patrol'])
+
+        data = self.raw_call.call_args[0][1]
+        assert data.get('type') == 'patrol'
+        assert tokens == {'csrf': 'a', 'patrol': 'b'}
+
+    def test_site_init_fetches_tokens_when_logged_in(self):
+        self.configure(version='1.24')
+
+        response = self.metaResponse()
+        del response['query']['userinfo']['anon']
+        response['query']['userinfo']['name'] = 'Bot'
+        response['query']['tokens'] = {'csrftoken': 'sometoken'}
+        self.raw_call.return_value = json.dumps(response)
+        self.site.site_init()
+
+        data = self.raw_call.call_args[0][1]
+        assert 'tokens' in data.get('meta')
+        assert data.get('type') == 'csrf'
+        assert self.site.tokens == {'csrf': 'sometoken'}
+
+    def test_site_init_ignores_anonymous_tokens(self):
+        self.configure(version='1.24')
+
+        response = self.metaResponse()
+        response['query']['tokens'] = {'csrftoken': '+\\'}
+        self.raw_call.return_value = json.dumps(response)
+        self.site.site_init()
+
+        assert self.site.tokens == {}
+
     def test_token_old_system_without_specifying_title(self):
         # Test get_token for MW < 1.24
         self.configure(version='1.23')
@@ -0,0 +1,115 @@
+import unittest
+import unittest.mock as mock
+from array import array
+from typing import Any, Dict  # noqa: F401
+
+import pytest
+
+from mwclient.columnar import ColumnBuilder
+from mwclient.listing import List
+
+if __name__ == "__main__":
+    print()
+    print("Note: Running in stand-alone mode. Consult the README")
+    print("      (section 'Contributing') for advice on running tests.")
+    print()
+
+
+def recentchanges(*rcids, **continue_):
+    data = {'query': {'recentchanges': [
+        {'type': 'edit', 'rcid': rcid, 'ns': 0, 'title': f'Page {rcid}',
+         'newlen': rcid * 10, 'timestamp': '2015-01-02T20:18:36Z'}
+        for rcid in rcids
+    ]}}  # type: Dict[str, Any]
+    if continue_:
+        data['continue'] = continue_
+    return data
+
+
+class TestColumnBuilder(unittest.TestCase):
+
+    def test_array(self):
+        builder = ColumnBuilder(['rcid', 'title', 'newlen'])
+        builder.append({'rcid': 1, 'title': 'A', 'newlen': 10})
+        builder.append({'rcid': 2, 'title': 'B'})
+        assert len(builder) == 2
+
+        batch = builder.build()
+        assert batch == {
+            'rcid': array('q', [1, 2]),
+            'title': ['A', 'B'],
+            'newlen': array('q', [10, -1]),
+        }
+        assert len(builder) == 0
+
+    def test_columns_of_first_item(self):
+        builder = ColumnBuilder(format='list')
+        builder.append({'rcid': 1, 'title': 'A'})
+        builder.append({'rcid': 2, 'title': 'B', 'newlen': 20})
+        assert builder.build() == {'rcid': [1, 2], 'title': ['A', 'B']}
+
+    def test_numpy(self):
+        numpy = pytest.importorskip('numpy')
+        builder = ColumnBuilder(['rcid', 'title'], format='numpy', missing=0)
+        builder.append({'rcid': 1, 'title': 'A'})
+        builder.append({'title': 'B'})
+
+        batch = builder.build()
+        assert batch['rcid'].dtype == numpy.int64
+        assert batch['rcid'].tolist() == [1, 0]
+        assert batch['title'].tolist() == ['A', 'B']
+
+    def test_arrow(self):
+        pyarrow = pytest.importorskip('pyarrow')
+        builder = ColumnBuilder(['rcid', 'title'], format='arrow')
+        builder.append({'rcid': 1, 'title': 'A'})
+        builder.append({'title': 'B'})
+
+        batch = builder.build()
+        assert isinstance(batch, pyarrow.RecordBatch)
+        assert batch.schema.field('rcid').type == pyarrow.int64()
+        assert batch.to_pydict() == {'rcid': [1, None], 'title': ['A', 'B']}
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            ColumnBuilder(format='csv')
+
+
+class TestBatches(unittest.TestCase):
+
+    @mock.patch('mwclient.client.Site')
+    def test_batches(self, mock_site):
+        mock_site.api_limit = 500
+        mock_site.get.side_effect = [
+            recentchanges(1, 2, rccontinue='3', **{'continue': '-||'}),
+            recentchanges(3),
+        ]
+        lst = List(mock_site, 'recentchanges', 'rc', return_values='title')
+
+        batches = list(lst.batches(['rcid', 'newlen', 'timestamp']))
+        assert batches == [
+            {
+                'rcid': array('q', [1, 2]),
+                'newlen': array('q', [10, 20]),
+                'timestamp': array('q', [1420229916, 1420229916]),
+            },
+            {
+                'rcid': array('q', [3]),
+                'newlen': array('q', [30]),
+                'timestamp': array('q', [1420229916]),
+            },
+        ]
+        assert mock_site.get.call_count == 2
+
+    @mock.patch('mwclient.client.Site')
+    def test_batches_max_items(self, mock_site):
+        mock_site.api_limit = 500
+        mock_site.get.return_value = recentchanges(1, 2, 3)
+        lst = List(mock_site, 'recentchanges', 'rc', max_items=2)
+
+        batches = list(lst.batches(['rcid'], format='list'))
+        assert batches == [{'rcid': [1, 2]}]
+
+
+if __name__ == '__main__':
+    unittest.main()
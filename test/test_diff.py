@@ -0,0 +1,90 @@
+import unittest
+import unittest.mock as mock
+
+from mwclient.diff import (
+    RevisionDiffer, diff_history, diff_lines, diff_revisions, diff_texts, diff_words
+)
+
+if __name__ == "__main__":
+    print()
+    print("Note: Running in stand-alone mode. Consult the README")
+    print("      (section 'Contributing') for advice on running tests.")
+    print()
+
+
+class TestDiff(unittest.TestCase):
+
+    def test_diff_lines(self):
+        assert diff_lines('a\nb', 'a\nb') == []
+        assert diff_lines('a\nb\nc', 'a\nc\nd') == [
+            {'op': 'delete', 'old_start': 1, 'old': ['b'], 'new_start': 1, 'new': []},
+            {'op': 'insert', 'old_start': 3, 'old': [], 'new_start': 2, 'new': ['d']},
+        ]
+
+    def test_diff_words(self):
+        assert diff_words('the cat sat.', 'the black cat sat!') == [
+            {'op': 'insert', 'old': '', 'new': ' black'},
+            {'op': 'replace', 'old': '.', 'new': '!'},
+        ]
+
+    def test_diff_texts(self):
+        diff = diff_texts('a\nthe cat', 'a\nthe dog\nb')
+        assert diff == [{
+            'op': 'replace', 'old_start': 1, 'old': ['the cat'], 'new_start': 1,
+            'new': ['the dog', 'b'],
+            'words': [{'op': 'replace', 'old': 'cat', 'new': 'dog\nb'}],
+        }]
+        assert 'words' not in diff_texts('a\nthe cat', 'a\nthe dog', words=False)[0]
+
+    def test_diff_revisions(self):
+        old = {'sha1': 'abc', 'slots': {'main': {'*': 'a'}}}
+        # The texts are not compared when the SHA-1s are equal
+        assert diff_revisions(old, {'sha1': 'abc', '*': 'b'}) == []
+        assert diff_revisions(old, {'sha1': 'def', '*': 'b'})[0]['new'] == ['b']
+        assert diff_revisions(old, {'texthidden': ''})[0]['op'] == 'delete'
+
+    def test_diff_history(self):
+        revisions = [{'revid': 1, '*': 'a'}, {'revid': 2, '*': 'b'},
+                     {'revid': 3, '*': 'b'}]
+        diffs = [(old['revid'], new['revid'], len(diff))
+                 for old, new, diff in diff_history(iter(revisions))]
+        assert diffs == [(1, 2, 1), (2, 3, 0)]
+
+
+class TestRevisionDiffer(unittest.TestCase):
+
+    def setUp(self):
+        self.site = mock.MagicMock()
+        self.site.version = (1, 35)
+        self.texts = {1: 'a', 2: 'b', 3: 'a\nc'}
+
+        def get(action, **params):
+            revids = [int(revid) for revid in params['revids'].split('|')]
+            revisions = [{'revid': revid, 'sha1': str(hash(self.texts[revid])),
+                          'slots': {'main': {'*': self.texts[revid]}}}
+                         for revid in revids if revid in self.texts]
+            return {'query': {'pages': {'1': {'pageid': 1, 'revisions': revisions}}}}
+        self.site.get.side_effect = get
+
+    def test_compare(self):
+        differ = RevisionDiffer(self.site)
+        assert differ.compare(1, 3) == [
+            {'op': 'insert', 'old_start': 1, 'old': [], 'new_start': 1, 'new': ['c']},
+        ]
+        assert differ.compare(1, 1) == []
+        assert self.site.get.call_count == 1
+        assert self.site.get.call_args[1]['revids'] == '1|3'
+        assert self.site.get.call_args[1]['rvslots'] == 'main'
+        assert differ.text(4) == ''
+
+    def test_compare_many(self):
+        differ = RevisionDiffer(self.site, cache_size=2)
+        diffs = differ.compare_many([(1, 2), (2, 3), (1, 3)])
+        assert [len(diff) for diff in diffs] == [1, 1, 1]
+        assert [call[1]['revids'] for call in self.site.get.call_args_list] == \
+            ['1|2', '3', '1']
+        assert len(differ._cache) == 2
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,203 @@
+import bz2
+import gzip
+import io
+import os
+import tempfile
+import time
+import unittest
+import unittest.mock as mock
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from mwclient.dump import DumpReader, MultistreamDump
+
+if __name__ == "__main__":
+    print()
+    print("Note: Running in stand-alone mode. Consult the README")
+    print("      (section 'Contributing') for advice on running tests.")
+    print()
+
+HEADER = b'''<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.11/" version="0.11">
+  <siteinfo>
+    <sitename>Wikipedia</sitename>
+    <namespaces>
+      <namespace key="0" case="first-letter" />
+      <namespace key="10" case="first-letter">Template</namespace>
+    </namespaces>
+  </siteinfo>
+'''
+
+PAGES = [b'''  <page>
+    <title>A</title>
+    <ns>0</ns>
+    <id>1</id>
+    <revision>
+      <id>10</id>
+      <timestamp>2024-01-01T00:00:00Z</timestamp>
+      <contributor><username>Alice</username><id>5</id></contributor>
+      <comment>Created</comment>
+      <model>wikitext</model>
+      <format>text/x-wiki</format>
+      <text bytes="9" xml:space="preserve">Text of A</text>
+      <sha1>abc</sha1>
+    </revision>
+    <revision>
+      <id>11</id>
+      <parentid>10</parentid>
+      <timestamp>2024-01-02T00:00:00Z</timestamp>
+      <contributor><ip>127.0.0.1</ip></contributor>
+      <minor />
+      <comment deleted="deleted" />
+      <model>wikitext</model>
+      <format>text/x-wiki</format>
+      <text bytes="13" xml:space="preserve">New text of A</text>
+      <sha1>def</sha1>
+    </revision>
+  </page>
+''', b'''  <page>
+    <title>B</title>
+    <ns>0</ns>
+    <id>2</id>
+    <redirect title="A" />
+    <revision>
+      <id>20</id>
+      <timestamp>2024-01-03T00:00:00Z</timestamp>
+      <contributor deleted="deleted" />
+      <model>wikitext</model>
+      <format>text/x-wiki</format>
+      <text bytes="15" xml:space="preserve">#REDIRECT [[A]]</text>
+    </revision>
+  </page>
+''', b'''  <page>
+    <title>Template:T</title>
+    <ns>10</ns>
+    <id>3</id>
+    <revision>
+      <id>30</id>
+      <timestamp>2024-01-04T00:00:00Z</timestamp>
+      <contributor><username>Bob</username><id>6</id></contributor>
+      <text bytes="8" deleted="deleted" />
+    </revision>
+  </page>
+''']
+
+FOOTER = b'</mediawiki>\n'
+
+
+def page_name(page):
+    return page.name
+
+
+class TestDumpReader(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.dir.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def check_pages(self, reader):
+        pages = list(reader)
+        assert [page.name for page in pages] == ['A', 'B', 'Template:T']
+        assert [page.namespace for page in pages] == [0, 0, 10]
+        assert [page.redirect for page in pages] == [False, True, False]
+        assert pages[1].redirect_target == 'A'
+        assert pages[0].text() == 'New text of A'
+        assert pages[0].revision == 11
+        assert pages[2].text() == ''
+        assert reader.siteinfo['sitename'] == 'Wikipedia'
+        assert reader.siteinfo['namespaces'] == {0: '', 10: 'Template'}
+
+    def test_pages(self):
+        reader = DumpReader(io.BytesIO(HEADER + b''.join(PAGES) + FOOTER))
+        self.check_pages(reader)
+
+    def test_compressed(self):
+        data = HEADER + b''.join(PAGES) + FOOTER
+        for name, compressed in [('dump.xml', data), ('dump.xml.bz2', bz2.compress(data)),
+                                 ('dump.xml.gz', gzip.compress(data))]:
+            self.check_pages(DumpReader(self.write(name, compressed)))
+
+    def test_zstd(self):
+        zstandard = pytest.importorskip('zstandard')
+        data = zstandard.ZstdCompressor().compress(HEADER + b''.join(PAGES) + FOOTER)
+        self.check_pages(DumpReader(self.write('dump.xml.zst', data)))
+
+    def test_revisions(self):
+        reader = DumpReader(io.BytesIO(HEADER + b''.join(PAGES) + FOOTER))
+        revisions = list(reader.revisions())
+
+        assert [(page.name, revision['revid']) for page, revision in revisions] == \
+            [('A', 10), ('A', 11), ('B', 20), ('Template:T', 30)]
+        assert revisions[0][1] == {
+            'revid': 10, 'timestamp': time.strptime('2024-01-01', '%Y-%m-%d'),
+            'user': 'Alice', 'userid': 5, 'comment': 'Created',
+            'contentmodel': 'wikitext', 'contentformat': 'text/x-wiki',
+            'size': 9, '*': 'Text of A', 'sha1': 'abc',
+        }
+        second = revisions[1][1]
+        assert second['parentid'] == 10
+        assert second['user'] == '127.0.0.1'
+        assert 'anon' in second and 'minor' in second and 'commenthidden' in second
+        assert 'userhidden' in revisions[2][1]
+        assert 'texthidden' in revisions[3][1] and '*' not in revisions[3][1]
+
+    def test_timestamps(self):
+        reader = DumpReader(io.BytesIO(HEADER + b''.join(PAGES) + FOOTER),
+                            timestamps='raw')
+        page = next(iter(reader))
+        assert page.revisions()[0]['timestamp'] == '2024-01-02T00:00:00Z'
+
+    def test_multistream(self):
+        streams = [bz2.compress(HEADER), bz2.compress(PAGES[0] + PAGES[1]),
+                   bz2.compress(PAGES[2]), bz2.compress(FOOTER)]
+        path = self.write('dump-multistream.xml.bz2', b''.join(streams))
+        offsets = [len(streams[0]), len(streams[0]) + len(streams[1])]
+        index = f'{offsets[0]}:1:A\n{offsets[0]}:2:B\n{offsets[1]}:3:Template:T\n'
+        index_path = self.write('index.txt.bz2', bz2.compress(index.encode()))
+
+        dump = MultistreamDump(path, index_path)
+        assert dump.offsets() == offsets
+        # The whole file is still a valid dump
+        self.check_pages(DumpReader(path))
+        assert list(dump.pages(processes=2, function=page_name)) == \
+            ['A', 'B', 'Template:T']
+        assert [page.text() for page in dump.pages(processes=1)][:1] == \
+            ['New text of A']
+
+    def test_multistream_read_ahead(self):
+        pages = PAGES * 2
+        streams = [bz2.compress(HEADER)] + [bz2.compress(page) for page in pages] + \
+            [bz2.compress(FOOTER)]
+        path = self.write('dump-multistream.xml.bz2', b''.join(streams))
+        offsets = [sum(len(stream) for stream in streams[:i])
+                   for i in range(1, len(pages) + 1)]
+        index = ''.join(f'{offset}:{i}:Page\n' for i, offset in enumerate(offsets))
+        index_path = self.write('index.txt.bz2', bz2.compress(index.encode()))
+        submitted = []
+        original_submit = ThreadPoolExecutor.submit
+
+        def submit(executor, fn, *args):
+            submitted.append(args[1])
+            return original_submit(executor, fn, *args)
+
+        dump = MultistreamDump(path, index_path)
+        with mock.patch('mwclient.dump.ProcessPoolExecutor', ThreadPoolExecutor), \
+                mock.patch.object(ThreadPoolExecutor, 'submit', submit):
+            names = dump.pages(processes=1, function=page_name)
+            assert next(names) == 'A'
+            # Two streams per process are read ahead of the one yielded
+            assert submitted == offsets[:3]
+            assert list(names) == ['B', 'Template:T', 'A', 'B', 'Template:T']
+            assert submitted == offsets
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import json
+import unittest
+from itertools import islice
+from typing import Any, List  # noqa: F401
+
+import requests
+
+import mwclient
+from mwclient.eventstreams import RecentChangesStream, parse_events
+from test.fake_wiki import FakeWiki, siteinfo
+
+if __name__ == "__main__":
+    print()
+    print("Note: Running in stand-alone mode. Consult the README")
+    print("      (section 'Contributing') for advice on running tests.")
+    print()
+
+
+class TestParseEvents(unittest.TestCase):
+
+    def test_parse_events(self):
+        chunks = [b': keep-alive\n\nid: 1\nevent: mess', b'age\r\ndata: {"a":\r\n',
+                  b'data: 1}\n\nretry: 100\n\n', b'data: incomplete']
+        assert list(parse_events(chunks)) == [
+            {'id': '1', 'event': 'message', 'data': '{"a":\n1}'},
+            {'retry': '100'},
+        ]
+
+
+class TestRecentChangesStream(unittest.TestCase):
+
+    def setUp(self):
+        self.connections = []
+        self.headers = []
+        self.recentchanges = []
+        # The events sent on each connection to the stream
+        self.events = []  # type: List[List[Any]]
+
+    def handler(self, params):
+        if params.get('meta', '').startswith('siteinfo'):
+            return siteinfo()
+        assert params['list'] == 'recentchanges'
+        return self.recentchanges.pop(0)
+
+    def stream(self, request):
+        # Sends the events of the next connection, then closes it
+        self.connections.append(request.headers.get('Last-Event-ID'))
+        self.headers.append(request.headers)
+        events = self.events.pop(0) if self.events else None
+        if events is None:
+            request.send_response(503)
+            request.send_header('Content-Length', '0')
+            request.end_headers()
+            return
+        request.send_response(200)
+        request.send_header('Content-Type', 'text/event-stream')
+        request.send_header('Connection', 'close')
+        request.end_headers()
+        request.close_connection = True
+        request.wfile.write(b'retry: 0\n\n')
+        for event_id, change in events:
+            request.wfile.write(f'event: message\nid: {event_id}\n'
+                                f'data: {json.dumps(change)}\n\n'.encode('utf-8'))
+            request.wfile.flush()
+
+    def consume(self, count, site_options=None, **kwargs):
+        with FakeWiki(self.handler, {'/v2/stream/recentchange': self.stream}) as wiki:
+            self.host = wiki.host
+            events = [[(event_id, dict(change, server_name=wiki.host))
+                       for event_id, change in connection]
+                      for connection in self.events]  # type: List[List[Any]]
+            self.events = events
+            site = mwclient.Site(wiki.host, scheme='http', **(site_options or {}))
+            stream = RecentChangesStream(
+                site, url=f'http://{wiki.host}/v2/stream/recentchange', **kwargs
+            )
+            stream.reconnect_delay = 0
+            changes = list(islice(stream, count))
+        return stream, changes, wiki.calls
+
+    def test_stream(self):
+        self.events = [
+            [('[1]', {'id': 1, 'title': 'A', 'timestamp': 100}),
+             ('[2]', {'id': 1, 'title': 'Other', 'meta': {'domain': 'canary'}})],
+            [('[3]', {'id': 2, 'title': 'B', 'timestamp': 101})],
+        ]
+        stream, changes, _ = self.consume(2)
+
+        assert [change['title'] for change in changes] == ['A', 'B']
+        # The stream is reopened from the last event
+        assert self.connections == [None, '[2]']
+        assert stream.timestamp == 101
+        assert stream.rcid == 2
+        assert not stream.polling
+
+    def test_wiki(self):
+        self.events = [[
+            ('[1]', {'id': 1, 'title': 'A', 'wiki': 'enwiki'}),
+            ('[2]', {'id': 2, 'title': 'B', 'wiki': 'frwiki'}),
+        ]]
+        _, changes, _ = self.consume(1, wiki='frwiki')
+        assert [change['title'] for change in changes] == ['B']
+
+    def test_site_credentials_are_not_sent(self):
+        pool = requests.Session()
+        pool.auth = ('user', 'secret')
+        pool.cookies.set('session', 'abc')
+        pool.headers['User-Agent'] = 'Bot/1.0'
+        self.events = [[('[1]', {'id': 1, 'title': 'A'})]]
+        self.consume(1, site_options={'pool': pool})
+
+        [headers] = self.headers
+        assert 'Authorization' not in headers
+        assert 'Cookie' not in headers
+        assert headers['User-Agent'] == 'Bot/1.0'
+
+    def test_fallback(self):
+        self.events = [[('[10]', {'id': 10, 'title': 'A', 'timestamp': 1704067200})]]
+        self.recentchanges = [
+            {
+                'continue': {'rccontinue': '20240101000001|12', 'continue': '-||'},
+                'query': {'recentchanges': [
+                    # Received from the stream
+                    {'rcid': 10, 'type': 'edit', 'ns': 0, 'title': 'A',
+                     'timestamp': '2024-01-01T00:00:00Z'},
+                    {'rcid': 11, 'type': 'edit', 'ns': 0, 'title': 'B',
+                     'timestamp': '2024-01-01T00:00:00Z', 'revid': 5, 'old_revid': 4,
+                     'bot': '', 'user': 'Bot'},
+                ]},
+            },
+            {'query': {'recentchanges': [
+                {'rcid': 12, 'type': 'log', 'ns': 0, 'title': 'C',
+                 'timestamp': '2024-01-01T00:00:01Z', 'logtype': 'delete',
+                 'logaction': 'delete'},
+            ]}},
+        ]
+        stream, changes, calls = self.consume(3, retries=1, poll_interval=0,
+                                              retry_stream=None)
+
+        # The stream was closed, then unavailable
+        assert self.connections == [None, '[10]']
+        assert stream.polling
+        assert [change['title'] for change in changes] == ['A', 'B', 'C']
+        assert changes[1] == {
+            'id': 11, 'type': 'edit', 'namespace': 0, 'title': 'B', 'comment': '',
+            'timestamp': 1704067200, 'user': 'Bot', 'bot': True, 'minor': False,
+            'server_name': self.host, 'revision': {'old': 4, 'new': 5},
+            'length': {'old': None, 'new': None},
+        }
+        assert changes[2]['log_type'] == 'delete'
+
+        polls = [call for call in calls if call.get('list') == 'recentchanges']
+        assert polls[0]['rcstart'] == '2024-01-01T00:00:00Z'
+        assert polls[1]['rccontinue'] == '20240101000001|12'
+        assert stream.rccontinue == '20240101000001|13'
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import hashlib
+import unittest
+import unittest.mock as mock
+from typing import Any, Dict  # noqa: F401
+
+from mwclient.history import HistoryExporter
+
+if __name__ == "__main__":
+    print()
+    print("Note: Running in stand-alone mode. Consult the README")
+    print("      (section 'Contributing') for advice on running tests.")
+    print()
+
+
+class FakeWiki:
+    """Answers the queries made by HistoryExporter from a list of revisions."""
+
+    def __init__(self):
+        # (revid, text), from the oldest
+        self.revisions = [(1, 'First'), (2, 'Vandalism'), (3, 'First'), (4, 'Second')]
+        self.content_requests = []
+
+    def get(self, action, **params):
+        if 'revids' in params:
+            revids = [int(revid) for revid in params['revids'].split('|')]
+            self.content_requests.append(revids)
+            # One revision per response, like when the content is too large
+            if 'rvcontinue' in params:
+                revids = revids[int(params['rvcontinue']):]
+            revisions = [{'revid': revid, 'slots': {'main': {'*': text}}}
+                         for revid, text in self.revisions if revid == revids[0]]
+            data = {
+                'query': {'pages': {'1': {'pageid': 1, 'revisions': revisions}}}
+            }  # type: Dict[str, Any]
+            if len(revids) > 1:
+                offset = int(params.get('rvcontinue', 0)) + 1
+                data['continue'] = {'rvcontinue': str(offset), 'continue': '||'}
+            return data
+
+        if params['titles'] != 'Page':
+            return {'query': {'pages': {'-1': {'ns': 0, 'title': params['titles'],
+                                               'missing': ''}}}}
+        revisions = [
+            {'revid': revid, 'parentid': revid - 1, 'user': 'Alice', 'comment': '',
+             'timestamp': f'2024-01-0{revid}T00:00:00Z', 'size': len(text),
+             'sha1': hashlib.sha1(text.encode()).hexdigest()}
+            for revid, text in self.revisions
+            if revid >= params.get('rvstartid', 0)
+        ]
+        return {'query': {'pages': {'1': {'pageid': 1, 'ns': 0, 'title': 'Page',
+                                          'revisions': revisions}}}}
+
+
+class TestHistoryExporter(unittest.TestCase):
+
+    def setUp(self):
+        self.wiki = FakeWiki()
+        self.site = mock.MagicMock()
+        self.site.version = (1, 35)
+        self.site.get.side_effect = self.wiki.get
+        self.exporter = HistoryExporter(self.site, ':memory:')
+
+    def tearDown(self):
+        self.exporter.close()
+
+    def test_export(self):
+        assert self.exporter.export(['Page', 'Missing']) == 4
+        assert self.exporter.last_revid('Page') == 4
+        assert self.exporter.last_revid('Missing') is None
+
+        # The content of revision 3 is the same as revision 1
+        assert self.wiki.content_requests == [[1, 2, 4], [1, 2, 4], [1, 2, 4]]
+        assert self.site.get.call_args_list[1][1]['rvslots'] == 'main'
+        assert [self.exporter.text(revid) for revid in range(1, 6)] == \
+            ['First', 'Vandalism', 'First', 'Second', None]
+        assert self.exporter.db.execute('SELECT COUNT(*) FROM contents').fetchone() == \
+            (3,)
+
+        revisions = list(self.exporter.revisions('Page'))
+        assert [revision['revid'] for revision in revisions] == [1, 2, 3, 4]
+        assert revisions[0] == {
+            'revid': 1, 'pageid': 1, 'parentid': 0, 'timestamp': '2024-01-01T00:00:00Z',
+            'user': 'Alice', 'comment': '', 'minor': False, 'size': 5,
+            'sha1': hashlib.sha1(b'First').hexdigest(),
+        }
+
+    def test_resume(self):
+        self.exporter.export(['Page'])
+        self.wiki.revisions.append((5, 'Second'))
+        self.wiki.revisions.append((6, 'Third'))
+        self.wiki.content_requests = []
+
+        assert self.exporter.export(['Page']) == 2
+        assert self.site.get.call_args_list[-2][1]['rvstartid'] == 4
+        assert self.wiki.content_requests == [[6]]
+        assert self.exporter.last_revid('Page') == 6
+        assert self.exporter.text(5) == 'Second'
+        assert self.exporter.text(6) == 'Third'
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import subprocess
+import sys
+import unittest
+from typing import Any, Dict  # noqa: F401
+
+import mwclient
+
+if __name__ == "__main__":
+    print()
+    print("Note: Running in stand-alone mode. Consult the README")
+    print("      (section 'Contributing') for advice on running tests.")
+    print()
+
+
+def import_times(statement):
+    # Runs the statement in a fresh interpreter with `-X importtime` and returns
+    # the cumulative import time (in microseconds) of each imported module.
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        stderr=subprocess.PIPE, universal_newlines=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_import_mwclient_is_lightweight(self):
+        times = import_times('import mwclient')
+
+        assert 'mwclient' in times
+        assert 'requests' not in times
+        assert 'requests_oauthlib' not in times
+
+    def test_site_does_not_import_oauth(self):
+        times = import_times('from mwclient import Site')
+
+        assert 'mwclient.client' in times
+        assert 'requests_oauthlib' not in times
+        assert 'oauthlib' not in times
+
+    def test_submodules_are_available(self):
+        subprocess.run(
+            [sys.executable, '-c',
+             'import mwclient; mwclient.page.Page; mwclient.listing.List'],
+            check=True
+        )
+
+    def test_star_import(self):
+        namespace = {}  # type: Dict[str, Any]
+        exec('from mwclient import *', namespace)
+
+        assert namespace['Site'] is mwclient.Site
+        assert namespace['APIError'] is mwclient.errors.APIError
+        assert namespace['page'] is mwclient.page
+        assert 'Any' not in namespace
+
+
+if __name__ == '__main__':
+    unittest.main()
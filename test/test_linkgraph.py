@@ -0,0 +1,110 @@
+import unittest
+import unittest.mock as mock
+from array import array
+
+import pytest
+
+from mwclient.linkgraph import LinkGraph
+
+if __name__ == "__main__":
+    print()
+    print("Note: Running in stand-alone mode. Consult the README")
+    print("      (section 'Contributing') for advice on running tests.")
+    print()
+
+
+def links(*titles):
+    return [{'ns': 0, 'title': title} for title in titles]
+
+
+class TestLinkGraph(unittest.TestCase):
+
+    @mock.patch('mwclient.client.Site')
+    def test_update(self, mock_site):
+        mock_site.get.side_effect = [
+            {
+                'continue': {'plcontinue': '1|0|C', 'continue': '||'},
+                'query': {'pages': {
+                    '1': {'pageid': 1, 'ns': 0, 'title': 'A', 'links': links('B')},
+                    '2': {'pageid': 2, 'ns': 0, 'title': 'B'},
+                }},
+            },
+            {
+                'batchcomplete': '',
+                'query': {'pages': {
+                    '1': {'pageid': 1, 'ns': 0, 'title': 'A', 'links': links('C')},
+                    '2': {'pageid': 2, 'ns': 0, 'title': 'B', 'links': links('A')},
+                }},
+            },
+        ]
+        graph = LinkGraph(mock_site, 'links', namespace=0)
+        graph.update(['A', 'B'])
+
+        assert mock_site.get.call_args_list == [
+            mock.call('query', prop='links', titles='A|B', pllimit='max',
+                      plnamespace=0),
+            mock.call('query', prop='links', titles='A|B', pllimit='max',
+                      plnamespace=0, plcontinue='1|0|C', **{'continue': '||'}),
+        ]
+        assert graph.titles == ['A', 'B', 'C']
+        assert graph.neighbours('A') == ['B', 'C']
+        assert graph.neighbours('B') == ['A']
+        with pytest.raises(KeyError):
+            graph.neighbours('C')
+        assert list(graph.edges()) == [(0, 1), (0, 2), (1, 0)]
+        assert graph.to_csr() == (array('q', [0, 2, 3, 3]), array('i', [1, 2, 0]))
+
+    @mock.patch('mwclient.client.Site')
+    def test_incremental_update(self, mock_site):
+        mock_site.get.side_effect = [
+            {'query': {'pages': {'0': {'title': 'A', 'links': links('X')},
+                                 '1': {'title': 'B', 'links': links('X')}}}},
+            {'query': {'pages': {'0': {'title': 'A', 'links': links('Y')}}}},
+        ]
+        graph = LinkGraph(mock_site)
+        graph.update(['A', 'B'])
+        graph.update(['A'])
+
+        assert graph.neighbours('A') == ['Y']
+        assert graph.neighbours('B') == ['X']
+        assert len(graph) == 4
+
+    @mock.patch('mwclient.client.Site')
+    def test_batches(self, mock_site):
+        mock_site.get.return_value = {'query': {'pages': {}}}
+        graph = LinkGraph(mock_site, 'linkshere', batch_size=2)
+        graph.update(['A', 'B', 'C'], max_workers=2)
+
+        assert sorted(call[1]['titles'] for call in mock_site.get.call_args_list) == \
+            ['A|B', 'C']
+        assert mock_site.get.call_args[1]['lhlimit'] == 'max'
+
+    @mock.patch('mwclient.client.Site')
+    def test_batches_are_built_lazily(self, mock_site):
+        consumed = []
+        read_ahead = []
+
+        def titles():
+            for i in range(10):
+                consumed.append(i)
+                yield f'Page {i}'
+
+        def get(action, **kwargs):
+            read_ahead.append(len(consumed) - int(kwargs['titles'].split()[1]))
+            return {'query': {'pages': {}}}
+
+        mock_site.get.side_effect = get
+        graph = LinkGraph(mock_site, 'links', batch_size=1)
+        graph.update(titles(), max_workers=1)
+
+        assert len(read_ahead) == 10
+        # Two batches per worker are submitted ahead of the one fetched
+        assert max(read_ahead) <= 3
+
+    def test_unsupported_prop(self):
+        with pytest.raises(ValueError):
+            LinkGraph(mock.Mock(), 'categories')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,11 @@
+import time
 import unittest
 import pytest
 import mwclient
 from mwclient.listing import List, NestedList, GeneratorList
-from mwclient.listing import Category, PageList, RevisionsIterator
+from mwclient.listing import Category, PageList, PageRecord, RevisionsIterator
 from mwclient.page import Page
+from test.fake_wiki import FakeWiki, siteinfo
 
 import unittest.mock as mock
 
@@ -162,6 +164,25 @@ class TestList(unittest.TestCase):
         assert lst.args["aplimit"] == "1"
         assert mock_site.get.call_count == 2
 
+    @mock.patch('mwclient.client.Site')
+    def test_list_timestamps(self, mock_site):
+        # Test that the timestamps of items are converted as configured
+        mock_site.api_limit = 500
+        for timestamps, expected in [
+            (None, time.struct_time((2015, 1, 2, 20, 18, 36, 4, 2, -1))),
+            ('epoch', 1420229916),
+            ('raw', '2015-01-02T20:18:36Z'),
+        ]:
+            mock_site.get.return_value = {'query': {'recentchanges': [
+                {'rcid': 1, 'timestamp': '2015-01-02T20:18:36Z'},
+            ]}}
+            lst = List(mock_site, 'recentchanges', 'rc', timestamps=timestamps)
+            assert next(lst)['timestamp'] == expected
+
+        mock_site.listing_timestamps = 'epoch'
+        lst = List(mock_site, 'recentchanges', 'rc')
+        assert next(lst)['timestamp'] == 1420229916
+
     @mock.patch('mwclient.client.Site')
     def test_list_with_str_return_value(self, mock_site):
         # Test that the List yields strings when return_values is string
@@ -296,6 +317,102 @@ class TestList(unittest.TestCase):
         assert type(vals[1]) == mwclient.image.Image
         assert type(vals[2]) == mwclient.listing.Category
 
+    @mock.patch('mwclient.client.Site')
+    def test_generator_list_lightweight(self, mock_site):
+        # Test that a lightweight GeneratorList yields compact page records
+
+        mock_site.api_limit = 500
+        lst = GeneratorList(mock_site, 'pages', 'p', lightweight=True)
+        self.setupDummyResponsesTwo(mock_site, 'pages', ns=[0, 6, 14])
+        vals = [x for x in lst]
+
+        assert lst.args['prop'] == 'info'
+        assert 'inprop' not in lst.args
+        assert 'iiprop' not in lst.args
+        assert len(vals) == 3
+        assert all(type(val) is PageRecord for val in vals)
+        assert [val.namespace for val in vals] == [0, 6, 14]
+        assert vals[0].name == 'Kre\'fey'
+        assert vals[0].exists
+        assert not hasattr(vals[0], '__dict__')
+
+    @mock.patch('mwclient.client.Site')
+    def test_generator_list_extra_properties(self, mock_site):
+        # Test that the results of extra prop modules are merged across prop
+        # continuations and attached to the pages
+
+        mock_site.api_limit = 500
+        mock_site.get.side_effect = [
+            {
+                'continue': {'clcontinue': '1|B', 'gapcontinue': 'C',
+                             'continue': 'gapcontinue||'},
+                'query': {'pages': {
+                    '1': {'pageid': 1, 'ns': 0, 'title': 'A',
+                          'categories': [{'ns': 14, 'title': 'Category:A'}],
+                          'pageprops': {'wikibase_item': 'Q1'}},
+                    '2': {'pageid': 2, 'ns': 0, 'title': 'B'},
+                }},
+            },
+            {
+                'batchcomplete': '',
+                'continue': {'gapcontinue': 'C', 'continue': 'gapcontinue||'},
+                'query': {'pages': {
+                    '1': {'pageid': 1, 'ns': 0, 'title': 'A',
+                          'categories': [{'ns': 14, 'title': 'Category:B'}]},
+                    '2': {'pageid': 2, 'ns': 0, 'title': 'B',
+                          'categories': [{'ns': 14, 'title': 'Category:C'}]},
+                }},
+            },
+            {
+                'batchcomplete': '',
+                'query': {'pages': {
+                    '3': {'pageid': 3, 'ns': 0, 'title': 'C'},
+                }},
+            },
+        ]
+        lst = GeneratorList(mock_site, 'allpages', 'ap', extra_properties={
+            'categories': [('cllimit', 'max')],
+            'pageprops': [],
+        })
+        vals = [x for x in lst]
+
+        assert lst.args['prop'] == 'info|imageinfo|categories|pageprops'
+        assert lst.args['cllimit'] == 'max'
+        assert [val.name for val in vals] == ['A', 'B', 'C']
+        assert vals[0].properties == {
+            'categories': [{'ns': 14, 'title': 'Category:A'},
+                           {'ns': 14, 'title': 'Category:B'}],
+            'pageprops': {'wikibase_item': 'Q1'},
+        }
+        assert vals[1].properties == {'categories': [{'ns': 14, 'title': 'Category:C'}]}
+        assert vals[2].properties == {}
+        assert mock_site.get.call_count == 3
+        # The prop continuation of the first batch is not sent with the second
+        args = dict(mock_site.get.call_args_list[1][0][2:])
+        assert args['clcontinue'] == '1|B'
+        args = dict(mock_site.get.call_args_list[2][0][2:])
+        assert 'clcontinue' not in args
+        assert args['gapcontinue'] == 'C'
+
+    @mock.patch('mwclient.client.Site')
+    def test_page_record_page(self, mock_site):
+        # Test that PageRecord.page() fetches the full page object
+
+        mock_site.api_limit = 500
+        mock_site.get.return_value = {'query': {'pages': {'12': {
+            'pageid': 12, 'ns': 14, 'title': 'Category:Cats', 'lastrevid': 34,
+            'length': 56, 'protection': [],
+        }}}}
+        record = PageRecord(mock_site, {'pageid': 12, 'ns': 14, 'title': 'Category:Cats',
+                                        'lastrevid': 34, 'length': 56})
+
+        page = record.page()
+
+        assert type(page) is mwclient.listing.Category
+        assert page.name == 'Category:Cats'
+        assert page.revision == 34
+        assert page.length == 56
+
     @mock.patch('mwclient.client.Site')
     def test_category(self, mock_site):
         # Test that Category works as expected
@@ -463,5 +580,69 @@ class TestList(unittest.TestCase):
         assert len(vals) == 0
 
 
+class TestCategoryWalk(unittest.TestCase):
+
+    # title -> (pageid, ns, members)
+    tree = {
+        'Category:Root': (1, 14, ['A', 'Category:Sub1', 'Category:Sub2',
+                                  'Category:Empty']),
+        'Category:Sub1': (2, 14, ['B', 'Category:Root', 'Category:Sub2',
+                                  'Category:Deep']),
+        'Category:Sub2': (3, 14, ['B', 'File:C.png']),
+        'Category:Deep': (4, 14, ['D']),
+        'Category:Empty': (5, 14, []),
+        'A': (10, 0, []),
+        'B': (11, 0, []),
+        'File:C.png': (12, 6, []),
+        'D': (13, 0, []),
+    }
+
+    def handler(self, params):
+        if params.get('meta', '').startswith('siteinfo'):
+            return siteinfo()
+        assert 'categoryinfo' in params['prop']
+        namespaces = params.get('gcmnamespace')
+        pages = {}
+        for title in self.tree[params['gcmtitle']][2]:
+            pageid, ns, members = self.tree[title]
+            if namespaces and str(ns) not in namespaces.split('|'):
+                continue
+            info = {'pageid': pageid, 'ns': ns, 'title': title}
+            if ns == 14:
+                info['categoryinfo'] = {
+                    'size': len(members),
+                    'pages': sum(self.tree[m][1] not in (6, 14) for m in members),
+                    'files': sum(self.tree[m][1] == 6 for m in members),
+                    'subcats': sum(self.tree[m][1] == 14 for m in members),
+                }
+            pages[str(pageid)] = info
+        return {'batchcomplete': '', 'query': {'pages': pages}}
+
+    def walk(self, **kwargs):
+        with FakeWiki(self.handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http')
+            category = Category(site, 'Category:Root', {
+                'pageid': 1, 'ns': 14, 'title': 'Category:Root'
+            })
+            names = [page.name for page in category.walk(**kwargs)]
+        listed = sorted(call['gcmtitle'] for call in wiki.calls if 'gcmtitle' in call)
+        return names, listed
+
+    def test_walk(self):
+        names, listed = self.walk()
+
+        assert sorted(names) == ['A', 'B', 'Category:Deep', 'Category:Empty',
+                                 'Category:Sub1', 'Category:Sub2', 'D', 'File:C.png']
+        # Each category is listed once, and empty ones not at all
+        assert listed == ['Category:Deep', 'Category:Root', 'Category:Sub1',
+                          'Category:Sub2']
+
+    def test_walk_depth_and_namespaces(self):
+        names, listed = self.walk(depth=1, namespaces=0, max_workers=1)
+
+        assert sorted(names) == ['A', 'B']
+        assert listed == ['Category:Root', 'Category:Sub1', 'Category:Sub2']
+
+
 if __name__ == '__main__':
     unittest.main()
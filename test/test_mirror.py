@@ -0,0 +1,152 @@
+import unittest
+import unittest.mock as mock
+from typing import Any, Dict  # noqa: F401
+
+import pytest
+
+from mwclient.mirror import Mirror
+
+if __name__ == "__main__":
+    print()
+    print("Note: Running in stand-alone mode. Consult the README")
+    print("      (section 'Contributing') for advice on running tests.")
+    print()
+
+
+class FakeWiki:
+    """Answers the queries made by Mirror from a dict of pages."""
+
+    def __init__(self):
+        # title -> (pageid, ns, revid, text)
+        self.pages = {
+            'A': (1, 0, 10, 'Text of A'),
+            'B': (2, 0, 20, '#REDIRECT [[A]]'),
+            'Template:T': (3, 10, 30, 'Template'),
+        }
+        self.changes = []
+        self.events = []
+
+    def info(self, title):
+        if title not in self.pages:
+            return {'ns': 0, 'title': title, 'missing': ''}
+        pageid, ns, revid, text = self.pages[title]
+        info = {'pageid': pageid, 'ns': ns, 'title': title, 'length': len(text),
+                'contentmodel': 'wikitext', 'lastrevid': revid}
+        if text.startswith('#REDIRECT'):
+            info['redirect'] = ''
+        return info
+
+    def revision(self, title):
+        pageid, ns, revid, text = self.pages[title]
+        return {'revid': revid, 'timestamp': '2024-01-01T00:00:00Z',
+                'slots': {'main': {'contentmodel': 'wikitext', '*': text}}}
+
+    def get(self, action, *args, **kwargs):
+        params = dict(args, **kwargs)
+        if params.get('list') == 'recentchanges':
+            if params.get('rclimit') == '1':
+                return {'query': {'recentchanges': [
+                    {'timestamp': '2024-01-01T00:00:00Z'}
+                ]}}
+            return {'query': {'recentchanges': [
+                change for change in self.changes
+                if change['timestamp'] >= params['rcstart']
+            ]}}
+        if params.get('list') == 'logevents':
+            return {'query': {'logevents': [
+                event for event in self.events
+                if event['timestamp'] >= params['lestart']
+            ]}}
+        if params.get('generator') == 'allpages':
+            titles = sorted(title for title, page in self.pages.items()
+                            if page[1] == params['gapnamespace'])
+        else:
+            titles = params['titles'].split('|')
+        # The second page gets its content with a continuation, like when the
+        # content of too many pages is requested
+        continued = 'rvcontinue' in params
+        pages = {}  # type: Dict[str, Dict[str, Any]]
+        for i, title in enumerate(titles):
+            info = self.info(title)
+            if 'missing' not in info and (i == 1) == continued:
+                info['revisions'] = [self.revision(title)]
+            pages[str(info.get('pageid', -1 - i))] = info
+        data = {'query': {'pages': pages}}  # type: Dict[str, Any]
+        if len(titles) > 1 and not continued:
+            data['continue'] = {'rvcontinue': '2', 'continue': '||'}
+        return data
+
+
+class TestMirror(unittest.TestCase):
+
+    def setUp(self):
+        self.wiki = FakeWiki()
+        self.site = mock.MagicMock()
+        self.site.api_limit = 500
+        self.site.stream_listings = False
+        self.site.version = (1, 35)
+        self.site.namespaces = {-1: 'Special', 0: '', 10: 'Template'}
+        self.site.get.side_effect = self.wiki.get
+        self.mirror = Mirror(self.site, ':memory:')
+
+    def tearDown(self):
+        self.mirror.close()
+
+    def test_bootstrap(self):
+        watermark = self.mirror.watermark
+        assert watermark is None
+        assert self.mirror.bootstrap() == 3
+
+        assert self.mirror.watermark == '2024-01-01T00:00:00Z'
+        assert self.mirror.namespaces == [0, 10]
+        assert len(self.mirror) == 3
+        assert list(self.mirror.titles(0)) == ['A', 'B']
+        assert self.mirror.text('A') == 'Text of A'
+        assert self.mirror.text('Missing') == ''
+        assert self.mirror.get('B') == {
+            'pageid': 2, 'namespace': 0, 'title': 'B', 'revid': 20,
+            'timestamp': '2024-01-01T00:00:00Z', 'length': 15,
+            'contentmodel': 'wikitext', 'redirect': True, 'text': '#REDIRECT [[A]]',
+        }
+
+    def test_bootstrap_namespaces(self):
+        assert self.mirror.bootstrap(namespaces=[10]) == 1
+        assert list(self.mirror.titles()) == ['Template:T']
+
+    def test_sync(self):
+        with pytest.raises(ValueError):
+            self.mirror.sync()
+        self.mirror.bootstrap(namespaces=[0])
+
+        # A is edited, B is moved to C and Template:T is edited outside the mirror
+        self.wiki.pages['A'] = (1, 0, 11, 'New text of A')
+        self.wiki.pages['C'] = self.wiki.pages.pop('B')
+        self.wiki.changes = [
+            {'title': 'A', 'timestamp': '2024-01-02T00:00:00Z'},
+        ]
+        self.wiki.events = [
+            {'type': 'move', 'title': 'B', 'timestamp': '2024-01-03T00:00:00Z',
+             'params': {'target_ns': 0, 'target_title': 'C'}},
+            {'type': 'block', 'title': 'User:X', 'timestamp': '2024-01-04T00:00:00Z'},
+        ]
+
+        assert self.mirror.sync() == 3
+        assert self.mirror.watermark == '2024-01-04T00:00:00Z'
+        assert list(self.mirror.titles()) == ['A', 'C']
+        assert self.mirror.text('A') == 'New text of A'
+        moved = self.mirror.get('C')
+        assert moved is not None
+        assert moved['pageid'] == 2
+
+        # Deletion
+        del self.wiki.pages['A']
+        self.wiki.events = [
+            {'type': 'delete', 'title': 'A', 'timestamp': '2024-01-05T00:00:00Z'},
+        ]
+        assert self.mirror.sync() == 1
+        assert 'A' not in self.mirror
+        assert self.mirror.watermark == '2024-01-05T00:00:00Z'
+
+
+if __name__ == '__main__':
+    unittest.main()
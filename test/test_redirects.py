@@ -0,0 +1,134 @@
+import unittest
+import unittest.mock as mock
+
+import pytest
+
+import mwclient
+from mwclient.redirects import RedirectTable, follow_redirects
+
+if __name__ == "__main__":
+    print()
+    print("Note: Running in stand-alone mode. Consult the README")
+    print("      (section 'Contributing') for advice on running tests.")
+    print()
+
+
+class TestFollowRedirects(unittest.TestCase):
+
+    def test_follow_redirects(self):
+        redirects = {'A': 'B', 'B': 'C', 'X': 'Y', 'Y': 'X'}
+        assert follow_redirects('A', redirects) == 'C'
+        assert follow_redirects('C', redirects) == 'C'
+        assert follow_redirects('X', redirects) is None
+
+
+class TestResolveRedirects(unittest.TestCase):
+
+    def setUp(self):
+        self.site = mwclient.Site('test.wikipedia.org', do_init=False)
+
+    def test_resolve_redirects(self):
+        with mock.patch.object(self.site, 'get') as get:
+            get.return_value = {'query': {
+                'normalized': [{'from': 'uk', 'to': 'Uk'}],
+                'redirects': [
+                    {'from': 'Uk', 'to': 'UK'},
+                    {'from': 'UK', 'to': 'United Kingdom'},
+                    {'from': 'Loop', 'to': 'Pool'},
+                    {'from': 'Pool', 'to': 'Loop'},
+                ],
+                'pages': {},
+            }}
+            result = self.site.resolve_redirects(['uk', 'Loop', 'Paris'])
+
+        get.assert_called_once_with('query', titles='uk|Loop|Paris', redirects='')
+        assert result == {'uk': 'United Kingdom', 'Loop': None, 'Paris': 'Paris'}
+
+    def test_resolve_redirects_batches(self):
+        titles = [f'Page {i}' for i in range(120)]
+        with mock.patch.object(self.site, 'get') as get:
+            get.return_value = {'query': {}}
+            result = self.site.resolve_redirects(titles)
+
+        assert [len(call[1]['titles'].split('|')) for call in get.call_args_list] == \
+            [50, 50, 20]
+        assert result == {title: title for title in titles}
+
+    def test_resolve_redirects_table(self):
+        table = RedirectTable(self.site)
+        table.targets = {'A': 'B', 'B': 'C'}
+        with mock.patch.object(self.site, 'get') as get:
+            get.return_value = {'query': {}}
+            result = self.site.resolve_redirects(['A', 'D'], table=table)
+            assert get.call_count == 1
+
+            table.complete = True
+            assert self.site.resolve_redirects(['B', 'D'], table=table) == \
+                {'B': 'C', 'D': 'D'}
+            assert get.call_count == 1
+        assert result == {'A': 'C', 'D': 'D'}
+
+
+class TestRedirectTable(unittest.TestCase):
+
+    @mock.patch('mwclient.client.Site')
+    def test_load(self, mock_site):
+        mock_site.namespaces = {-1: 'Special', 0: '', 14: 'Category'}
+        mock_site.get.side_effect = [
+            {
+                'continue': {'gapcontinue': 'C', 'continue': 'gapcontinue||'},
+                'query': {'redirects': [{'from': 'A', 'to': 'B'}]},
+            },
+            {'query': {'redirects': [{'from': 'C', 'to': 'A'}]}},
+            {'query': {'redirects': [{'from': 'Category:X', 'to': 'Category:Y'}]}},
+        ]
+        table = RedirectTable(mock_site)
+        table.load()
+
+        assert table.targets == {'A': 'B', 'C': 'A', 'Category:X': 'Category:Y'}
+        assert table.complete
+        assert table.updated is not None
+        assert mock_site.get.call_args_list[1][1]['gapcontinue'] == 'C'
+        assert mock_site.get.call_args_list[2][1]['gapnamespace'] == 14
+
+    @mock.patch('mwclient.client.Site')
+    def test_refresh(self, mock_site):
+        mock_site.recentchanges.return_value = iter([{'title': 'A'}, {'title': 'D'}])
+        mock_site.get.return_value = {
+            'query': {'redirects': [{'from': 'D', 'to': 'B'}]},
+        }
+        table = RedirectTable(mock_site)
+        with pytest.raises(ValueError):
+            table.refresh()
+
+        table.targets = {'A': 'B', 'C': 'B'}
+        table.updated = '2024-01-01T00:00:00Z'
+        table.refresh()
+
+        assert table.targets == {'C': 'B', 'D': 'B'}
+        assert mock_site.recentchanges.call_args[1]['start'] == '2024-01-01T00:00:00Z'
+        assert table.updated != '2024-01-01T00:00:00Z'
+
+    @mock.patch('mwclient.client.Site')
+    def test_refresh_move(self, mock_site):
+        # The redirect A is moved to E without leaving a redirect behind
+        mock_site.recentchanges.return_value = iter([
+            {'title': 'A', 'type': 'log', 'logtype': 'move', 'logaction': 'move',
+             'logparams': {'target_ns': 0, 'target_title': 'E'}},
+        ])
+        mock_site.get.return_value = {
+            'query': {'redirects': [{'from': 'E', 'to': 'B'}]},
+        }
+        table = RedirectTable(mock_site)
+        table.targets = {'A': 'B', 'C': 'B'}
+        table.updated = '2024-01-01T00:00:00Z'
+        table.refresh()
+
+        assert table.targets == {'C': 'B', 'E': 'B'}
+        assert mock_site.recentchanges.call_args[1]['prop'] == 'title|loginfo'
+        titles = mock_site.get.call_args[1]['titles'].split('|')
+        assert sorted(titles) == ['A', 'E']
+
+
+if __name__ == '__main__':
+    unittest.main()
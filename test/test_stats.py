@@ -0,0 +1,138 @@
+import unittest
+import unittest.mock as mock
+from typing import Any, Dict, List  # noqa: F401
+
+import pytest
+import requests
+
+import mwclient
+from mwclient.stats import Stats, percentile
+from test.fake_wiki import FakeWiki, siteinfo
+
+if __name__ == "__main__":
+    print()
+    print("Note: Running in stand-alone mode. Consult the README")
+    print("      (section 'Contributing') for advice on running tests.")
+    print()
+
+
+class TestStats(unittest.TestCase):
+
+    def test_percentile(self):
+        values = [float(i) for i in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 99) == 99.0
+        assert percentile(values, 100) == 100.0
+        assert percentile([3.0], 90) == 3.0
+        assert percentile([], 50) == 0.0
+
+    def test_summary(self):
+        stats = Stats(max_samples=2)
+        for latency, retries, status in ((1.0, 0, 503), (2.0, 1, 200), (4.0, 0, 200)):
+            stats.record_request({'action': 'query', 'retries': retries,
+                                  'status': status, 'error': None, 'bytes_sent': 10,
+                                  'bytes_received': 100, 'latency': latency})
+        stats.record_sleep({'args': ('api', {'action': 'query'}), 'retries': 1,
+                            'sleep_time': 5})
+        stats.record_sleep({'args': None, 'retries': 1, 'sleep_time': 1})
+
+        summary = stats.summary()
+
+        assert summary['query']['requests'] == 3
+        assert summary['query']['retries'] == 1
+        assert summary['query']['errors'] == 1
+        assert summary['query']['sleeps'] == 1
+        assert summary['query']['sleep_time'] == 5
+        assert summary['query']['bytes_sent'] == 30
+        assert summary['query']['bytes_received'] == 300
+        # Only the two most recent latencies are kept for the percentiles
+        assert summary['query']['latency']['total'] == 7.0
+        assert summary['query']['latency']['p50'] == 2.0
+        assert summary['query']['latency']['max'] == 4.0
+        assert summary['']['sleep_time'] == 1
+
+        stats.reset()
+        assert stats.summary() == {}
+
+
+class TestSiteHooks(unittest.TestCase):
+
+    def setUp(self):
+        self.failures = 0
+
+    def handler(self, params):
+        if params.get('meta', '').startswith('siteinfo'):
+            return siteinfo()
+        return {'query': {'pages': {'1': {'title': 'Test'}}}}
+
+    def fail_once(self, request):
+        if self.failures == 0:
+            self.failures += 1
+            request.send_response(503)
+            request.send_header('Content-Length', '0')
+            request.end_headers()
+        else:
+            body = b'{"parse": {"title": "Test"}}'
+            request.send_response(200)
+            request.send_header('Content-Type', 'application/json')
+            request.send_header('Content-Length', str(len(body)))
+            request.end_headers()
+            request.wfile.write(body)
+
+    @mock.patch('time.sleep')
+    def test_events(self, timesleep):
+        events = {
+            'request': [], 'api': [], 'sleep': []
+        }  # type: Dict[str, List[Dict[str, Any]]]
+
+        with FakeWiki(self.handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http', retry_timeout=5)
+            for name, hook_events in events.items():
+                site.hooks[name].append(hook_events.append)
+            site.get('query', titles='Test')
+            wiki.routes['/w/api.php'] = self.fail_once
+            site.get('parse', page='Test')
+
+        assert [event['action'] for event in events['request']] == \
+            ['query', 'parse', 'parse']
+        assert [event['status'] for event in events['request']] == [200, 503, 200]
+        assert [event['retries'] for event in events['request']] == [0, 0, 1]
+        assert events['request'][0]['http_method'] == 'GET'
+        assert events['request'][0]['bytes_received'] > 0
+        assert events['request'][0]['bytes_sent'] > len('action=query')
+        assert [event['action'] for event in events['api']] == ['query', 'parse']
+        assert events['api'][1]['length'] == len('{"parse": {"title": "Test"}}')
+        assert len(events['sleep']) == 1
+        assert events['sleep'][0]['retries'] == 1
+
+        stats = site.stats()
+        assert stats['query']['requests'] == 2  # siteinfo and the query
+        assert stats['parse']['requests'] == 2
+        assert stats['parse']['errors'] == 1
+        assert stats['parse']['retries'] == 1
+        assert stats['parse']['sleeps'] == 1
+
+    def test_stats_reset(self):
+        with FakeWiki(self.handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http')
+            site.get('query', titles='Test')
+
+        assert site.stats(reset=True)['query']['requests'] == 2
+        assert site.stats() == {}
+
+    def test_connection_error_is_reported(self):
+        events = []  # type: List[Dict[str, Any]]
+        with FakeWiki(self.handler) as wiki:
+            host = wiki.host
+        site = mwclient.Site(host, scheme='http', do_init=False)
+        site.hooks['request'].append(events.append)
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            site.raw_call('api', {'action': 'query'}, retry_on_error=False)
+
+        assert events[0]['status'] is None
+        assert events[0]['error'] == 'ConnectionError'
+
+
+if __name__ == '__main__':
+    unittest.main()
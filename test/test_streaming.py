@@ -0,0 +1,196 @@
+import gc
+import json
+import unittest
+import unittest.mock as mock
+from typing import Any, List  # noqa: F401
+
+import pytest
+
+import mwclient
+from mwclient.errors import InvalidResponse
+from test.fake_wiki import FakeWiki, siteinfo
+
+pytest.importorskip('ijson')
+
+from mwclient.streaming import ItemStream  # noqa: E402
+
+if __name__ == "__main__":
+    print()
+    print("Note: Running in stand-alone mode. Consult the README")
+    print("      (section 'Contributing') for advice on running tests.")
+    print()
+
+
+def chunked(data, size=7):
+    body = json.dumps(data).encode('utf-8')
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+class TestItemStream(unittest.TestCase):
+
+    def test_list_member(self):
+        response = {
+            'batchcomplete': '',
+            'continue': {'apcontinue': 'C', 'continue': '-||'},
+            'query': {'allpages': [{'title': 'A', 'ns': 0}, {'title': 'B', 'ns': 0}]},
+        }
+        items = ItemStream(chunked(response), ('query', 'allpages'))
+
+        assert list(items) == [{'title': 'A', 'ns': 0}, {'title': 'B', 'ns': 0}]
+        assert items.data == {
+            'batchcomplete': '',
+            'continue': {'apcontinue': 'C', 'continue': '-||'},
+            'query': {'allpages': []},
+        }
+
+    def test_object_member(self):
+        response = {'query': {
+            'pages': {'1': {'pageid': 1, 'title': 'A'}, '2': {'pageid': 2, 'title': 'B'}},
+            'userinfo': {'id': 0, 'name': 'Anon', 'anon': ''},
+        }}
+        items = ItemStream(chunked(response), ('query', 'pages'))
+
+        assert list(items) == [{'pageid': 1, 'title': 'A'}, {'pageid': 2, 'title': 'B'}]
+        assert items.data is not None
+        assert items.data['query']['userinfo']['name'] == 'Anon'
+
+    def test_wildcard_path(self):
+        response = {'query': {'pages': {'5': {
+            'pageid': 5, 'title': 'A',
+            'revisions': [{'revid': 3, 'size': 1.5}, {'revid': 2, 'tags': []}],
+        }}}}
+        items = ItemStream(chunked(response), ('query', 'pages', '*', 'revisions'))
+
+        assert list(items) == [{'revid': 3, 'size': 1.5}, {'revid': 2, 'tags': []}]
+        assert items.data == {'query': {'pages': {'5': {
+            'pageid': 5, 'title': 'A', 'revisions': []
+        }}}}
+
+    def test_missing_member(self):
+        items = ItemStream(chunked({'error': {'code': 'x', 'info': 'y'}}),
+                           ('query', 'pages'))
+
+        assert list(items) == []
+        assert items.data == {'error': {'code': 'x', 'info': 'y'}}
+
+    def test_invalid_json(self):
+        items = ItemStream([b'<html>Not the API</html>'], ('query', 'pages'))
+
+        with pytest.raises(InvalidResponse) as exc:
+            list(items)
+        assert exc.value.response_text == '<html>Not the API</html>'
+
+
+class TestStreamedListings(unittest.TestCase):
+
+    @staticmethod
+    def handler(params):
+        if params.get('meta', '').startswith('siteinfo'):
+            return siteinfo()
+        revisions = [{'revid': i, 'timestamp': '2020-01-01T00:00:00Z',
+                      '*': f'Text {i}'} for i in range(10, 0, -1)]
+        if 'rvcontinue' in params:
+            return {'query': {'pages': {'1': {'pageid': 1, 'title': 'Test',
+                                              'revisions': revisions[5:]}}}}
+        return {'continue': {'rvcontinue': '5', 'continue': '||'},
+                'query': {'pages': {'1': {'pageid': 1, 'title': 'Test',
+                                          'revisions': revisions[:5]}}}}
+
+    def test_page_revisions(self):
+        with FakeWiki(self.handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http')
+            revisions = list(site.pages['Test'].revisions(prop='ids|content',
+                                                          stream=True))
+
+        assert [rev['revid'] for rev in revisions] == list(range(10, 0, -1))
+        assert revisions[0]['timestamp'].tm_year == 2020
+        assert len(wiki.calls) == 4  # siteinfo, page info and two revision chunks
+
+    def test_site_default(self):
+        def handler(params):
+            if params.get('meta', '').startswith('siteinfo'):
+                return siteinfo()
+            return {'query': {'allpages': [{'title': 'A', 'ns': 0}],
+                              'userinfo': {'id': 1, 'name': 'Bot'}}}
+
+        with FakeWiki(handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http')
+            site.stream_listings = True
+            listing = site.allpages(generator=False)
+            titles = list(listing)
+
+        assert listing.stream is True
+        assert titles == ['A']
+
+    def test_api_error(self):
+        def handler(params):
+            if params.get('meta', '').startswith('siteinfo'):
+                return siteinfo()
+            return {'error': {'code': 'badvalue', 'info': 'Bad value.'}}
+
+        with FakeWiki(handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http')
+            with pytest.raises(mwclient.errors.APIError):
+                list(site.api_stream('query', ('query', 'allpages'),
+                                     list='allpages'))
+
+    def test_response_is_closed_early(self):
+        def handler(params):
+            if params.get('meta', '').startswith('siteinfo'):
+                return siteinfo()
+            # Larger than the chunks read, so the body is not read at once
+            return {'query': {'allpages': [{'title': f'Page {i}'}
+                                           for i in range(10000)]}}
+
+        with FakeWiki(handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http')
+            responses = []  # type: List[Any]
+            raw_request = site.raw_request
+
+            def request(*args, **kwargs):
+                responses.append(raw_request(*args, **kwargs))
+                return responses[-1]
+
+            with mock.patch.object(site, 'raw_request', request):
+                items = site.api_stream('query', ('query', 'allpages'),
+                                        list='allpages')
+                assert next(items) == {'title': 'Page 0'}
+                assert not responses[0].raw.closed
+                items.close()
+
+        assert responses[0].raw.closed
+
+    def test_abandoned_listing_closes_response(self):
+        def handler(params):
+            if params.get('meta', '').startswith('siteinfo'):
+                return siteinfo()
+            return {'query': {'allpages': [{'title': f'Page {i}', 'ns': 0}
+                                           for i in range(10000)]}}
+
+        with FakeWiki(handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http')
+            site.stream_listings = True
+            responses = []  # type: List[Any]
+            raw_request = site.raw_request
+
+            def request(*args, **kwargs):
+                responses.append(raw_request(*args, **kwargs))
+                return responses[-1]
+
+            with mock.patch.object(site, 'raw_request', request), \
+                    mock.patch.object(mwclient.listing.List, 'close', autospec=True,
+                                      side_effect=mwclient.listing.List.close) as close:
+                for title in site.allpages(generator=False):
+                    break
+                # The streamed listing is part of a reference cycle, through
+                # the generator reading its chunks
+                gc.collect()
+
+        assert title == 'Page 0'
+        # Other listings may be collected at the same time
+        assert [args[0].site for args, _ in close.call_args_list].count(site) == 1
+        assert responses[0].raw.closed
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,226 @@
+import socket
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import List  # noqa: F401
+
+import mwclient
+from mwclient.client import PoolAdapter
+from mwclient.page import Page
+from test.fake_wiki import FakeWiki, siteinfo
+
+if __name__ == "__main__":
+    print()
+    print("Note: Running in stand-alone mode. Consult the README")
+    print("      (section 'Contributing') for advice on running tests.")
+    print()
+
+
+class TestSharedSite(unittest.TestCase):
+
+    threads = 16
+
+    def test_concurrent_api_calls(self):
+        def handler(params):
+            if params.get('meta', '').startswith('siteinfo'):
+                return siteinfo()
+            return {'query': {'pages': {'1': {'title': params['titles']}},
+                              'userinfo': {'id': 1, 'name': 'Bot'}}}
+
+        with FakeWiki(handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http')
+
+            def fetch(i):
+                info = site.get('query', titles=f'Page {i}')
+                return info['query']['pages']['1']['title']
+
+            with ThreadPoolExecutor(self.threads) as executor:
+                titles = list(executor.map(fetch, range(200)))
+
+        assert titles == [f'Page {i}' for i in range(200)]
+        assert len(wiki.calls) == 201
+        assert site.logged_in is True
+
+    def test_concurrent_token_fetch(self):
+        token_fetches = []
+
+        def handler(params):
+            if params.get('meta', '').startswith('siteinfo'):
+                return siteinfo()
+            token_fetches.append(params)
+            return {'query': {'tokens': {'csrftoken': 'token+\\'}}}
+
+        with FakeWiki(handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http')
+            barrier = threading.Barrier(self.threads)
+
+            def fetch(i):
+                barrier.wait()
+                return site.get_token('edit')
+
+            with ThreadPoolExecutor(self.threads) as executor:
+                tokens = set(executor.map(fetch, range(self.threads)))
+
+        assert tokens == {'token+\\'}
+        assert len(token_fetches) == 1
+
+    def test_badtoken_is_refreshed_once(self):
+        token_fetches = []
+        edits = []
+
+        def handler(params):
+            if params.get('meta', '').startswith('siteinfo'):
+                return siteinfo()
+            if params.get('meta') == 'tokens':
+                token_fetches.append(params)
+                return {'query': {'tokens': {'csrftoken': 'new+\\'}}}
+            if params['token'] != 'new+\\':
+                return {'error': {'code': 'badtoken', 'info': 'Invalid CSRF token.'}}
+            edits.append(params['title'])
+            return {'edit': {'result': 'Success', 'title': params['title'],
+                             'pageid': 1, 'newrevid': 2}}
+
+        with FakeWiki(handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http')
+            site.tokens['csrf'] = 'expired+\\'
+            barrier = threading.Barrier(self.threads)
+
+            def edit(i):
+                page = Page(site, f'Page {i}', info={'title': f'Page {i}', 'ns': 0})
+                barrier.wait()
+                return page.edit('Text')['result']
+
+            with ThreadPoolExecutor(self.threads) as executor:
+                results = list(executor.map(edit, range(self.threads)))
+
+        assert results == ['Success'] * self.threads
+        assert len(edits) == self.threads
+        assert len(token_fetches) == 1
+
+    def test_site_init_waits_for_token_fetch(self):
+        fetching = threading.Event()
+        release = threading.Event()
+
+        def handler(params):
+            if params.get('meta', '').startswith('siteinfo'):
+                return siteinfo()
+            if params.get('meta') == 'tokens':
+                # A token of the previous session, fetched before site_init
+                fetching.set()
+                release.wait(5)
+                return {'query': {'tokens': {'csrftoken': 'old+\\'}}}
+            info = siteinfo()['query']['userinfo']
+            return {'query': {'userinfo': info,
+                              'tokens': {'csrftoken': 'new+\\'}}}
+
+        with FakeWiki(handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http')
+            fetch = threading.Thread(target=site.get_token, args=('edit', True))
+            fetch.start()
+            fetching.wait(5)
+            init = threading.Thread(target=site.site_init)
+            init.start()
+            # Without the lock, site_init would complete before the fetch
+            init.join(0.2)
+            release.set()
+            fetch.join()
+            init.join()
+
+        assert site.tokens == {'csrf': 'new+\\'}
+
+    def test_post_edit_cookies_are_cleared(self):
+        def handler(params):
+            if params.get('meta', '').startswith('siteinfo'):
+                return siteinfo()
+            return {'edit': {'result': 'Success', 'title': params['title'],
+                             'pageid': 1, 'newrevid': 2}}
+
+        def set_cookie(request):
+            # Stores a new cookie in the jar while the edits clear theirs
+            name = request.path.rpartition('=')[2]
+            request.send_response(200)
+            request.send_header('Set-Cookie', f'{name}=1; Path=/')
+            request.send_header('Content-Length', '0')
+            request.end_headers()
+
+        with FakeWiki(handler, {'/w/cookie': set_cookie}) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http')
+            site.tokens['csrf'] = 'token+\\'
+            for i in range(self.threads):
+                site.connection.cookies.set(f'wikiPostEditRevision{i}', 'saved')
+            site.connection.cookies.set('session', 'abc')
+
+            def edit(i):
+                page = Page(site, f'Page {i}', info={'title': f'Page {i}', 'ns': 0})
+                return page.edit('Text')['result']
+
+            def visit(i):
+                url = f'http://{wiki.host}/w/cookie?name=visit{i}'
+                return site.connection.get(url).status_code
+
+            with ThreadPoolExecutor(self.threads) as executor:
+                visits = executor.map(visit, range(100))
+                results = list(executor.map(edit, range(self.threads)))
+                assert list(visits) == [200] * 100
+
+        assert results == ['Success'] * self.threads
+        names = {cookie.name for cookie in site.connection.cookies}
+        assert names == {'session'} | {f'visit{i}' for i in range(100)}
+
+    def test_clear_cookies_blocks_writers(self):
+        site = mwclient.Site('test.wikipedia.org', do_init=False)
+        cookies = site.connection.cookies
+        cookies.set('wikiPostEditRevision1', 'saved')
+        cookies.set('session', 'abc')
+        writers = []  # type: List[threading.Thread]
+
+        def predicate(cookie):
+            if not writers:
+                # Another thread stores a cookie while the jar is being read
+                writers.append(threading.Thread(target=cookies.set,
+                                                args=('other', 'x')))
+                writers[0].start()
+                writers[0].join(0.1)
+                assert writers[0].is_alive()
+            return 'PostEditRevision' in cookie.name
+
+        site.clear_cookies(predicate)
+        writers[0].join()
+
+        assert {cookie.name for cookie in cookies} == {'session', 'other'}
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def test_pool_options_are_applied(self):
+        site = mwclient.Site('test.wikipedia.org', do_init=False, pool_maxsize=32,
+                             pool_block=True, tcp_keepalive=True)
+
+        adapter = site.connection.get_adapter('https://test.wikipedia.org/w/api.php')
+        assert isinstance(adapter, PoolAdapter)
+        pool_kw = adapter.poolmanager.connection_pool_kw
+        assert pool_kw['maxsize'] == 32
+        assert pool_kw['block'] is True
+        assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in pool_kw['socket_options']
+
+    def test_connections_are_reused_by_threads(self):
+        def handler(params):
+            if params.get('meta', '').startswith('siteinfo'):
+                return siteinfo()
+            return {}
+
+        with FakeWiki(handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http', pool_maxsize=4,
+                                 tcp_keepalive=True)
+            with ThreadPoolExecutor(4) as executor:
+                list(executor.map(lambda i: site.get('query'), range(100)))
+
+            stats = site.connection_stats()[f'http://{wiki.host}']
+
+        assert stats['requests'] == 101
+        assert stats['connections'] <= 4
+        assert stats['reused'] == stats['requests'] - stats['connections']
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,249 @@
+import unittest
+import unittest.mock as mock
+from typing import Any, Dict, List, Optional  # noqa: F401
+
+import pytest
+
+import mwclient
+from mwclient.page import Page
+from mwclient.tracing import NoopTracer, Span, Tracer
+from test.fake_wiki import FakeWiki, siteinfo
+
+if __name__ == "__main__":
+    print()
+    print("Note: Running in stand-alone mode. Consult the README")
+    print("      (section 'Contributing') for advice on running tests.")
+    print()
+
+
+class RecordedSpan(Span):
+
+    def __init__(self, name, parent, attributes):
+        self.name = name
+        self.parent = parent
+        self.attributes = dict(attributes or {})
+        self.exceptions = []  # type: List[BaseException]
+        self.ended = False
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def record_exception(self, exception):
+        self.exceptions.append(exception)
+
+    def end(self):
+        self.ended = True
+
+
+class RecordingTracer(Tracer):
+
+    def __init__(self):
+        self.spans = []  # type: List[RecordedSpan]
+
+    def start_span(self, name, parent=None, attributes=None):
+        span = RecordedSpan(name, parent, attributes)
+        self.spans.append(span)
+        return span
+
+    def named(self, name):
+        return [span for span in self.spans if span.name == name]
+
+
+def handler(params):
+    if params.get('meta', '').startswith('siteinfo'):
+        return siteinfo()
+    if params.get('list') == 'allpages':
+        if 'apcontinue' in params:
+            return {'query': {'allpages': [{'title': 'C'}]}}
+        return {'continue': {'apcontinue': 'C', 'continue': '-||'},
+                'query': {'allpages': [{'title': 'A'}, {'title': 'B'}]}}
+    if params.get('action') == 'edit':
+        return {'edit': {'result': 'Success', 'title': params['title'],
+                         'pageid': 1, 'newrevid': 2}}
+    return {'query': {'tokens': {'csrftoken': 'token+\\'}}}
+
+
+class TestTracing(unittest.TestCase):
+
+    def test_noop_tracer(self):
+        tracer = NoopTracer()
+        with tracer.span('a') as span:
+            span.set_attribute('key', 'value')
+        assert tracer.span('b') is tracer.span('c')
+
+    def test_list_spans(self):
+        tracer = RecordingTracer()
+        with FakeWiki(handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http', tracer=tracer)
+            titles = list(site.allpages(generator=False))
+
+        assert titles == ['A', 'B', 'C']
+        [list_span] = tracer.named('mwclient.list')
+        assert list_span.ended
+        assert list_span.parent is None
+        assert list_span.attributes == {'mwclient.list': 'allpages',
+                                        'mwclient.items': 3, 'mwclient.chunks': 2}
+
+        chunks = tracer.named('mwclient.list.chunk')
+        assert [chunk.parent for chunk in chunks] == [list_span, list_span]
+        assert [chunk.attributes['mwclient.continues'] for chunk in chunks] == \
+            [True, False]
+
+        requests = tracer.named('mwclient.request')
+        assert len(requests) == 3  # siteinfo and two chunks
+        assert requests[0].parent is None
+        assert [request.parent for request in requests[1:]] == chunks
+        assert requests[1].attributes['http.response.status_code'] == 200
+        assert requests[1].attributes['mwclient.action'] == 'query'
+        assert requests[1].attributes['mwclient.bytes_received'] > 0
+        assert all(span.ended for span in tracer.spans)
+
+    def test_max_items_ends_list_span(self):
+        tracer = RecordingTracer()
+        with FakeWiki(handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http', tracer=tracer)
+            titles = list(site.allpages(generator=False, max_items=2))
+
+        assert titles == ['A', 'B']
+        [list_span] = tracer.named('mwclient.list')
+        assert list_span.ended
+        assert list_span.attributes['mwclient.chunks'] == 1
+
+    def test_break_ends_list_span(self):
+        tracer = RecordingTracer()
+        with FakeWiki(handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http', tracer=tracer)
+            pages = site.allpages(generator=False)
+            for title in pages:
+                break
+            pages.close()
+            assert next(pages, None) is None
+
+            for title in site.allpages(generator=False):
+                break
+
+        first, second = tracer.named('mwclient.list')
+        assert first.ended
+        assert first.attributes['mwclient.items'] == 1
+        # Ended when the listing is garbage collected
+        assert second.ended
+
+    def test_error_ends_list_span(self):
+        def failing_handler(params):
+            if 'apcontinue' in params:
+                return {'error': {'code': 'internal_api_error', 'info': 'Failed'}}
+            return handler(params)
+
+        tracer = RecordingTracer()
+        with FakeWiki(failing_handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http', tracer=tracer)
+            with pytest.raises(mwclient.errors.APIError):
+                list(site.allpages(generator=False))
+
+        [list_span] = tracer.named('mwclient.list')
+        assert list_span.ended
+        assert list_span.attributes['mwclient.items'] == 2
+        assert isinstance(list_span.exceptions[0], mwclient.errors.APIError)
+
+    @mock.patch('time.sleep')
+    def test_retry_spans(self, timesleep):
+        failures = []  # type: List[Any]
+
+        def fail_once(request):
+            if not failures:
+                failures.append(request)
+                request.send_response(503)
+                request.send_header('Content-Length', '0')
+                request.end_headers()
+                return
+            body = b'{"parse": {}}'
+            request.send_response(200)
+            request.send_header('Content-Length', str(len(body)))
+            request.end_headers()
+            request.wfile.write(body)
+
+        tracer = RecordingTracer()
+        with FakeWiki(handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http', tracer=tracer,
+                                 retry_timeout=5)
+            wiki.routes['/w/api.php'] = fail_once
+            site.get('parse', page='Test')
+
+        requests = tracer.named('mwclient.request')[1:]
+        assert [r.attributes['http.response.status_code'] for r in requests] == \
+            [503, 200]
+        assert [r.attributes['mwclient.retries'] for r in requests] == [0, 1]
+        [sleep] = tracer.named('mwclient.sleep')
+        assert sleep.attributes['mwclient.retries'] == 1
+        assert sleep.attributes['mwclient.maxlag'] is False
+
+    def test_edit_span(self):
+        tracer = RecordingTracer()
+        with FakeWiki(handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http', tracer=tracer)
+            page = Page(site, 'Test', info={'title': 'Test', 'ns': 0})
+            page.edit('Some text')
+
+        [edit] = tracer.named('mwclient.edit')
+        assert edit.attributes == {'mwclient.title': 'Test',
+                                   'mwclient.text_length': 9,
+                                   'mwclient.nochange': False}
+        requests = tracer.named('mwclient.request')
+        assert [r.parent for r in requests[1:]] == [edit, edit]  # token and edit
+
+    def test_failed_request_records_exception(self):
+        tracer = RecordingTracer()
+        with FakeWiki(handler) as wiki:
+            host = wiki.host
+        site = mwclient.Site(host, scheme='http', do_init=False, tracer=tracer)
+
+        with pytest.raises(Exception):
+            site.raw_call('api', {'action': 'query'}, retry_on_error=False)
+
+        [request] = tracer.named('mwclient.request')
+        assert request.ended
+        assert len(request.exceptions) == 1
+        assert 'http.response.status_code' not in request.attributes
+
+
+class TestOpenTelemetryTracer(unittest.TestCase):
+
+    def test_spans_are_exported(self):
+        pytest.importorskip('opentelemetry.sdk')
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+            InMemorySpanExporter
+        )
+        from mwclient.tracing import OpenTelemetryTracer
+
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        otel_tracer = provider.get_tracer('test')
+        tracer = OpenTelemetryTracer(otel_tracer)
+
+        with FakeWiki(handler) as wiki:
+            with otel_tracer.start_as_current_span('job') as job:
+                site = mwclient.Site(wiki.host, scheme='http', tracer=tracer)
+                list(site.allpages(generator=False))
+
+        spans = {}  # type: Dict[str, List[Any]]
+        for span in exporter.get_finished_spans():
+            spans.setdefault(span.name, []).append(span)
+        [list_span] = spans['mwclient.list']
+        assert list_span.parent.span_id == job.get_span_context().span_id
+        assert list_span.attributes['mwclient.items'] == 3
+        for chunk in spans['mwclient.list.chunk']:
+            assert chunk.parent.span_id == list_span.context.span_id
+        request_parents = [
+            span.parent.span_id for span in spans['mwclient.request']
+        ]  # type: List[Optional[int]]
+        assert request_parents[0] == job.get_span_context().span_id
+        assert request_parents[1:] == [
+            chunk.context.span_id for chunk in spans['mwclient.list.chunk']
+        ]
+
+
+if __name__ == '__main__':
+    unittest.main()
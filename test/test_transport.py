@@ -0,0 +1,252 @@
+import gzip
+import json
+import os
+import tempfile
+import time
+import unittest
+import unittest.mock as mock
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+import mwclient
+from mwclient.errors import ReplayError
+from mwclient.page import Page
+from mwclient.transport import (
+    RecordingTransport, ReplayTransport, RequestsTransport, preferred_encodings,
+    request_key
+)
+from test.fake_wiki import FakeH2Wiki, FakeWiki, siteinfo
+
+if __name__ == "__main__":
+    print()
+    print("Note: Running in stand-alone mode. Consult the README")
+    print("      (section 'Contributing') for advice on running tests.")
+    print()
+
+
+def handler(params):
+    if params.get('meta', '').startswith('siteinfo'):
+        return siteinfo()
+    return {'query': {'pages': {'1': {'title': params.get('titles')}},
+                      'userinfo': {'id': 1, 'name': 'Bot'}}}
+
+
+class TestRequestsTransport(unittest.TestCase):
+
+    def test_default_transport_uses_session(self):
+        with FakeWiki(handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http')
+            info = site.get('query', titles='Test')
+
+        assert isinstance(site.transport, RequestsTransport)
+        assert site.transport.session is site.connection
+        assert info['query']['pages']['1']['title'] == 'Test'
+
+    def test_compressed_responses(self):
+        brotli = pytest.importorskip('brotli')
+        received = []
+
+        def compressed(request):
+            received.append(request.headers['Accept-Encoding'])
+            body = brotli.compress(json.dumps(handler({})).encode('utf-8'))
+            request.send_response(200)
+            request.send_header('Content-Encoding', 'br')
+            request.send_header('Content-Length', str(len(body)))
+            request.end_headers()
+            request.wfile.write(body)
+
+        with FakeWiki(handler, routes={'/w/api.php': compressed}) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http', do_init=False)
+            info = site.get('query')
+
+        assert 'br' in site.transport.encodings
+        assert received == [', '.join(site.transport.encodings)]
+        assert info['query']['userinfo']['name'] == 'Bot'
+
+
+class TestPreferredEncodings(unittest.TestCase):
+
+    def test_order(self):
+        assert preferred_encodings(['gzip', 'deflate', 'br', 'zstd']) == \
+            ('zstd', 'br', 'gzip')
+
+    def test_gzip_fallback(self):
+        assert preferred_encodings([]) == ('gzip',)
+        assert preferred_encodings(['identity', 'br']) == ('br', 'gzip')
+
+
+class TestHttpxTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.httpx = pytest.importorskip('httpx')
+        from mwclient.transport import HttpxTransport
+        self.HttpxTransport = HttpxTransport
+
+    def test_http1_requests(self):
+        with FakeWiki(handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http',
+                                 transport=self.HttpxTransport(http2=False),
+                                 custom_headers={'X-Test': 'yes'})
+            info = site.post('query', titles='Test', rvlimit=5, redirects=None)
+
+        assert info['query']['pages']['1']['title'] == 'Test'
+        assert wiki.calls[-1] == {'action': 'query', 'titles': 'Test',
+                                  'rvlimit': '5', 'format': 'json',
+                                  'meta': 'userinfo', 'uiprop': 'blockinfo|hasmsg'}
+
+    def test_cookies_are_shared(self):
+        transport = self.HttpxTransport(http2=False)
+        with FakeWiki(handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http', do_init=False,
+                                 transport=transport)
+            site.connection.cookies.set('session', 'abc')
+            site.get('query')
+
+        assert transport.client.cookies['session'] == 'abc'
+
+    def test_http_errors_are_translated(self):
+        def error(request):
+            request.send_response(404)
+            request.send_header('Content-Length', '0')
+            request.end_headers()
+
+        with FakeWiki(handler, routes={'/w/index.php': error}) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http', do_init=False,
+                                 transport=self.HttpxTransport(http2=False))
+            with pytest.raises(requests.exceptions.HTTPError):
+                site.raw_index('raw', http_method='GET')
+
+    def test_connection_errors_are_translated(self):
+        with FakeWiki(handler) as wiki:
+            host = wiki.host
+        site = mwclient.Site(host, scheme='http', do_init=False,
+                             transport=self.HttpxTransport(http2=False))
+        with pytest.raises(requests.exceptions.ConnectionError):
+            site.raw_call('api', {'action': 'query'}, retry_on_error=False)
+
+    def test_encodings(self):
+        transport = self.HttpxTransport()
+        assert transport.encodings[-1] == 'gzip'
+        assert set(transport.encodings) <= {'zstd', 'br', 'gzip'}
+
+    def test_unsupported_auth(self):
+        with pytest.raises(ValueError):
+            mwclient.Site('test.wikipedia.org', do_init=False,
+                          consumer_token='a', consumer_secret='b',
+                          access_token='c', access_secret='d',
+                          transport=self.HttpxTransport())
+
+    def test_http2_multiplexing(self):
+        pytest.importorskip('h2')
+        with FakeH2Wiki(handler, delay=0.2) as wiki:
+            transport = self.HttpxTransport(http1=False)
+            site = mwclient.Site(wiki.host, scheme='http', transport=transport)
+
+            start = time.monotonic()
+            with ThreadPoolExecutor(20) as executor:
+                titles = list(executor.map(
+                    lambda i: site.get('query', titles=f'Page {i}')
+                    ['query']['pages']['1']['title'], range(20)))
+            elapsed = time.monotonic() - start
+
+        assert titles == [f'Page {i}' for i in range(20)]
+        # All 20 requests were in flight at once on a single connection
+        assert elapsed < 2.0
+
+
+class TestRecordReplay(unittest.TestCase):
+
+    @staticmethod
+    def handler(params):
+        if params.get('meta', '').startswith('siteinfo'):
+            return siteinfo()
+        if params.get('meta', '').startswith('tokens'):
+            return {'query': {'tokens': {'csrftoken': 'secret-token+\\'}}}
+        if params.get('action') == 'edit':
+            return {'edit': {'result': 'Success', 'title': params['title'],
+                             'pageid': 1, 'newrevid': 2}}
+        if 'apcontinue' in params:
+            return {'query': {'allpages': [{'title': 'Ć'}]}}
+        return {'continue': {'apcontinue': 'C', 'continue': '-||'},
+                'query': {'allpages': [{'title': 'A'}, {'title': 'B'}]}}
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'cassette.jsonl.gz')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def record(self):
+        transport = RecordingTransport(self.path)
+        with FakeWiki(self.handler) as wiki:
+            site = mwclient.Site(wiki.host, scheme='http', transport=transport)
+            titles = list(site.allpages(generator=False))
+            Page(site, 'Test', info={'title': 'Test', 'ns': 0}).edit('Text')
+        transport.close()
+        return wiki.host, titles
+
+    def test_replay(self):
+        host, recorded = self.record()
+
+        transport = ReplayTransport(self.path)
+        site = mwclient.Site(host, scheme='http', transport=transport)
+        titles = list(site.allpages(generator=False))
+        result = Page(site, 'Test', info={'title': 'Test', 'ns': 0}).edit('Text')
+
+        assert titles == recorded == ['A', 'B', 'Ć']
+        assert result['newrevid'] == 2
+        assert site.version == (1, 35)
+        with pytest.raises(ReplayError):
+            site.get('query', list='allpages', aplimit=1)
+
+    def test_replay_streamed(self):
+        host, recorded = self.record()
+        pytest.importorskip('ijson')
+
+        site = mwclient.Site(host, scheme='http', transport=ReplayTransport(self.path))
+        site.stream_listings = True
+        titles = list(site.allpages(generator=False))
+
+        assert titles == recorded
+
+    def test_responses_are_replayed_once(self):
+        host, _ = self.record()
+        site = mwclient.Site(host, scheme='http', transport=ReplayTransport(self.path))
+
+        with pytest.raises(ReplayError):
+            # siteinfo was only recorded once
+            site.site_init()
+
+    def test_tokens_are_not_recorded(self):
+        self.record()
+
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            cassette = f.read()
+        keys = [json.loads(line)['request'] for line in cassette.splitlines()]
+
+        assert len(keys) == 5  # siteinfo, two chunks, token and edit
+        assert not any('token=' in key for key in keys)
+        assert 'action=edit' in keys[-1]
+
+    @mock.patch('time.sleep')
+    def test_latency(self, timesleep):
+        host, _ = self.record()
+
+        site = mwclient.Site(host, scheme='http', do_init=False,
+                             transport=ReplayTransport(self.path, latency=True))
+        site.site_init()
+
+        assert timesleep.call_count == 1
+        assert timesleep.call_args[0][0] >= 0
+
+    def test_request_key(self):
+        key = request_key('GET', 'https://example.org/w/api.php?x=1',
+                          params={'b': 2, 'a': 'x y', 'token': 't', 'c': None})
+        assert key == 'GET /w/api.php?a=x+y&b=2'
+
+
+if __name__ == '__main__':
+    unittest.main()
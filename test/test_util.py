@@ -1,6 +1,10 @@
 import unittest
 import time
-from mwclient.util import parse_timestamp
+from datetime import datetime, timezone
+
+import pytest
+
+from mwclient.util import parse_timestamp, parse_datetime, parse_epoch, timestamp_parser
 
 if __name__ == "__main__":
     print()
@@ -20,5 +24,29 @@ class TestUtil(unittest.TestCase):
     def test_parse_nonempty_timestamp(self):
         assert time.struct_time((2015, 1, 2, 20, 18, 36, 4, 2, -1)) == parse_timestamp('2015-01-02T20:18:36Z')
 
+    def test_parse_timestamp_matches_strptime(self):
+        for t in ('2015-01-02T20:18:36Z', '2024-02-29T23:59:59Z', '1970-01-01T00:00:00Z'):
+            assert parse_timestamp(t) == time.strptime(t, '%Y-%m-%dT%H:%M:%SZ')
+
+    def test_parse_invalid_timestamp(self):
+        for t in ('2015-13-02T20:18:36Z', '2015-01-02 20:18:36Z', '2015-01-02T20:18:36'):
+            with pytest.raises(ValueError):
+                parse_timestamp(t)
+
+    def test_parse_datetime(self):
+        assert parse_datetime('2015-01-02T20:18:36Z') == \
+            datetime(2015, 1, 2, 20, 18, 36, tzinfo=timezone.utc)
+        assert parse_datetime('0000-00-00T00:00:00Z') is None
+
+    def test_parse_epoch(self):
+        assert parse_epoch('2015-01-02T20:18:36Z') == 1420229916
+        assert parse_epoch(None) is None
+
+    def test_timestamp_parser(self):
+        assert timestamp_parser('struct_time') is parse_timestamp
+        assert timestamp_parser('raw') is None
+        with pytest.raises(ValueError):
+            timestamp_parser('iso')
+
 if __name__ == '__main__':
     unittest.main()